@@ -0,0 +1,61 @@
+# Topology writing: sequential vs. pooled formatting with ordered writer
+#   python async_write.py [nAtoms] [nWorkers]
+import filecmp
+import os
+import sys
+import tempfile
+import time
+
+from GenTopo.Coord import PDBobj
+from GenTopo.Graph import MolGraph
+from GenTopo.GMXTopo import Topo
+
+
+def writeChain(fileName, nAtoms):
+    # zig-zag chain with a force-field type column and CONECT records,
+    # at most 99999 atoms (5 digit serials)
+    with open(fileName, "w") as FH:
+        for i in range(nAtoms):
+            record = "ATOM  %5d C    UNK  %4d    %8.3f%8.3f%8.3f" % (
+                i + 1,
+                i // 10 % 10000,
+                1.25 * i % 999,
+                0.8 * (i % 2),
+                0.0,
+            )
+            FH.write("%-80s CT%d   0.000\n" % (record, i % 7))
+        for i in range(1, nAtoms):
+            FH.write("CONECT%5d%5d\n" % (i, i + 1))
+
+
+def main():
+    nAtoms = int(sys.argv[1]) if len(sys.argv) > 1 else 99999
+    nWorkers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+        pdbFile = os.path.join(tmpDir, "chain.pdb")
+        writeChain(pdbFile, nAtoms)
+
+        mol = PDBobj(pdbFile)
+        topo = Topo(mol, MolGraph(mol).materialize())
+
+        files = []
+        for label, kwargs in (
+            ("sequential", {}),
+            ("threads", {"nWorkers": nWorkers}),
+            ("processes", {"nWorkers": nWorkers, "processes": True}),
+        ):
+            topFile = os.path.join(tmpDir, label + ".top")
+            start = time.perf_counter()
+            topo.write(topFile, **kwargs)
+            print("%-10s %8.3f s" % (label, time.perf_counter() - start))
+            files.append(topFile)
+
+        print(
+            "identical output:",
+            all(filecmp.cmp(files[0], other, shallow=False) for other in files[1:]),
+        )
+
+
+if __name__ == "__main__":
+    main()
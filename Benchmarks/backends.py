@@ -0,0 +1,97 @@
+# Kernel backends: cross-validates and times python/numpy/cython kernels
+#   python backends.py [nAtoms]
+import sys
+import time
+
+import numpy as np
+
+from GenTopo import Kernels
+
+
+def ladders(nAtoms):
+    # pairs of 1.4 A spaced chains, 1.9 A apart, i.e. ladders of 4-rings
+    side = int(np.ceil((nAtoms / 2) ** 0.5))
+    i = np.arange(nAtoms)
+    chain, pos = i // side, i % side
+    x = 1.4 * pos
+    y = 1.9 * (chain % 2) + 8.0 * (chain // 2)
+    z = np.zeros(nAtoms)
+    return np.stack((x, y, z), axis=1)
+
+
+def run(backend, coords, radii):
+    Kernels.setBackend(backend)
+    timings = {}
+
+    start = time.perf_counter()
+    bonds = Kernels.searchBonds(coords, radii)
+    timings["searchBonds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    angles = Kernels.extendTerms(bonds, bonds)
+    dihedrals = Kernels.extendTerms(bonds, angles)
+    timings["extendTerms"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ring = Kernels.ringBonds(bonds)
+    timings["ringBonds"] = time.perf_counter() - start
+
+    return (bonds, angles, dihedrals, ring), timings
+
+
+# graphs with few or no angles and dihedrals: disconnected pairs, a
+# diatomic fluid, a single bond and an angle next to an isolated pair
+EDGE_CASES = {
+    "disconnected": np.array([[1, 2], [3, 4]]),
+    "diatomic": np.arange(1, 201).reshape(-1, 2),
+    "single bond": np.array([[1, 2]]),
+    "angle only": np.array([[1, 2], [2, 3], [5, 6]]),
+}
+
+
+def edgeCases(backend):
+    # angles and dihedrals of EDGE_CASES, all (n, k) arrays
+    Kernels.setBackend(backend)
+    results = []
+    for bonds in EDGE_CASES.values():
+        angles = Kernels.extendTerms(bonds, bonds)
+        dihedrals = Kernels.extendTerms(bonds, angles)
+        assert angles.shape[1:] == (3,) and dihedrals.shape[1:] == (4,)
+        results += [angles, dihedrals]
+    return results
+
+
+def main():
+    nAtoms = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    coords = ladders(nAtoms)
+    radii = np.full(nAtoms, 1.7)
+
+    backends = ["numpy"]
+    if nAtoms <= 2000:
+        backends.insert(0, "python")
+    if Kernels._kernels is not None:
+        backends.append("cython")
+
+    results = {}
+    for backend in backends:
+        results[backend], timings = run(backend, coords, radii)
+        print(
+            "%-8s %s"
+            % (backend, "  ".join("%s %8.3f s" % item for item in timings.items()))
+        )
+
+    reference = results[backends[0]]
+    for backend in backends[1:]:
+        same = all(np.array_equal(a, b) for a, b in zip(reference, results[backend]))
+        print("%-8s matches %s: %s" % (backend, backends[0], same))
+
+    reference = edgeCases(backends[0])
+    for backend in backends[1:]:
+        cases = edgeCases(backend)
+        same = all(np.array_equal(a, b) for a, b in zip(reference, cases))
+        names = ", ".join(EDGE_CASES)
+        print("%-8s matches %s on %s: %s" % (backend, backends[0], names, same))
+
+
+if __name__ == "__main__":
+    main()
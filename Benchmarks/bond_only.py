@@ -0,0 +1,59 @@
+# Bond-only LAMMPS output: only the written families are generated and typed
+#   python bond_only.py [nAtoms]   (at most 99999, pdb serial width)
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from GenTopo.Coord import PDBobj
+from GenTopo.Graph import MolGraph
+from GenTopo.LMPTopo import LammpsData
+
+
+def writeChain(fileName, nAtoms):
+    # zig-zag chain of united atoms with CONECT records, folded in rows
+    i = np.arange(nAtoms)
+    x = 1.25 * (i % 1000)
+    y = 0.9 * (i % 2) + 5.0 * (i // 1000)
+    with open(fileName, "w") as FH:
+        for k in range(nAtoms):
+            record = "ATOM  %5d  C   UNK     1    %8.3f%8.3f%8.3f" % (
+                k + 1,
+                x[k],
+                y[k],
+                0.0,
+            )
+            FH.write("%-80s CH2  0.000\n" % record)
+        for k in range(1, nAtoms):
+            FH.write("CONECT%5d%5d\n" % (k, k + 1))
+
+
+def main():
+    nAtoms = min(int(sys.argv[1]) if len(sys.argv) > 1 else 50000, 99999)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdbFile = os.path.join(tmp, "chain.pdb")
+        writeChain(pdbFile, nAtoms)
+        mol = PDBobj(pdbFile)
+
+        timings = {}
+        for name, sections in (("bonds", ("Bond",)), ("all", None)):
+            graph = MolGraph(mol)
+            start = time.perf_counter()
+            lmp = LammpsData(mol, graph)
+            if sections is None:
+                lmp.write(os.path.join(tmp, "all.lmp"))
+            else:
+                lmp.write(os.path.join(tmp, "bonds.lmp"), sections=sections)
+                lazy = graph._angles is None and graph._dihedrals is None
+                assert lazy, "bond-only output generated angles or dihedrals"
+            timings[name] = time.perf_counter() - start
+
+    print("bond-only %.3f s   all sections %.3f s" % (timings["bonds"], timings["all"]))
+    print("bond-only output left angles and dihedrals ungenerated: True")
+
+
+if __name__ == "__main__":
+    main()
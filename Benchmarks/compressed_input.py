@@ -0,0 +1,67 @@
+# End-to-end parse time of compressed vs. uncompressed pdb input
+#   python compressed_input.py [nAtoms]
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from GenTopo.Coord import PDBobj
+
+
+def writeSystem(fileName, nAtoms):
+    rng = np.random.default_rng(0)
+    xyz = rng.uniform(-99.0, 99.0, size=(nAtoms, 3))
+    with open(fileName, "w") as FH:
+        for i in range(nAtoms):
+            record = "ATOM  %5d C%-3d UNK  %4d    %8.3f%8.3f%8.3f" % (
+                (i + 1) % 100000,
+                i % 100,
+                i // 10 % 10000,
+                xyz[i, 0],
+                xyz[i, 1],
+                xyz[i, 2],
+            )
+            FH.write("%-80s CT%d  %.3f\n" % (record, i % 5, 0.1 * (i % 3)))
+        for i in range(1, min(nAtoms, 9999)):
+            FH.write("CONECT%5d%5d\n" % (i, i + 1))
+
+
+def compress(src, dst, opener):
+    with open(src, "rb") as fin, opener(dst, "wb") as fout:
+        shutil.copyfileobj(fin, fout, 1 << 20)
+
+
+def main():
+    nAtoms = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+        plain = os.path.join(tmpDir, "system.pdb")
+        writeSystem(plain, nAtoms)
+
+        files = [("plain", plain)]
+        for suffix, opener in (("gz", gzip.open), ("bz2", bz2.open), ("xz", lzma.open)):
+            fileName = plain + "." + suffix
+            compress(plain, fileName, opener)
+            files.append((suffix, fileName))
+
+        print("%-6s %12s %10s %10s" % ("input", "bytes", "ratio", "parse(s)"))
+        size0 = os.path.getsize(plain)
+        for label, fileName in files:
+            start = time.perf_counter()
+            mol = PDBobj(fileName)
+            elapsed = time.perf_counter() - start
+
+            size = os.path.getsize(fileName)
+            print("%-6s %12d %10.2f %10.3f" % (label, size, size0 / size, elapsed))
+
+        print("nAtoms: %d  nBonds: %d" % (mol.nAtoms, mol.nBonds))
+
+
+if __name__ == "__main__":
+    main()
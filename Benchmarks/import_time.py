@@ -0,0 +1,62 @@
+# Startup benchmark: import time of GenTopo entry points (python -X importtime)
+#   python import_time.py [nRuns]
+import os
+import subprocess
+import sys
+import time
+
+STATEMENTS = (
+    "import GenTopo",
+    "from GenTopo.PeriodicTable import masses",
+    "from GenTopo.Coord import PDBobj",
+    "from GenTopo.Graph import MolGraph",
+    "from GenTopo.GMXTopo import Topo",
+    "from GenTopo.Graph import MolGraph; import GenTopo.ImproperDihedral",
+)
+
+
+def importTime(statement):
+    """
+    Import time (ms) of statement in a fresh interpreter (sum over
+    top-level imports), whether numpy was loaded, and the wall time
+    of the process.
+    """
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+
+    total, numpy = 0.0, False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        numpy |= name.strip() == "numpy"
+        if not name.startswith("  ") and name.strip() != "site":
+            total += int(cumulative) / 1000
+    return total, numpy, wall * 1000
+
+
+def main():
+    nRuns = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    os.environ["PYTHONPATH"] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))]
+        + os.environ.get("PYTHONPATH", "").split(os.pathsep)
+    )
+
+    # wall time is reported above that of an empty interpreter
+    baseline = min(importTime("pass")[2] for _ in range(nRuns))
+    print("%-66s %10s %10s %6s" % ("statement", "import ms", "wall ms", "numpy"))
+    for statement in STATEMENTS:
+        runs = [importTime(statement) for _ in range(nRuns)]
+        total, numpy, wall = min(runs, key=lambda run: run[2])
+        print("%-66s %10.1f %10.1f %6s" % (statement, total, wall - baseline, numpy))
+
+
+if __name__ == "__main__":
+    main()
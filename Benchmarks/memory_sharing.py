@@ -0,0 +1,67 @@
+# Memory benchmark: deep-copied bond/type lists vs. shared read-only arrays
+#   python memory_sharing.py [nAtoms]
+import copy
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from GenTopo.Coord import PDBobj
+from GenTopo.Graph import MolGraph
+
+
+def writeChain(fileName, nAtoms):
+    # linear chain with a force-field type column and CONECT records
+    with open(fileName, "w") as FH:
+        for i in range(nAtoms):
+            record = "ATOM  %5d C    UNK  %4d    %8.3f%8.3f%8.3f" % (
+                i + 1,
+                i // 10 % 10000,
+                1.5 * i % 999,
+                0.0,
+                0.0,
+            )
+            FH.write("%-80s CT%d   0.000\n" % (record, i % 7))
+        for i in range(1, nAtoms):
+            FH.write("CONECT%5d%5d\n" % (i, i + 1))
+
+
+def peak(func):
+    tracemalloc.start()
+    result = func()
+    _, peakMem = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peakMem / 2 ** 20, result
+
+
+def main():
+    nAtoms = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+        fileName = os.path.join(tmpDir, "chain.pdb")
+        writeChain(fileName, nAtoms)
+        mol = PDBobj(fileName)
+
+    bondList = list(map(tuple, mol.bonds.tolist()))
+    typeList = mol.atomTypes.tolist()
+
+    def legacy():
+        bonds = copy.deepcopy(bondList)
+        atomTypes = sorted(set(copy.deepcopy(typeList)))
+        return bonds, atomTypes
+
+    def shared():
+        graph = MolGraph(mol)
+        return graph.bonds, sorted(set(mol.atomTypes))
+
+    legacyMem, _ = peak(legacy)
+    sharedMem, (bonds, _) = peak(shared)
+
+    print("nAtoms: %d  nBonds: %d" % (mol.nAtoms, mol.nBonds))
+    print("deepcopy of lists : %10.2f MiB" % legacyMem)
+    print("shared arrays     : %10.2f MiB" % sharedMem)
+    print("bonds shared      : %s" % (bonds is mol.bonds))
+
+
+if __name__ == "__main__":
+    main()
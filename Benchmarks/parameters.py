@@ -0,0 +1,73 @@
+# Topologies with force-field parameters on term lines are read by
+# TopoReader, Topo.read and TopoDiff, writing them again warns
+#   python parameters.py [nAtoms]
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+from GenTopo.GMXReader import TopoReader
+from GenTopo.GMXTopo import Topo
+from GenTopo.TopoDiff import TopoDiff
+
+
+def writeTopology(fileName, nAtoms):
+    # chain with parameters, mixed dihedral lines and an #ifdef block
+    i = np.arange(1, nAtoms + 1)
+    with open(fileName, "w") as FH:
+        FH.write("[ moleculetype ]\nMOL 3\n\n[ atoms ]\n")
+        for k in i.tolist():
+            FH.write("%6d CT 1 UNK C%d %6d 0.0 12.011\n" % (k, k, k))
+        FH.write("\n[ bonds ]\n")
+        np.savetxt(FH, np.column_stack((i[:-1], i[1:])), fmt="%d %d 1 0.153 224262.4")
+        FH.write("\n[ angles ]\n")
+        angles = np.column_stack((i[:-2], i[1:-1], i[2:]))
+        np.savetxt(FH, angles, fmt="%d %d %d 1 111.0 418.4  ; CT-CT-CT")
+        FH.write("\n#ifdef POSRES\n#include \"posre.itp\"\n#endif\n")
+        FH.write("\n[ dihedrals ]\n")
+        dihedrals = np.column_stack((i[:-3], i[1:-2], i[2:-1], i[3:]))
+        for n, row in enumerate(dihedrals.tolist()):
+            if n % 2:
+                FH.write("%d %d %d %d 9 0.0 0.65084 3\n" % tuple(row))
+            else:
+                FH.write("%d %d %d %d 3 0.6 1.8 0.0 -2.4 0.0 0.0\n" % tuple(row))
+    return dihedrals
+
+
+def main():
+    nAtoms = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        topFile = os.path.join(tmp, "params.top")
+        dihedrals = writeTopology(topFile, nAtoms)
+
+        start = time.perf_counter()
+        top = TopoReader(topFile)
+        elapsed = time.perf_counter() - start
+
+        assert len(top.terms["bonds"]) == nAtoms - 1
+        assert len(top.terms["angles"]) == nAtoms - 2
+        assert np.array_equal(top.terms["dihedrals"], dihedrals)
+        assert top.funcID("bonds") == 1 and top.funcID("angles") == 1
+        assert set(np.unique(top.funcs["dihedrals"]).tolist()) == {3, 9}
+
+        assert TopoDiff(topFile, topFile).identical
+        topo = Topo.read(topFile)
+        assert topo.molGraph.nBonds == nAtoms - 1
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            topo.write(os.path.join(tmp, "rewritten.top"))
+        message = str(caught[0].message) if caught else ""
+        for lost in ("parameters of [ bonds ]", "mixed funcs", "#include"):
+            assert lost in message, lost
+
+    print("read %d atoms with parameters in %.3f s" % (nAtoms, elapsed))
+    print("terms and funcs match: True")
+    print("rewrite warns about dropped parameters: True")
+
+
+if __name__ == "__main__":
+    main()
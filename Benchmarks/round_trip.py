@@ -0,0 +1,60 @@
+# Topology round trip: write, Topo.read and write again must not change anything
+#   python round_trip.py [pdbFile]
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+from GenTopo.Coord import PDBobj
+from GenTopo.Graph import MolGraph
+from GenTopo.GMXTopo import Topo
+from GenTopo.TopoDiff import TopoDiff
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), "..", "Examples", "test.pdb")
+
+# name: setup of the first topology
+CASES = {
+    "default": lambda topo: None,
+    "h-bond constraints": lambda topo: topo.setConstraints(hBonds=True),
+    "h-bond and h-angle constraints": lambda topo: topo.setConstraints(
+        hBonds=True, hAngles=True
+    ),
+    "exclusions": lambda topo: topo.setExclusions(3, exclusionDepth=5),
+}
+
+
+def counts(topo):
+    return (len(topo.bondTypes), len(topo.angleTypes), len(topo.dihedralTypes))
+
+
+def main():
+    pdbFile = sys.argv[1] if len(sys.argv) > 1 else EXAMPLE
+    mol = PDBobj(pdbFile)
+    graph = MolGraph(mol, guessImpropers=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second = os.path.join(tmp, "a.top"), os.path.join(tmp, "b.top")
+        for name, setup in CASES.items():
+            topo = Topo(mol, graph)
+            topo.setExclusions(3)
+            setup(topo)
+            topo.write(first)
+
+            start = time.perf_counter()
+            read = Topo.read(first)
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")  # nothing may be dropped
+                read.write(second)
+            elapsed = time.perf_counter() - start
+
+            with open(first) as a, open(second) as b:
+                same = a.read() == b.read()
+            identical = TopoDiff(first, second).identical
+            assert counts(topo) == counts(read), (counts(topo), counts(read))
+            assert same and identical, name
+            print("%-32s read+write %.3f s  identical: %s" % (name, elapsed, same))
+
+
+if __name__ == "__main__":
+    main()
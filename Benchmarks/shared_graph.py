@@ -0,0 +1,51 @@
+# Fan-out benchmark: pickled MolGraph vs. shared-memory handle per worker
+#   python shared_graph.py [nAtoms] [nWorkers]
+import multiprocessing
+import pickle
+import sys
+import time
+
+import numpy as np
+
+from GenTopo.Graph import MolGraph
+
+
+def chain(nAtoms):
+    bonds = np.column_stack((np.arange(1, nAtoms), np.arange(2, nAtoms + 1)))
+    return MolGraph(bonds).materialize()
+
+
+def countPickled(graph):
+    return int(graph.dihedrals[:, 0].sum() % 97)
+
+
+def countShared(handle):
+    graph = MolGraph.attach(handle)
+    return int(graph.dihedrals[:, 0].sum() % 97)
+
+
+def main():
+    nAtoms = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    nWorkers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    graph = chain(nAtoms)
+    print("pickled graph: %.1f MB" % (len(pickle.dumps(graph)) / 2 ** 20))
+
+    with multiprocessing.Pool(nWorkers) as pool:
+        start = time.perf_counter()
+        pickled = pool.map(countPickled, [graph] * nWorkers)
+        print("pickled      %8.3f s" % (time.perf_counter() - start))
+
+        handle = graph.share()
+        try:
+            start = time.perf_counter()
+            shared = pool.map(countShared, [handle] * nWorkers)
+            print("shared       %8.3f s" % (time.perf_counter() - start))
+        finally:
+            graph.unshare()
+
+    print("same results:", pickled == shared)
+
+
+if __name__ == "__main__":
+    main()
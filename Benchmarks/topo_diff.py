@@ -0,0 +1,46 @@
+# Topology diff: reads two synthetic topologies and compares them
+#   python topo_diff.py [nAtoms] [nTerms]
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from GenTopo.TopoDiff import TopoDiff
+
+
+def writeTopology(fileName, terms, types):
+    with open(fileName, "w") as FH:
+        FH.write("[ moleculetype ]\nMOL 3\n\n[ atoms ]\n")
+        for i, atomType in enumerate(types):
+            FH.write("%6d %6s 1 UNK C%d %6d 0.0\n" % (i + 1, atomType, i, i + 1))
+        FH.write("\n[ dihedrals ]\n")
+        np.savetxt(FH, terms, fmt="%d %d %d %d 9")
+
+
+def main():
+    nAtoms = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    nTerms = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+
+    rng = np.random.default_rng(0)
+    terms = rng.integers(1, nAtoms + 1, size=(nTerms, 4))
+    types = np.array(["T%d" % (i % 7) for i in range(nAtoms)])
+
+    # new: one term dropped, one atom retyped, all terms reversed
+    newTypes = types.copy()
+    newTypes[0] = "TX"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ref, new = os.path.join(tmp, "ref.top"), os.path.join(tmp, "new.top")
+        writeTopology(ref, terms, types)
+        writeTopology(new, terms[1:, ::-1], newTypes)
+
+        start = time.perf_counter()
+        diff = TopoDiff(ref, new)
+        print("diff of %d terms: %.2f s" % (nTerms, time.perf_counter() - start))
+        diff.report(nShow=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+# File name: Example/test4.py
+from GenTopo.Coord import PDBobj
+from GenTopo.Graph import MolGraph
+from GenTopo.GMXTopo import Topo
+from GenTopo.PSFTopo import PSF
+from GenTopo.LMPTopo import LammpsData
+
+mol = PDBobj("test.pdb")
+graph = MolGraph(mol, guessImpropers=True)
+
+Topo(mol, graph).write("topol.top")
+PSF(mol, graph).write("topol.psf")
+LammpsData(mol, graph).write("data.lmp")
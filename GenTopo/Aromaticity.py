@@ -0,0 +1,198 @@
+from GenTopo.ArrayUtil import readOnly, adjacency, pairKeys
+from GenTopo.ImproperDihedral import batchDihedrals
+from GenTopo.PeriodicTable import valences
+from GenTopo.Kernels import ringBonds
+import numpy as np
+
+# elements that can be part of a conjugated ring
+AROMATIC_ELEMENTS = ("B", "C", "N", "O", "P", "S", "Se")
+
+
+class Aromaticity:
+    """
+    Ring, aromaticity and bond-order perception of a MolGraph.
+
+    Ring bonds are all bonds that are not bridges. A ring bond is aromatic
+    if both atoms can be part of a conjugated ring (B, C, N, O, P, S or Se
+    with at most three neighbors) and the ring is planar around the bond,
+    i.e. the torsion through it is close to 0 or 180 degree (minimum-image
+    torsions if the PDBobj has a box). Atoms with two or more aromatic
+    bonds are aromatic.
+
+    Bond orders are 1.5 for aromatic bonds and 2 for bonds between other
+    unsaturated atoms (by valence, trigonal carbons must be planar), matched
+    greedily with terminal atoms first. In united-atom models only
+    aromatic bond orders are reliable.
+
+    Everything is computed once, in bulk, and stored in arrays indexed by
+    1-based atom id or by bond index, so queries are O(1). A graph created
+    from a bond list has no elements and coordinates, there only ring
+    perception is available.
+
+    Example:
+        aromaticity = graph.aromaticity
+        aromaticity.isAromatic(5)
+        aromaticity.bondOrder(5, 6)
+    """
+
+    def __init__(self, graph, cutoff=15.0):
+        self.cutoff = cutoff
+        self.bonds = np.asarray(graph.bonds, dtype=np.int64).reshape(-1, 2)
+        self.nBonds = len(self.bonds)
+
+        coordObj = graph.coordObj
+        if coordObj is not None:
+            self.nAtoms = coordObj.nAtoms
+        else:
+            self.nAtoms = int(self.bonds.max()) if self.nBonds else 0
+
+        self.indptr, self.indices, self.edges = adjacency(
+            self.bonds, self.nAtoms, edgeIDs=True
+        )
+        self.degree = readOnly(np.diff(self.indptr))
+
+        # sorted bond keys for vectorized bond lookup
+        keys = pairKeys(np.sort(self.bonds, axis=1))
+        self._order = np.argsort(keys)
+        self._keys = keys[self._order]
+
+        self.ringBond = readOnly(ringBonds(self.bonds, self.nAtoms))
+        ringAtom = np.zeros(self.nAtoms + 1, dtype=bool)
+        ringAtom[self.bonds[self.ringBond].ravel()] = True
+        self.ringAtom = readOnly(ringAtom)
+
+        if coordObj is not None:
+            self.elements = np.concatenate(([""], coordObj.elements))
+            self.coords = np.asarray(coordObj.frames[0], dtype=np.float64)
+            self.box, self.lpbc = coordObj.box, coordObj.lpbc
+        else:
+            self.elements = np.full(self.nAtoms + 1, "")
+            self.coords = None
+
+        self.planar = readOnly(self.perceivePlanar())
+        self.aromaticBond, self.aromaticAtom = self.perceiveAromatic()
+        self.bondOrders = readOnly(self.perceiveBondOrders())
+
+    def otherNeighbor(self, atoms, exclude):
+        # a neighbor of every atom other than exclude, atoms need >= 2 neighbors
+        first = self.indices[self.indptr[atoms]]
+        second = self.indices[self.indptr[atoms] + 1]
+        return np.where(first == exclude, second, first)
+
+    def deviation(self, dihedrals):
+        # deviation of dihedrals from planarity (0 or 180 degree)
+        angles = batchDihedrals(self.coords, dihedrals, box=self.box, lpbc=self.lpbc)
+        angles = np.abs(angles[0])
+        return np.minimum(angles, 180.0 - angles)
+
+    def perceivePlanar(self):
+        # trigonal atoms lying in the plane of their three neighbors
+        planar = np.zeros(self.nAtoms + 1, dtype=bool)
+        centers = np.flatnonzero(self.degree == 3)
+        if self.coords is None or not len(centers):
+            return planar
+
+        start = self.indptr[centers]
+        dihedrals = np.stack(
+            (centers, self.indices[start], self.indices[start + 1], self.indices[start + 2]),
+            axis=1,
+        )
+        planar[centers] = self.deviation(dihedrals) < self.cutoff
+        return planar
+
+    def perceiveAromatic(self):
+        capable = (
+            self.ringAtom
+            & (self.degree <= 3)
+            & np.isin(self.elements, AROMATIC_ELEMENTS)
+        )
+
+        a, b = self.bonds.T
+        aromaticBond = self.ringBond & capable[a] & capable[b]
+
+        if self.coords is not None:
+            index = np.flatnonzero(aromaticBond)
+            ai, bi = a[index], b[index]
+            dihedrals = np.stack(
+                (self.otherNeighbor(ai, bi), ai, bi, self.otherNeighbor(bi, ai)),
+                axis=1,
+            )
+            aromaticBond[index] = self.deviation(dihedrals) < self.cutoff
+
+        counts = np.bincount(
+            self.bonds[aromaticBond].ravel(), minlength=self.nAtoms + 1
+        )
+        aromaticAtom = counts >= 2
+        aromaticBond &= aromaticAtom[a] & aromaticAtom[b]
+
+        return readOnly(aromaticBond), readOnly(aromaticAtom)
+
+    def perceiveBondOrders(self):
+        bondOrders = np.ones(self.nBonds)
+        bondOrders[self.aromaticBond] = 1.5
+
+        names, inverse = np.unique(self.elements, return_inverse=True)
+        valence = np.array([valences.get(name, 0) for name in names.tolist()])[inverse]
+        unsaturated = (
+            (valence - self.degree >= 1)
+            & ~self.aromaticAtom
+            & ((self.elements != "C") | ((self.degree == 3) & self.planar))
+        )
+
+        a, b = self.bonds.T
+        index = np.flatnonzero(unsaturated[a] & unsaturated[b])
+        minDegree = np.minimum(self.degree[a[index]], self.degree[b[index]])
+        index = index[np.argsort(minDegree, kind="stable")]
+
+        free = unsaturated.tolist()
+        for bond, (i, j) in zip(index.tolist(), self.bonds[index].tolist()):
+            if free[i] and free[j]:
+                bondOrders[bond] = 2.0
+                free[i] = free[j] = False
+
+        return bondOrders
+
+    def bondIndex(self, pairs):
+        # indices of (n, 2) atom pairs in bonds, -1 if not bonded
+        pairs = np.sort(np.asarray(pairs, dtype=np.int64).reshape(-1, 2), axis=1)
+        keys = pairKeys(pairs)
+        if not self.nBonds:
+            return np.full(len(keys), -1)
+        pos = np.minimum(np.searchsorted(self._keys, keys), self.nBonds - 1)
+        return np.where(self._keys[pos] == keys, self._order[pos], -1)
+
+    def ringBondMask(self, pairs):
+        # True for every pair that is a ring bond
+        index = self.bondIndex(pairs)
+        mask = np.zeros(len(index), dtype=bool)
+        mask[index >= 0] = self.ringBond[index[index >= 0]]
+        return mask
+
+    def lookup(self, i, j):
+        # bond index of (i, j) through the sorted neighbors of i
+        start, end = self.indptr[i], self.indptr[i + 1]
+        pos = start + np.searchsorted(self.indices[start:end], j)
+        if pos < end and self.indices[pos] == j:
+            return self.edges[pos]
+        return -1
+
+    def isRingAtom(self, atom):
+        return bool(self.ringAtom[atom])
+
+    def isAromatic(self, atom):
+        return bool(self.aromaticAtom[atom])
+
+    def isPlanar(self, atom):
+        return bool(self.planar[atom])
+
+    def isRingBond(self, i, j):
+        bond = self.lookup(i, j)
+        return bond >= 0 and bool(self.ringBond[bond])
+
+    def isAromaticBond(self, i, j):
+        bond = self.lookup(i, j)
+        return bond >= 0 and bool(self.aromaticBond[bond])
+
+    def bondOrder(self, i, j):
+        bond = self.lookup(i, j)
+        return float(self.bondOrders[bond]) if bond >= 0 else 0.0
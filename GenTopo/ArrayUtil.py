@@ -0,0 +1,193 @@
+import numpy as np
+
+
+def readOnly(array):
+    """
+    Marks a numpy array as read-only, so that it can be shared
+    between PDBobj, MolGraph and Topo without defensive copies.
+    """
+
+    array.flags.writeable = False
+    return array
+
+
+def termArray(terms, width, dtype=np.int32):
+    # (n, width) read-only array from a list of tuples/array,
+    # arrays of matching dtype are wrapped in a view without copy
+    array = np.asarray(terms, dtype=dtype).reshape(-1, width)
+    return readOnly(array)
+
+
+def pairKeys(pairs):
+    # packs (i, j) pairs into sortable int64 keys
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    return (pairs[:, 0] << 32) | pairs[:, 1]
+
+
+def keysToPairs(keys):
+    return np.stack((keys >> 32, keys & 0xFFFFFFFF), axis=1)
+
+
+def adjacency(bonds, nAtoms, edgeIDs=False):
+    """
+    CSR adjacency of 1-based bonds: neighbors of atom i are
+    indices[indptr[i]:indptr[i + 1]], sorted (row 0 is unused).
+    With edgeIDs, also returns the bond index of every entry.
+    """
+
+    bonds = np.asarray(bonds, dtype=np.int64).reshape(-1, 2)
+    src = np.concatenate((bonds[:, 0], bonds[:, 1]))
+    dst = np.concatenate((bonds[:, 1], bonds[:, 0]))
+
+    order = np.lexsort((dst, src))
+    indices = dst[order]
+    counts = np.bincount(src, minlength=nAtoms + 1)
+    indptr = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    if edgeIDs:
+        edges = np.tile(np.arange(len(bonds)), 2)[order]
+        return indptr, indices, edges
+    return indptr, indices
+
+
+def canonicalTerms(terms):
+    # orients terms so that first atom < last atom, as getNext does
+    terms = np.asarray(terms).reshape(len(terms), -1)
+    flip = terms[:, 0] > terms[:, -1]
+    return np.where(flip[:, None], terms[:, ::-1], terms)
+
+
+def neighborPairs(indptr, indices, atoms):
+    """
+    For every atom in atoms, yields all of its neighbors: returns
+    (row, neighbor) where row indexes into atoms.
+    """
+
+    atoms = np.asarray(atoms, dtype=np.int64)
+    degree = indptr[atoms + 1] - indptr[atoms]
+    row = np.repeat(np.arange(len(atoms)), degree)
+    offset = np.arange(len(row)) - np.repeat(np.cumsum(degree) - degree, degree)
+
+    return row, indices[indptr[atoms[row]] + offset]
+
+
+def uniqueRows(terms):
+    # lexicographically sorted unique rows of a 2D integer array
+    terms = np.asarray(terms)
+    if len(terms) == 0:
+        return terms
+
+    order = np.lexsort(terms.T[::-1])
+    terms = terms[order]
+    keep = np.ones(len(terms), dtype=bool)
+    keep[1:] = (terms[1:] != terms[:-1]).any(axis=1)
+
+    return terms[keep]
+
+
+def rowKeys(terms):
+    """
+    Packs the rows of a non-negative 2D integer array into as few
+    int64 columns as the largest value allows; lexicographic order
+    of the keys (np.lexsort(keys.T[::-1])) is that of the rows.
+    """
+
+    terms = np.asarray(terms, dtype=np.int64)
+    bits = max(int(terms.max(initial=0)).bit_length(), 1)
+    perKey = max(63 // bits, 1)
+
+    keys = []
+    for start in range(0, terms.shape[1], perKey):
+        key = np.zeros(len(terms), dtype=np.int64)
+        for column in terms.T[start : start + perKey]:
+            key = (key << bits) | column
+        keys.append(key)
+    return np.stack(keys, axis=1)
+
+
+def rowOrder(keys):
+    # stable lexicographic sort order of rows of rowKeys
+    if keys.shape[1] == 1:
+        return np.argsort(keys[:, 0], kind="stable")
+    return np.lexsort(keys.T[::-1])
+
+
+def uniqueKeys(keys):
+    # sorted unique values, sort + adjacent compare is faster than
+    # the hash based np.unique for large integer arrays
+    keys = np.sort(keys)
+    keep = np.ones(len(keys), dtype=bool)
+    keep[1:] = keys[1:] != keys[:-1]
+    return keys[keep]
+
+
+def uniquePairs(pairs):
+    # sorted unique (i, j) pairs through packed int64 keys
+    return keysToPairs(uniqueKeys(pairKeys(pairs)))
+
+
+def selectionMask(atoms, nAtoms):
+    """
+    Boolean mask indexed by 1-based atom id (entry 0 is unused) of a
+    selection given as a boolean mask over atoms or as 1-based indices.
+    """
+
+    atoms = np.asarray(atoms)
+    mask = np.zeros(nAtoms + 1, dtype=bool)
+    if atoms.dtype == bool:
+        mask[1 : len(atoms) + 1] = atoms
+    else:
+        mask[atoms.astype(np.int64)] = True
+    return mask
+
+
+def renumber(mask):
+    # new 1-based ids of the selected atoms of selectionMask, 0 elsewhere
+    return np.where(mask, np.cumsum(mask), 0)
+
+
+def filterTerms(terms, mask, newIDs):
+    # terms with all atoms selected, renumbered; order is preserved
+    terms = np.asarray(terms)
+    keep = mask[terms].all(axis=1)
+    return termArray(newIDs[terms[keep]], terms.shape[1])
+
+
+def inSorted(keys, sortedKeys):
+    # membership of keys in a sorted key array, by binary search
+    if len(sortedKeys) == 0:
+        return np.zeros(len(keys), dtype=bool)
+    pos = np.minimum(np.searchsorted(sortedKeys, keys), len(sortedKeys) - 1)
+    return sortedKeys[pos] == keys
+
+
+def bondShells(bonds, nAtoms, depth):
+    """
+    Atom pairs by shortest bond path: list of depth read-only (n, 2)
+    arrays of sorted 1-based pairs i < j, the d-th holding the pairs
+    d bonds apart. Bounded BFS from all atoms at once, every step
+    extends the directed pairs of the frontier by the CSR neighbors
+    of their last atom and drops pairs seen at a shorter distance.
+    """
+
+    bonds = np.asarray(bonds, dtype=np.int64).reshape(-1, 2)
+    indptr, indices = adjacency(bonds, nAtoms)
+
+    frontier = uniqueKeys(np.concatenate((pairKeys(bonds), pairKeys(bonds[:, ::-1]))))
+    atoms = np.arange(1, nAtoms + 1)
+    visited = np.sort(np.concatenate((frontier, pairKeys(np.stack((atoms, atoms), 1)))))
+
+    shells = []
+    for distance in range(1, depth + 1):
+        if distance > 1:
+            pairs = keysToPairs(frontier)
+            row, neighbors = neighborPairs(indptr, indices, pairs[:, 1])
+            keys = uniqueKeys(pairKeys(np.stack((pairs[row, 0], neighbors), 1)))
+            frontier = keys[~inSorted(keys, visited)]
+            visited = np.sort(np.concatenate((visited, frontier)))
+
+        pairs = keysToPairs(frontier)
+        shells.append(termArray(pairs[pairs[:, 0] < pairs[:, 1]], 2))
+
+    return shells
@@ -0,0 +1,140 @@
+"""
+Compact binary container for numpy arrays.
+
+Layout: 8 byte magic, uint32 version, uint32 header length, a JSON
+header and raw array blocks, every block aligned to 64 bytes. The
+header stores dtype, shape and offset of each array, so a file
+(or any buffer, e.g. shared memory) can be mapped and arrays used in
+place, read-only, without parsing or copying.
+"""
+
+import json
+import numpy as np
+
+from GenTopo.Warning import bad_binary_file
+
+MAGIC = b"GENTOPOB"
+VERSION = 1
+ALIGN = 64
+
+_PREFIX = np.dtype([("magic", "S8"), ("version", "<u4"), ("headerLen", "<u4")])
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def layout(kind, arrays, attrs=None):
+    """
+    Returns encoded header, contiguous arrays, data start and total
+    size for arrays (a dict name -> ndarray). Offsets in the header
+    are relative to the data start.
+    """
+
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    table = {}
+    offset = 0
+    for name, array in arrays.items():
+        table[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = _align(offset + array.nbytes)
+
+    header = {"kind": kind, "attrs": attrs or {}, "arrays": table}
+    headerBytes = json.dumps(header).encode()
+    dataStart = _align(_PREFIX.itemsize + len(headerBytes))
+
+    return headerBytes, arrays, dataStart, dataStart + offset
+
+
+def writeInto(buffer, kind, arrays, attrs=None):
+    # packs arrays into a writable buffer of at least size() bytes
+    headerBytes, arrays, dataStart, total = layout(kind, arrays, attrs)
+    view = np.frombuffer(buffer, dtype=np.uint8, count=total)
+
+    prefix = np.array([(MAGIC, VERSION, len(headerBytes))], dtype=_PREFIX)
+    view[: _PREFIX.itemsize] = prefix.view(np.uint8)
+    view[_PREFIX.itemsize : _PREFIX.itemsize + len(headerBytes)] = np.frombuffer(
+        headerBytes, dtype=np.uint8
+    )
+
+    header = json.loads(headerBytes)
+    for name, array in arrays.items():
+        start = dataStart + header["arrays"][name]["offset"]
+        view[start : start + array.nbytes] = array.reshape(-1).view(np.uint8)
+
+    return total
+
+
+def size(kind, arrays, attrs=None):
+    return layout(kind, arrays, attrs)[3]
+
+
+def readFrom(buffer, kind):
+    """
+    Returns (arrays, attrs) with arrays viewing the buffer directly.
+    """
+
+    raw = np.frombuffer(buffer, dtype=np.uint8)
+    if len(raw) < _PREFIX.itemsize:
+        raise RuntimeError(bad_binary_file)
+
+    prefix = raw[: _PREFIX.itemsize].view(_PREFIX)[0]
+    if prefix["magic"] != MAGIC or prefix["version"] != VERSION:
+        raise RuntimeError(bad_binary_file)
+
+    start = _PREFIX.itemsize
+    headerLen = int(prefix["headerLen"])
+    header = json.loads(bytes(raw[start : start + headerLen]))
+    if header["kind"] != kind:
+        raise RuntimeError(bad_binary_file)
+
+    dataStart = _align(start + headerLen)
+
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        count = int(np.prod(shape))
+        offset = dataStart + entry["offset"]
+        array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        array = array.reshape(shape)
+        array.flags.writeable = False
+        arrays[name] = array
+
+    return arrays, header["attrs"]
+
+
+def save(fileName, kind, arrays, attrs=None):
+    headerBytes, arrays, dataStart, total = layout(kind, arrays, attrs)
+    header = json.loads(headerBytes)
+
+    with open(fileName, "wb") as FH:
+        prefix = np.array([(MAGIC, VERSION, len(headerBytes))], dtype=_PREFIX)
+        FH.write(prefix.tobytes())
+        FH.write(headerBytes)
+
+        for name, array in arrays.items():
+            offset = dataStart + header["arrays"][name]["offset"]
+            FH.write(b"\0" * (offset - FH.tell()))
+            FH.write(array.tobytes())
+
+        FH.write(b"\0" * (total - FH.tell()))
+
+
+def load(fileName, kind, mmap=True):
+    """
+    With mmap, arrays are read-only views into a memory map of the
+    file, loading costs only the header parse and pages are shared
+    between processes reading the same file.
+    """
+
+    if mmap:
+        buffer = np.memmap(fileName, dtype=np.uint8, mode="r")
+    else:
+        buffer = np.fromfile(fileName, dtype=np.uint8)
+
+    return readFrom(buffer, kind)
@@ -0,0 +1,140 @@
+"""
+Chunked bulk formatting of topology sections.
+
+Instead of formatting one line at a time, a chunk of rows is
+formatted with a single %-operation on a repeated line format,
+which moves the per-line loop from python into C.
+
+Written to an OrderedWriter, chunks are formatted in a thread or
+process pool instead, while a writer thread streams them to disk in
+order.
+"""
+
+from itertools import chain
+import queue
+import threading
+import numpy as np
+
+CHUNK_SIZE = 65536
+
+
+class OrderedWriter:
+    """
+    File-like wrapper of FH for overlapping formatting and disk I/O.
+    Text written with write() and chunks passed to submit() are
+    queued in order; submitted chunks are formatted by nWorkers
+    threads (or processes) and a dedicated writer thread writes
+    everything to FH in the original order. At most maxPending
+    pieces are queued, which bounds memory. close() waits for the
+    writer and closes FH.
+    """
+
+    def __init__(self, FH, nWorkers=4, processes=False, maxPending=64):
+        from concurrent import futures
+
+        self.FH = FH
+        if processes:
+            self.pool = futures.ProcessPoolExecutor(max_workers=nWorkers)
+        else:
+            self.pool = futures.ThreadPoolExecutor(max_workers=nWorkers)
+        self.pending = queue.Queue(maxsize=maxPending)
+        self.error = None
+
+        self.writer = threading.Thread(target=self.drain, daemon=True)
+        self.writer.start()
+
+    def drain(self):
+        while True:
+            piece = self.pending.get()
+            if piece is None:
+                return
+            if self.error is not None:
+                continue  # keep consuming so producers are not blocked
+            try:
+                if not isinstance(piece, str):
+                    piece = piece.result()  # a Future of submit
+                self.FH.write(piece)
+            except Exception as error:
+                self.error = error
+
+    def write(self, text):
+        self.pending.put(text)
+
+    def submit(self, func, *args):
+        self.pending.put(self.pool.submit(func, *args))
+
+    def close(self):
+        self.pending.put(None)
+        self.writer.join()
+        self.pool.shutdown()
+        self.FH.close()
+
+        if self.error is not None:
+            raise self.error
+
+
+def emit(FH, func, *args):
+    # writes func(*args), formatted in the pool of an OrderedWriter
+    if isinstance(FH, OrderedWriter):
+        FH.submit(func, *args)
+    else:
+        FH.write(func(*args))
+
+
+def formatRows(fmt, chunk):
+    # a chunk of rows (2D array or list of tuples) as text
+    if isinstance(chunk, np.ndarray):
+        return (fmt * len(chunk)) % tuple(chunk.ravel().tolist())
+    return (fmt * len(chunk)) % tuple(chain.from_iterable(chunk))
+
+
+def formatColumns(fmt, chunk):
+    # a chunk of columns (list of lists) as text
+    return (fmt * len(chunk[0])) % tuple(chain.from_iterable(zip(*chunk)))
+
+
+def _toList(column):
+    if isinstance(column, np.ndarray):
+        return column.tolist()
+    return list(column)
+
+
+def writeRows(FH, fmt, rows, chunkSize=CHUNK_SIZE):
+    """
+    Writes a 2D array (or list of tuples) using a line format
+    such as "%6d  %6d\\n" for every row.
+    """
+
+    for start in range(0, len(rows), chunkSize):
+        emit(FH, formatRows, fmt, rows[start : start + chunkSize])
+
+
+def writeColumns(FH, fmt, columns, chunkSize=CHUNK_SIZE):
+    """
+    Writes rows made of several 1D columns, which may have
+    different types (e.g. index, type name, charge).
+    """
+
+    nRows = len(columns[0]) if columns else 0
+    for start in range(0, nRows, chunkSize):
+        chunk = [_toList(column[start : start + chunkSize]) for column in columns]
+        emit(FH, formatColumns, fmt, chunk)
+
+
+def writeWrapped(FH, fmt, terms, perLine, chunkSize=CHUNK_SIZE):
+    """
+    Writes terms several per line (e.g. 4 bonds per line in PSF),
+    fmt is the format of one field.
+    """
+
+    terms = np.asarray(terms)
+    width = terms.shape[1] if terms.ndim == 2 else 1
+    flat = terms.reshape(-1)
+
+    nFull = len(terms) // perLine * perLine * width
+    lineFmt = fmt * (perLine * width) + "\n"
+    writeRows(FH, lineFmt, flat[:nFull].reshape(-1, perLine * width), chunkSize)
+
+    if nFull < len(flat):
+        rest = flat[nFull:].tolist()
+        FH.write((fmt * len(rest) + "\n") % tuple(rest))
@@ -1,126 +1,563 @@
-from GenTopo.PeriodicTable import elements
-from GenTopo.Warning import non_orthogonal_box, connectivity_missing
+from GenTopo.PeriodicTable import vdwRadii, atomicNumbers, atomicMasses, guessElements
+from GenTopo.ArrayUtil import (
+    readOnly,
+    termArray,
+    uniquePairs,
+    selectionMask,
+    renumber,
+    filterTerms,
+)
+from GenTopo.Kernels import searchBonds
+from GenTopo import BinaryIO, Profiler
+from GenTopo.Warning import (
+    non_orthogonal_box,
+    connectivity_missing,
+    inconsistent_models,
+    conect_unreadable,
+)
+import importlib
+import io
+import os
+import warnings
+import numpy as np
+
+
+BUFFER_SIZE = 1 << 20
+
+# compression modules are imported when a compressed file is opened
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "lzma"),
+)
+
+
+def compression(coordFile):
+    # returns opener of a compressed file (by magic bytes) or None
+    with open(coordFile, "rb") as FH:
+        head = FH.read(6)
+
+    for magic, module in _MAGIC:
+        if head.startswith(magic):
+            return importlib.import_module(module).open
+    return None
+
+
+def openCoordFile(coordFile):
+    """
+    Opens a (possibly gzip/bz2/xz compressed) pdb file for reading
+    text, decompressing on the fly through large buffers.
+    """
+
+    opener = compression(coordFile)
+    if opener is None:
+        return open(coordFile, "r", buffering=BUFFER_SIZE)
+
+    raw = io.BufferedReader(opener(coordFile, "rb"), buffer_size=BUFFER_SIZE)
+    return io.TextIOWrapper(raw)
+
+
+def conectPairs(lines):
+    """
+    Parses CONECT records from their fixed 5-column fields (serial
+    in columns 7-11, bonded atoms in 12-16, 17-21, ...), so serials
+    that run together are read correctly. Lines whose fields are not
+    right justified integers are read by conectSerials. Returns
+    sorted unique (i, j) pairs with i <= j and the indices of the
+    records that fit no format.
+    """
+
+    pairs = [np.zeros((0, 2), dtype=np.int64)]
+    if not lines:
+        return pairs[0], []
+
+    lines = [line.rstrip("\r\n") for line in lines]
+    nFields = max(1, (max(len(line) for line in lines) - 6 + 4) // 5)
+    width = 6 + 5 * nFields
+
+    text = "".join(line.ljust(width) for line in lines).encode()
+    chars = np.frombuffer(text, dtype=np.uint8).reshape(len(lines), width)
+    fields = chars[:, 6:].reshape(len(lines), nFields, 5)
+
+    isDigit = (fields >= 48) & (fields <= 57)
+    isSpace = fields == 32
+    valid = np.all(isDigit | isSpace, axis=(1, 2))
+    # no blank after a digit inside a field
+    valid &= ~np.any(isSpace & np.maximum.accumulate(isDigit, axis=2), axis=(1, 2))
+    # bonded atom fields are blank or hold a number, serial must be present
+    blank = np.all(isSpace, axis=2)
+    valid &= ~blank[:, 0]
+
+    digits = np.where(isDigit, fields - 48, 0).astype(np.int64)
+    values = digits @ (10 ** np.arange(4, -1, -1, dtype=np.int64))
+
+    rows = np.flatnonzero(valid)
+    iatom = np.repeat(values[rows, 0], nFields - 1)
+    jatom = values[rows, 1:].reshape(-1)
+    present = ~blank[rows, 1:].reshape(-1)
+    iatom, jatom = iatom[present], jatom[present]
+    pairs.append(np.column_stack((np.minimum(iatom, jatom), np.maximum(iatom, jatom))))
+
+    unreadable = []
+    for r in np.flatnonzero(~valid).tolist():
+        serials = conectSerials(lines[r])
+        if serials is None:
+            unreadable.append(r)
+            continue
+        iatom = serials[0] if serials else 0
+        for jatom in serials[1:]:
+            pairs.append(np.array([[min(iatom, jatom), max(iatom, jatom)]]))
+
+    return uniquePairs(np.concatenate(pairs)), unreadable
+
+
+def hybrid36(field):
+    # value of a 5-character hybrid-36 serial (A0000 is 100000), or None
+    if field.isdigit():
+        return int(field)
+    if len(field) != 5 or not (field.isascii() and field.isalnum()):
+        return None
+    if not field[0].isalpha():
+        return None
+    if field.isupper():
+        return int(field, 36) - 10 * 36**4 + 10**5
+    if field.islower():
+        return int(field, 36) + 16 * 36**4 + 10**5
+    return None
+
+
+def decimal(field):
+    # value of a decimal serial, or None
+    return int(field) if field.isdigit() else None
+
+
+def conectSerials(line):
+    """
+    Serials of a CONECT record that is not in 5-column decimal
+    fields: whitespace separated, 6-column fields (serials from
+    100000 that run together) or 5-column hybrid-36 fields. A bare
+    record has none, None if no format fits.
+    """
+
+    body = line[6:].rstrip()
+    keys = body.split()
+    if len(keys) != 1 and all(key.isdigit() for key in keys):
+        return [int(key) for key in keys]
+
+    for width, decode in ((6, decimal), (5, hybrid36)):
+        fields = [body[i : i + width] for i in range(0, len(body), width)]
+        serials = [decode(field.strip()) for field in fields if field.strip()]
+        if None not in serials:
+            return serials
+    return None
+
+
+def parseLines(lines):
+    """
+    Parses ATOM/HETATM, ENDMDL and CONECT records of pdb lines
+    into arrays. model is the number of ENDMDL records seen before
+    each atom, ffOK tells if the atom has atomType (and charge)
+    after the 80th column, elements holds columns 77-78.
+    """
+
+    symbols = []
+    elements = []
+    resNames = []
+    resIDs = []
+    xyz = []
+    model = []
+    atomTypes = []
+    atomQQs = []
+    ffOK = []
+    conect = []
+    nEndMdl = 0
+    nConect = 0
+
+    conectLines = []
+    lineNo = 0
+
+    for lineNo, line in enumerate(lines, 1):
+        if line.startswith("HETATM") or line.startswith("ATOM"):
+            symbols.append(line[12:16].strip())
+            elements.append(line[76:78].strip())
+            resNames.append(line[17:20])
+            resIDs.append(int(line[22:26]))
+            xyz.append((float(line[30:38]), float(line[38:46]), float(line[46:54])))
+            model.append(nEndMdl)
+
+            try:
+                atomType, qq = PDBobj.splitLine(line)
+                ffOK.append(True)
+            except:
+                atomType, qq = "", 0.0
+                ffOK.append(False)
+            atomTypes.append(atomType)
+            atomQQs.append(qq)
+
+        elif line.startswith("ENDMDL"):
+            nEndMdl += 1
+
+        elif line.startswith("CONECT"):
+            nConect += 1
+            conect.append(line)
+            conectLines.append(lineNo)
+
+    bonds, unreadable = conectPairs(conect)
+    records = {
+        "symbols": np.array(symbols, dtype=str),
+        "elements": np.array(elements, dtype=str),
+        "resNames": np.array(resNames, dtype=str),
+        "resIDs": np.array(resIDs, dtype=np.int32),
+        "xyz": np.array(xyz, dtype=np.float64).reshape(-1, 3),
+        "model": np.array(model, dtype=np.int32),
+        "atomTypes": np.array(atomTypes, dtype=str),
+        "atomQQs": np.array(atomQQs, dtype=np.float64),
+        "ffOK": np.array(ffOK, dtype=bool),
+        "bonds": bonds.astype(np.int32),
+    }
+    # unreadable CONECT records by line number within lines
+    unreadable = [[conectLines[r], conect[r].rstrip()] for r in unreadable]
+    attrs = {
+        "nEndMdl": nEndMdl,
+        "nConect": nConect,
+        "nLines": lineNo,
+        "unreadable": unreadable,
+    }
+
+    return records, attrs
+
+
+def splitRanges(coordFile, nChunks):
+    # byte ranges of coordFile, split at line boundaries
+    size = os.path.getsize(coordFile)
+    bounds = [0]
+    with open(coordFile, "rb") as FH:
+        for i in range(1, nChunks):
+            FH.seek(max(size * i // nChunks, bounds[-1]))
+            FH.readline()
+            bounds.append(min(FH.tell(), size))
+    bounds.append(size)
+
+    return [(bounds[i], bounds[i + 1]) for i in range(nChunks) if bounds[i + 1] > bounds[i]]
+
+
+def parseRange(coordFile, start, end):
+    """
+    Worker of parallel parsing: parses a byte range and leaves the
+    result in a shared memory block, whose name is returned.
+    """
+
+    with open(coordFile, "rb") as FH:
+        FH.seek(start)
+        data = FH.read(end - start)
+
+    from multiprocessing import shared_memory, resource_tracker
+
+    records, attrs = parseLines(data.decode().splitlines())
+
+    shm = shared_memory.SharedMemory(
+        create=True, size=BinaryIO.size("PDBChunk", records, attrs)
+    )
+    BinaryIO.writeInto(shm.buf, "PDBChunk", records, attrs)
+    name = shm.name
+    shm.close()
+
+    # the parent unlinks the block, stop this process from tracking it
+    resource_tracker.unregister(shm._name, "shared_memory")
+
+    return name
+
+
+def stitch(chunks):
+    """
+    Concatenates parsed chunks in order, model numbers continue
+    across chunks and unreadable CONECT records are warned about by
+    line number. Returns records and whether CONECT was found.
+    """
+
+    offset = 0
+    nLines = 0
+    models = []
+    for chunk, attrs in chunks:
+        models.append(chunk["model"] + offset)
+        offset += attrs["nEndMdl"]
+        for lineNo, record in attrs["unreadable"]:
+            warnings.warn(conect_unreadable % (nLines + lineNo, record))
+        nLines += attrs["nLines"]
+
+    records = {}
+    for key in chunks[0][0]:
+        records[key] = np.concatenate([chunk[key] for chunk, _ in chunks])
+    records["model"] = np.concatenate(models)
+    foundCONECT = any(attrs["nConect"] for _, attrs in chunks)
+
+    return records, foundCONECT
+
+
+def parseParallel(coordFile, nProcs):
+    """
+    Parses coordFile in nProcs processes, each process parses a byte
+    range and returns its arrays through shared memory, which are
+    stitched in file order directly from the shared blocks.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    ranges = splitRanges(coordFile, nProcs)
+    if not ranges:
+        return stitch([parseLines([])])
+
+    with ProcessPoolExecutor(max_workers=nProcs) as pool:
+        names = list(
+            pool.map(
+                parseRange,
+                [coordFile] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges],
+            )
+        )
+
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    try:
+        chunks = [BinaryIO.readFrom(shm.buf, "PDBChunk") for shm in blocks]
+        records, foundCONECT = stitch(chunks)
+        del chunks  # release views into the blocks
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    return records, foundCONECT
 
 
 class PDBobj:
     """
     This a molecule class, which is initialized with a pdb file.
     This object contains coordinates and connectivity.
+    For multi-MODEL pdb files, topology is taken from the first
+    model and coordinates of every model are kept in frames.
+
+    bonds, atomTypes and atomQQs are read-only numpy arrays, which
+    MolGraph and Topo share without copying.
+
+    With nProcs > 1, the file is split into byte ranges which are
+    parsed in a process pool and stitched back in order.
+
+    gzip, bz2 and xz compressed files are read directly, streaming
+    through the decompressor (nProcs is ignored for them, since
+    compressed streams can not be split into byte ranges).
     """
 
-    def __init__(self, coordFile, box=None, lpbc=(True, True, True)):
+    def __init__(self, coordFile, box=None, lpbc=(True, True, True), nProcs=1):
         self.coordFile = coordFile
         self.box = box
         self.lpbc = lpbc
+        self.nProcs = nProcs
         self.ffPresent = True
+        self._shared = None
 
         if self.box and len(self.box) != 3:
             raise RuntimeError(non_orthogonal_box)
 
         self.process()
 
+    @Profiler.profiled("PDBobj.process")
     def process(self):
-        self._symbols = []
-        self._x = []
-        self._y = []
-        self._z = []
-        self._resNames = []
-        self._resIDs = []
-        self.bonds = []
-        self.nBonds = 0
-        self.nAtoms = 0
-
-        self.atomTypes = []
-        self.atomQQs = []
-
-        coordFH = open(self.coordFile, "r")
-        self.lines = coordFH.readlines()
-        coordFH.close()
-
-        self.readCoords()
-        self.readBonds()
-        self.readFF()
-
-    def readBonds(self):
-
-        foundCONECT = False
-        for line in self.lines:
-            if line.startswith("CONECT"):
-                foundCONECT = True
-                keys = line.split()
-                iatom = int(keys[1])
-                for i in range(2, len(keys)):
-                    jatom = int(keys[i])
-                    if iatom < jatom:
-                        self.bonds.append((iatom, jatom))
-                    else:
-                        self.bonds.append((jatom, iatom))
-
-        self.bonds = list(set(self.bonds))
-        self.bonds.sort()
-        self.nBonds = len(self.bonds)
+        if self.nProcs > 1 and compression(self.coordFile) is None:
+            records, foundCONECT = parseParallel(self.coordFile, self.nProcs)
+        else:
+            with openCoordFile(self.coordFile) as coordFH:
+                records, foundCONECT = stitch([parseLines(coordFH)])
+
+        self.readCoords(records)
+        self.readFF(records)
+        self.readBonds(records, foundCONECT)
+        Profiler.count("atoms", self.nAtoms)
+
+    def binaryArrays(self):
+        # (arrays, attrs) of the BinaryIO container, used by save and share
+        arrays = {
+            "symbols": np.array(self.symbols, dtype=str),
+            "elements": np.array(self.elements, dtype=str),
+            "resNames": np.array(self.resNames, dtype=str),
+            "resIDs": np.array(self.resIDs, dtype=np.int32),
+            "frames": self.frames,
+            "bonds": self.bonds,
+            "atomTypes": self.atomTypes,
+            "atomQQs": self.atomQQs,
+        }
+        attrs = {
+            "coordFile": self.coordFile,
+            "box": list(self.box) if self.box else None,
+            "lpbc": list(self.lpbc),
+            "ffPresent": self.ffPresent,
+        }
+        return arrays, attrs
+
+    @classmethod
+    def fromBinary(cls, arrays, attrs):
+        mol = cls.__new__(cls)
+        mol.coordFile = attrs["coordFile"]
+        mol.box = attrs["box"]
+        mol.lpbc = tuple(attrs["lpbc"])
+        mol.ffPresent = attrs["ffPresent"]
+        mol._shared = None
+
+        mol._symbols = arrays["symbols"]
+        mol._elements = arrays.get("elements")  # guessed if not stored
+        mol._resNames = arrays["resNames"]
+        mol._resIDs = arrays["resIDs"]
+        mol._frames = arrays["frames"]
+        mol._x = mol._frames[0, :, 0]
+        mol._y = mol._frames[0, :, 1]
+        mol._z = mol._frames[0, :, 2]
+        mol._bonds = arrays["bonds"]
+        mol._atomTypes = arrays["atomTypes"]
+        mol._atomQQs = arrays["atomQQs"]
+
+        mol.nFrames, mol.nAtoms = mol._frames.shape[:2]
+        mol.nBonds = len(mol._bonds)
+
+        return mol
+
+    def save(self, fileName):
+        """
+        Saves parsed coordinates, connectivity and force-field
+        columns in GenTopo binary format (see BinaryIO).
+        """
+
+        arrays, attrs = self.binaryArrays()
+        BinaryIO.save(fileName, "PDBobj", arrays, attrs)
+
+    @classmethod
+    def load(cls, fileName, mmap=True):
+        # loads a PDBobj written by save, without reparsing the pdb
+        arrays, attrs = BinaryIO.load(fileName, "PDBobj", mmap=mmap)
+        return cls.fromBinary(arrays, attrs)
+
+    def share(self):
+        """
+        Places all arrays in a shared memory block and returns a
+        picklable handle for PDBobj.attach, see MolGraph.share.
+        """
+
+        from GenTopo import Shared
+
+        if self._shared is None:
+            arrays, attrs = self.binaryArrays()
+            self._shared = Shared.share("PDBobj", arrays, attrs)
+        return self._shared[1]
+
+    def unshare(self):
+        if self._shared is not None:
+            block = self._shared[0]
+            block.close()
+            block.unlink()
+            self._shared = None
+
+    @classmethod
+    def attach(cls, handle):
+        # PDBobj viewing the shared block of handle, without copy
+        from GenTopo import Shared
+
+        block, arrays, attrs = Shared.attach(handle)
+        mol = cls.fromBinary(arrays, attrs)
+        mol._attached = block  # keeps the mapping alive
+        return mol
+
+    def atomMask(self, index=None, resIDs=None, resNames=None):
+        """
+        Boolean mask over atoms matching all given criteria: 1-based
+        atom indices, residue ids and residue names. Masks can be
+        combined with | and &, e.g. ligand plus pocket.
+        """
+
+        mask = np.ones(self.nAtoms, dtype=bool)
+        if index is not None:
+            mask &= selectionMask(index, self.nAtoms)[1:]
+        if resIDs is not None:
+            mask &= np.isin(self.resIDs, resIDs)
+        if resNames is not None:
+            mask &= np.isin(self.resNames, resNames)
+        return mask
+
+    def select(self, atoms):
+        """
+        PDBobj of the selected atoms (a mask or 1-based indices, see
+        atomMask), renumbered from 1. Bonds are filtered, not perceived
+        again; parentIDs holds the original index of every atom.
+        """
+
+        mask = selectionMask(atoms, self.nAtoms)
+        newIDs = renumber(mask)
+        keep = mask[1:]
+
+        arrays, attrs = self.binaryArrays()
+        names = ("symbols", "elements", "resNames", "resIDs", "atomTypes", "atomQQs")
+        for name in names:
+            if len(arrays[name]) == self.nAtoms:
+                arrays[name] = readOnly(arrays[name][keep])
+        arrays["frames"] = readOnly(arrays["frames"][:, keep])
+        arrays["bonds"] = filterTerms(self.bonds, mask, newIDs)
+
+        mol = self.fromBinary(arrays, attrs)
+        mol.parentIDs = readOnly(np.flatnonzero(keep) + 1)
+        return mol
+
+    def readBonds(self, records, foundCONECT):
+
+        self._bonds = termArray(uniquePairs(records["bonds"]), 2)
+        self.nBonds = len(self._bonds)
 
         if not foundCONECT:
             print(connectivity_missing)
             self.genBonds()
+            self._bonds = termArray(self._bonds, 2)
 
     def genBonds(self):
-
-        self.radii = []
-        self.bonds = []
-
-        # assign vdw radius
-        for symbol in self._symbols:
-            radius = elements[symbol[0]]["vdw_radius"]
-            self.radii.append(radius)
-
-        for iatom in range(self.nAtoms - 1):
-            iradius = self.radii[iatom]
-            for jatom in range(iatom + 1, self.nAtoms):
-                jradius = self.radii[jatom]
-                rcut = 0.6 * (iradius + jradius)
-                dx = self._x[iatom] - self._x[jatom]
-                dy = self._y[iatom] - self._y[jatom]
-                dz = self._z[iatom] - self._z[jatom]
-                r = dx * dx + dy * dy + dz * dz
-                if r < rcut ** 2:
-                    if iatom < jatom:
-                        bond = (iatom + 1, jatom + 1)
-                    else:
-                        bond = (jatom + 1, iatom + 1)
-
-                    if bond not in self.bonds:
-                        self.bonds.append(bond)
-        self.nBonds = len(self.bonds)
-
-    def readCoords(self):
-        for line in self.lines:
-            if line.startswith("HETATM") or line.startswith("ATOM"):
-                self._symbols.append(line[12:16].strip())
-                self._resNames.append(line[17:20])
-                self._resIDs.append(int(line[22:26]))
-                self._x.append(float(line[30:38]))
-                self._y.append(float(line[38:46]))
-                self._z.append(float(line[46:54]))
-
-                self.nAtoms += 1
-
-    def readFF(self):
+        # connectivity from vdW radii, see Kernels.searchBonds
+        self.radii = np.array(
+            [vdwRadii[symbol] for symbol in self.elements.tolist()],
+            dtype=np.float64,
+        )
+        xyz = np.stack((self._x, self._y, self._z), axis=1)
+
+        self._bonds = searchBonds(xyz, self.radii, scale=0.6)
+        self.nBonds = len(self._bonds)
+
+    def readCoords(self, records):
+        model = records["model"]
+        first = model == 0
+        self.nAtoms = int(np.count_nonzero(first))
+
+        self._symbols = readOnly(records["symbols"][first])
+        self._elementColumns = readOnly(records["elements"][first])
+        self._resNames = readOnly(records["resNames"][first])
+        self._resIDs = readOnly(records["resIDs"][first])
+
+        counts = np.bincount(model) if len(model) else np.zeros(1, dtype=int)
+        if np.any(counts != self.nAtoms):
+            raise RuntimeError(inconsistent_models)
+
+        self.nFrames = len(counts)
+        self._frames = readOnly(records["xyz"].reshape(self.nFrames, self.nAtoms, 3))
+        self._x = self._frames[0, :, 0]
+        self._y = self._frames[0, :, 1]
+        self._z = self._frames[0, :, 2]
+
+    def readFF(self, records):
         # check if FF information is here
 
-        for line in self.lines:
-            if line.startswith("HETATM") or line.startswith("ATOM"):
-                try:
-                    atomType, qq = self.splitLine(line)
-                except:
-                    self.ffPresent = False
-                    return
+        first = records["model"] == 0
+        self.ffPresent = bool(np.all(records["ffOK"][first]))
 
-        for line in self.lines:
-            if line.startswith("HETATM") or line.startswith("ATOM"):
-                atomType, qq = self.splitLine(line)
-                self.atomTypes.append(atomType)
-                self.atomQQs.append(qq)
+        if self.ffPresent:
+            self._atomTypes = readOnly(records["atomTypes"][first])
+            self._atomQQs = readOnly(records["atomQQs"][first])
+        else:
+            self._atomTypes = readOnly(np.array([], dtype=str))
+            self._atomQQs = readOnly(np.array([], dtype=np.float64))
 
     @staticmethod
     def splitLine(line):
@@ -153,6 +590,30 @@ class PDBobj:
     def symbols(self):
         return self._symbols
 
+    @property
+    def elements(self):
+        # element of every atom from pdb columns 77-78, else guessed from
+        # its name (see PeriodicTable.guessElement), inferred once
+        if getattr(self, "_elements", None) is None:
+            columns = getattr(self, "_elementColumns", None)
+            elements = guessElements(self._symbols, self._resNames, columns)
+            self._elements = readOnly(elements)
+        return self._elements
+
+    @property
+    def atomicNumbers(self):
+        # atomic number of every atom from elements (0 if unknown)
+        if getattr(self, "_atomicNumbers", None) is None:
+            self._atomicNumbers = readOnly(atomicNumbers(self.elements))
+        return self._atomicNumbers
+
+    @property
+    def masses(self):
+        # element mass of every atom, gathered by atomic number
+        if getattr(self, "_masses", None) is None:
+            self._masses = readOnly(atomicMasses[self.atomicNumbers])
+        return self._masses
+
     @property
     def x(self):
         return self._x
@@ -165,6 +626,23 @@ class PDBobj:
     def z(self):
         return self._z
 
+    @property
+    def bonds(self):
+        return self._bonds
+
+    @property
+    def atomTypes(self):
+        return self._atomTypes
+
+    @property
+    def atomQQs(self):
+        return self._atomQQs
+
+    @property
+    def frames(self):
+        # (nFrames, nAtoms, 3) coordinates of all models
+        return self._frames
+
     @property
     def resIDs(self):
         return self._resIDs
@@ -0,0 +1,85 @@
+"""
+Weisfeiler-Lehman hashing of molecular graphs.
+
+Every atom starts with a 64-bit hash of its label (atom type or
+element) and is refined by mixing in the multiset of its neighbors'
+hashes, one vectorized pass over the CSR adjacency per iteration,
+until the partition of atoms into classes stops growing. The graph
+hash is a digest of the sorted final atom hashes, so it does not
+depend on atom order and is equal for isomorphic labeled graphs.
+
+As any WL hash it is not a complete isomorphism test: some regular,
+non-isomorphic graphs (rare among molecules) hash alike.
+"""
+
+from GenTopo.ArrayUtil import adjacency
+import hashlib
+import numpy as np
+
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+
+
+def mix(h):
+    # splitmix64 finalizer, a bijective scramble of uint64 arrays
+    h = h ^ (h >> np.uint64(30))
+    h = h * _M1
+    h = h ^ (h >> np.uint64(27))
+    h = h * _M2
+    return h ^ (h >> np.uint64(31))
+
+
+def labelHashes(labels):
+    # stable uint64 hash of every label, each distinct label hashed once
+    names, inverse = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+    digests = b"".join(
+        hashlib.blake2b(name.encode(), digest_size=8).digest()
+        for name in names.tolist()
+    )
+    return np.frombuffer(digests, dtype="<u8").astype(np.uint64)[inverse.reshape(-1)]
+
+
+def refine(indptr, indices, hashes):
+    # one WL iteration: own hash and the sum of mixed neighbor hashes
+    sums = np.zeros(len(hashes), dtype=np.uint64)
+    degree = np.diff(indptr)[: len(hashes)]
+    bonded = np.flatnonzero(degree)
+    if len(bonded):
+        sums[bonded] = np.add.reduceat(mix(hashes)[indices], indptr[bonded])
+    return mix(hashes * _M2 + sums)
+
+
+def atomHashes(bonds, labels, atoms=None, iterations=None):
+    """
+    WL hash (uint64) of every atom of 1-based bonds, labels[i - 1] is the
+    label of atom i. atoms (1-based ids, default all) are the atoms of
+    the graph. Refinement stops when the number of atom classes is
+    stable, or after iterations.
+    """
+
+    nAtoms = len(labels)
+    atoms = np.arange(1, nAtoms + 1) if atoms is None else np.asarray(atoms)
+    indptr, indices = adjacency(bonds, nAtoms)
+
+    hashes = np.zeros(nAtoms + 1, dtype=np.uint64)
+    hashes[1:] = labelHashes(labels)
+
+    nClasses = len(np.unique(hashes[atoms]))
+    maxIterations = len(atoms) if iterations is None else iterations
+    for _ in range(maxIterations):
+        hashes = refine(indptr, indices, hashes)
+        n = len(np.unique(hashes[atoms]))
+        if iterations is None and n == nClasses:
+            break
+        nClasses = n
+
+    return hashes[atoms]
+
+
+def fingerprint(bonds, labels, atoms=None, iterations=None):
+    # hex digest of the multiset of atom hashes, see atomHashes
+    hashes = np.sort(atomHashes(bonds, labels, atoms, iterations))
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.array([len(hashes), len(bonds)], dtype="<u8").tobytes())
+    digest.update(hashes.astype("<u8").tobytes())
+    return digest.hexdigest()
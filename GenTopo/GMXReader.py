@@ -0,0 +1,425 @@
+"""
+Reader of GROMACS topologies, such as written by GMXTopo.Topo.
+
+Section bodies are cut out of the file text at their headers and
+term sections are parsed in bulk by numpy, so topologies with
+millions of terms are read in seconds.
+"""
+
+from GenTopo.ArrayUtil import (
+    termArray,
+    readOnly,
+    rowKeys,
+    rowOrder,
+    uniquePairs,
+    pairKeys,
+    inSorted,
+)
+from GenTopo.Coord import PDBobj
+from GenTopo.Graph import MolGraph
+import io
+import re
+import numpy as np
+
+# atoms per term of the bonded sections
+TERM_WIDTHS = {
+    "bonds": 2,
+    "pairs": 2,
+    "angles": 3,
+    "dihedrals": 4,
+    "constraints": 2,
+}
+
+# sections in the order they are written, impropers are dihedrals
+# with func 2 or 4 (or in a later [ dihedrals ] block without func),
+# exclusions are read as (i, j) pairs
+SECTIONS = (
+    "bonds",
+    "pairs",
+    "angles",
+    "dihedrals",
+    "impropers",
+    "exclusions",
+    "constraints",
+)
+
+# "paris" is accepted for topologies written by older GenTopo versions
+ALIASES = {"paris": "pairs"}
+
+_HEADER = re.compile(r"^[ \t]*\[[ \t]*(\w+)[ \t]*\][^\n]*$", re.M)
+_COMMENT = re.compile(r"[;#][^\n]*")
+_DIRECTIVE = re.compile(r"^[ \t]*#", re.M)
+
+# type sections, written again by GMXTopo.Topo from the atom types
+# (without parameters), atom names per line
+TYPE_WIDTHS = {
+    "atomtypes": 1,
+    "bondtypes": 2,
+    "angletypes": 3,
+    "dihedraltypes": 4,
+}
+
+# sections read into arrays, all others are skipped
+READ_SECTIONS = (
+    "moleculetype",
+    "defaults",
+    "atoms",
+    "exclusions",
+    "bonds",
+    "pairs",
+    "angles",
+    "dihedrals",
+    "constraints",
+)
+
+
+def findHeaders(text):
+    # section header matches, "[" is searched by str.find which
+    # is much faster than a multi-line regex over the whole file
+    headers = []
+    pos = text.find("[")
+    while pos >= 0:
+        lineStart = text.rfind("\n", 0, pos) + 1
+        header = _HEADER.match(text, lineStart)
+        if header is not None and header.start(1) > pos:
+            headers.append(header)
+            pos = header.end()
+        pos = text.find("[", pos + 1)
+    return headers
+
+
+def firstFields(body):
+    # fields of the first data line of a section body
+    for line in body.splitlines():
+        fields = line.split(";", 1)[0].split()
+        if fields and not fields[0].startswith("#"):
+            return fields
+    return []
+
+
+def fieldCounts(body):
+    # number of fields of every non-empty line, from the
+    # whitespace/non-whitespace transitions of the text
+    chars = np.frombuffer(body.encode(), dtype=np.uint8)
+    space = chars <= 32
+    start = ~space
+    start[1:] &= space[:-1]
+    line = np.searchsorted(np.flatnonzero(chars == 10), np.flatnonzero(start))
+    nFields = np.bincount(line)
+    return nFields[nFields > 0]
+
+
+def splitRows(body, width, fill="0"):
+    # fields of every non-empty line, cut or padded to width
+    rows = []
+    for line in body.splitlines():
+        fields = line.split()[:width]
+        if fields:
+            rows.append(fields + [fill] * (width - len(fields)))
+    return rows
+
+
+def parseTerms(body, width):
+    """
+    Atoms and func of every line of a bonded section body as
+    ((n, width) array, (n,) funcs, hasParameters), func is 0 when
+    not given. Parameters after the func column are not read,
+    hasParameters tells if any line has them.
+    """
+
+    body = _COMMENT.sub("", body)
+    nFields = fieldCounts(body)
+
+    if len(nFields) == 0:
+        values = np.zeros((0, width), dtype=np.int64)
+    elif np.all(nFields == nFields[0]):
+        # all lines alike: one C-level parse of the index and func
+        # columns, parameters after them are not converted
+        columns = range(min(int(nFields[0]), width + 1))
+        values = np.loadtxt(io.StringIO(body), dtype=np.int64, usecols=columns, ndmin=2)
+    else:
+        rows = splitRows(body, width + 1)
+        values = np.array(rows, dtype=np.int64).reshape(-1, width + 1)
+
+    atoms = values[:, :width].astype(np.int32)
+    if values.shape[1] > width:
+        funcs = values[:, width].astype(np.int32)
+    else:
+        funcs = np.zeros(len(values), dtype=np.int32)
+    return atoms, funcs, bool(len(nFields)) and nFields.max() > width + 1
+
+
+def hasTypeParameters(name, body):
+    # whether a type section has parameters, as GMXTopo.Topo writes
+    # them only sigma and epsilon 0 are written for atomtypes
+    body = _COMMENT.sub("", body)
+    if name != "atomtypes":
+        nFields = fieldCounts(body)
+        return bool(len(nFields)) and nFields.max() > TYPE_WIDTHS[name] + 1
+    lines = [line.split()[-2:] for line in body.splitlines() if line.strip()]
+    return any(float(value) != 0.0 for line in lines for value in line)
+
+
+class TopoReader:
+    """
+    Reads the first moleculetype of a GROMACS topology into arrays:
+
+        atomIDs, atomTypes, resIDs, resNames, atomNames, cgnrs, atomQQs,
+        atomMasses (nan where not given)
+        terms[section]: (n, k) int32 1-based atoms, as in the file
+        funcs[section]: func of every term, 0 if not given
+
+    for sections bonds, pairs, angles, dihedrals, impropers,
+    exclusions (as sorted (i, j) pairs) and constraints.
+    canonical(section) returns terms oriented and sorted like
+    MolGraph (impropers keep their atom order), toMol() and toGraph()
+    the PDBobj/MolGraph pair of the topology, see GMXTopo.Topo.read.
+    skipped lists what is in the file but not read (parameters,
+    preprocessor directives, other sections and moleculetypes).
+
+    Example:
+        top = TopoReader("topol.top")
+        top.terms["bonds"]
+    """
+
+    def __init__(self, topFile):
+        self.topFile = topFile
+        self.terms = {}
+        self.funcs = {}
+        self.read()
+
+    def read(self):
+        with open(self.topFile) as FH:
+            text = FH.read()
+
+        headers = findHeaders(text)
+        blocks = {name: [] for name in TERM_WIDTHS}
+        atomBody = ""
+        exclusionBodies = []
+        nMolTypes = 0
+        self.skipped = []
+        if _DIRECTIVE.search(text):
+            self.skipped.append("#include/#ifdef directives")
+        self.defaults = None
+        self.molName, self.nrexcl = "MOL", 3
+
+        for i, header in enumerate(headers):
+            name = ALIASES.get(header.group(1).lower(), header.group(1).lower())
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+            body = text[header.end() : end]
+
+            if name == "moleculetype":
+                nMolTypes += 1
+                if nMolTypes > 1:
+                    self.skipped.append("moleculetypes after the first")
+                    break
+                fields = firstFields(body)
+                if len(fields) >= 2:
+                    self.molName, self.nrexcl = fields[0], int(fields[1])
+            elif name == "defaults":
+                self.readDefaults(firstFields(body))
+            elif name == "atoms":
+                atomBody = body
+            elif name == "exclusions":
+                exclusionBodies.append(body)
+            elif name in TERM_WIDTHS:
+                blocks[name].append(body)
+            if name in TYPE_WIDTHS:
+                if hasTypeParameters(name, body):
+                    self.skipped.append("parameters of [ %s ]" % name)
+            elif name not in READ_SECTIONS:
+                self.skipped.append("[ %s ]" % name)
+
+        self.readAtoms(atomBody)
+        self.readExclusions(exclusionBodies)
+
+        for name, width in TERM_WIDTHS.items():
+            parsed = [parseTerms(body, width) for body in blocks[name]]
+            if any(hasParameters for _, _, hasParameters in parsed):
+                self.skipped.append("parameters of [ %s ]" % name)
+            parsed = [(atoms, funcs) for atoms, funcs, _ in parsed]
+            if name == "dihedrals":
+                self.splitImpropers(parsed)
+                continue
+            self.setSection(name, parsed, width)
+
+    def readExclusions(self, bodies):
+        # exclusions as sorted unique (i, j) pairs, i < j
+        pairs = [np.zeros((0, 2), dtype=np.int64)]
+        for body in bodies:
+            for line in _COMMENT.sub("", body).splitlines():
+                atoms = np.array(line.split(), dtype=np.int64)
+                if len(atoms) > 1:
+                    first = np.full(len(atoms) - 1, atoms[0])
+                    pairs.append(np.stack((first, atoms[1:]), 1))
+
+        pairs = np.concatenate(pairs)
+        pairs = np.stack((pairs.min(axis=1), pairs.max(axis=1)), 1)
+        self.terms["exclusions"] = termArray(uniquePairs(pairs), 2)
+        self.funcs["exclusions"] = readOnly(
+            np.zeros(len(self.terms["exclusions"]), dtype=np.int32)
+        )
+
+    def readDefaults(self, fields):
+        # (nbfunc, comb-rule, gen-pairs, (fudgeLJ, fudgeQQ)) as given
+        # to GMXTopo.Topo.setDefaults, missing fields take its defaults
+        if not fields:
+            return
+        fields = fields + ["1", "1", "no", "1.0", "1.0"][len(fields) :]
+        self.defaults = (
+            int(fields[0]),
+            int(fields[1]),
+            fields[2].lower() == "yes",
+            (float(fields[3]), float(fields[4])),
+        )
+
+    def setSection(self, name, parsed, width):
+        if parsed:
+            atoms = np.concatenate([atoms for atoms, _ in parsed])
+            funcs = np.concatenate([funcs for _, funcs in parsed])
+        else:
+            atoms = np.zeros((0, width), dtype=np.int32)
+            funcs = np.zeros(0, dtype=np.int32)
+        self.terms[name] = termArray(atoms, width)
+        self.funcs[name] = readOnly(funcs)
+
+    def splitImpropers(self, parsed):
+        # func 2 and 4 are impropers, without func later blocks are
+        proper, improper = [], []
+        for block, (atoms, funcs) in enumerate(parsed):
+            if np.any(funcs):
+                mask = np.isin(funcs, (2, 4))
+            else:
+                mask = np.full(len(funcs), block > 0)
+            proper.append((atoms[~mask], funcs[~mask]))
+            improper.append((atoms[mask], funcs[mask]))
+
+        self.setSection("dihedrals", proper, 4)
+        self.setSection("impropers", improper, 4)
+
+    def readAtoms(self, body):
+        body = _COMMENT.sub("", body)
+        nFields = fieldCounts(body)
+        if len(nFields) and np.all(nFields == nFields[0]) and nFields[0] >= 7:
+            rows = np.array(body.split()).reshape(len(nFields), -1)
+        else:
+            rows = np.array(splitRows(body, 8, "nan"), dtype=str).reshape(-1, 8)
+
+        self.nAtoms = len(rows)
+        self.atomIDs = readOnly(rows[:, 0].astype(np.int64))
+        self.atomTypes = readOnly(rows[:, 1].copy())
+        self.resIDs = readOnly(rows[:, 2].astype(np.int64))
+        self.resNames = readOnly(rows[:, 3].copy())
+        self.atomNames = readOnly(rows[:, 4].copy())
+        self.cgnrs = readOnly(rows[:, 5].astype(np.int64))
+        self.atomQQs = readOnly(rows[:, 6].astype(np.float64))
+        if rows.shape[1] > 7:
+            self.atomMasses = readOnly(rows[:, 7].astype(np.float64))
+        else:
+            self.atomMasses = readOnly(np.full(self.nAtoms, np.nan))
+
+    def funcID(self, section):
+        # func shared by all terms of section, None if mixed or not given
+        funcs = np.unique(self.funcs[section])
+        if len(funcs) == 1 and funcs[0] != 0:
+            return int(funcs[0])
+        return None
+
+    def renumbered(self, section):
+        # terms of section with atoms numbered 1..nAtoms in [ atoms ] order
+        terms = np.asarray(self.terms[section])
+        if np.array_equal(self.atomIDs, np.arange(1, self.nAtoms + 1)):
+            return terms
+
+        size = max(self.atomIDs.max(initial=0), terms.max(initial=0)) + 1
+        newIDs = np.zeros(size, dtype=np.int32)
+        newIDs[self.atomIDs] = np.arange(1, self.nAtoms + 1)
+        return newIDs[terms]
+
+    def connectivity(self):
+        """
+        Bonds followed by the func 1 constraints that are not bonds, as
+        such constraints replace bonds (e.g. to hydrogen) and generate
+        exclusions like them.
+        """
+
+        bonds = self.renumbered("bonds").reshape(-1, 2)
+        constraints = self.renumbered("constraints").reshape(-1, 2)
+        constraints = constraints[self.funcs["constraints"] == 1]
+        if not len(constraints):
+            return bonds
+
+        known = np.sort(pairKeys(np.sort(bonds, axis=1)))
+        new = ~inSorted(pairKeys(np.sort(constraints, axis=1)), known)
+        return np.concatenate((bonds, constraints[new]))
+
+    def toMol(self):
+        """
+        PDBobj holding the atoms of the topology (names, residues,
+        types and charges) and its bonds. A topology has no
+        coordinates, all atoms are placed at the origin.
+        """
+
+        arrays = {
+            "symbols": self.atomNames,
+            "resNames": self.resNames,
+            "resIDs": readOnly(self.resIDs.astype(np.int32)),
+            "frames": readOnly(np.zeros((1, self.nAtoms, 3))),
+            "bonds": termArray(self.connectivity(), 2),
+            "atomTypes": self.atomTypes,
+            "atomQQs": self.atomQQs,
+        }
+        attrs = {
+            "coordFile": self.topFile,
+            "box": None,
+            "lpbc": [True, True, True],
+            "ffPresent": True,
+        }
+        return PDBobj.fromBinary(arrays, attrs)
+
+    def toGraph(self, mol=None):
+        """
+        MolGraph with the terms of the topology as they are in the
+        file (pairs become oneFours, impropers imDihedrals), nothing
+        is generated again.
+        """
+
+        mol = self.toMol() if mol is None else mol
+        return MolGraph.fromArrays(
+            mol.bonds,
+            coordObj=mol,
+            angles=self.renumbered("angles"),
+            dihedrals=self.renumbered("dihedrals"),
+            imDihedrals=self.renumbered("impropers"),
+            oneFours=self.renumbered("pairs"),
+        )
+
+    def canonical(self, section):
+        """
+        (terms, funcs) of section, symmetric terms oriented first <
+        last atom (or lexicographically smaller than the reversed term
+        if first and last are equal), sorted lexicographically.
+        """
+
+        terms = np.asarray(self.terms[section])
+        if section != "impropers" and len(terms):
+            reverse = terms[:, ::-1]
+            differ = terms != reverse
+            first = np.argmax(differ, axis=1)
+            rows = np.arange(len(terms))
+            flip = terms[rows, first] > reverse[rows, first]
+            terms = np.where(flip[:, None], reverse, terms)
+        order = rowOrder(rowKeys(terms))
+        return terms[order], self.funcs[section][order]
+
+    def typeCodes(self, terms, typeNames):
+        """
+        Index into the sorted array typeNames of the atom type of
+        every atom of terms (atoms missing in [ atoms ] get -1).
+        """
+
+        terms = np.asarray(terms, dtype=np.int64)
+        size = max(self.atomIDs.max(initial=0), terms.max(initial=0)) + 1
+        codes = np.full(size, -1, dtype=np.int64)
+        codes[self.atomIDs] = np.searchsorted(typeNames, self.atomTypes)
+        return codes[terms]
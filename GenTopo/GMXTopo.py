@@ -1,70 +1,83 @@
-import copy
-
-
-class Topo:
+from GenTopo.TopoBase import TopoBase
+from GenTopo.BulkFormat import writeRows, writeColumns, OrderedWriter
+from GenTopo.GMXReader import TopoReader
+from GenTopo.ChargeGroups import chargeGroups
+from GenTopo import Profiler
+from GenTopo.Warning import topology_content_dropped
+from GenTopo.ArrayUtil import (
+    uniqueRows,
+    readOnly,
+    selectionMask,
+    renumber,
+    pairKeys,
+    inSorted,
+)
+import warnings
+import numpy as np
+
+
+class Topo(TopoBase):
     def __init__(self, mol, molGraph):
-        self.molGraph = molGraph
-        self.mol = mol
-        self.atomTypes = mol.atomTypes
-        self.atomQQs = mol.atomQQs
-        self.assignTypes()
+        super().__init__(mol, molGraph)
+        self.molName = "MOL"
         self.setFuncID()
-
-    def assignTypes(self):
-
-        # bond types
-        bondTypes = []
-        for bond in self.molGraph.bonds:
-            iatom = bond[0] - 1
-            jatom = bond[1] - 1
-
-            iType = self.atomTypes[iatom]
-            jType = self.atomTypes[jatom]
-
-            bondType = (iType, jType)
-
-            if bondType not in bondTypes and bondType[::-1] not in bondTypes:
-                bondTypes.append(bondType)
-        self.bondTypes = bondTypes
-
-        # angle types
-        angleTypes = []
-        for angle in self.molGraph.angles:
-            iatom = angle[0] - 1
-            jatom = angle[1] - 1
-            katom = angle[2] - 1
-
-            iType = self.atomTypes[iatom]
-            jType = self.atomTypes[jatom]
-            kType = self.atomTypes[katom]
-
-            angleType = (iType, jType, kType)
-
-            if angleType not in angleTypes and angleType[::-1] not in angleTypes:
-                angleTypes.append(angleType)
-        self.angleTypes = angleTypes
-
-        # dihedral types
-        dihedralTypes = []
-        for dihedral in self.molGraph.dihedrals:
-            iatom = dihedral[0] - 1
-            jatom = dihedral[1] - 1
-            katom = dihedral[2] - 1
-            latom = dihedral[3] - 1
-
-            iType = self.atomTypes[iatom]
-            jType = self.atomTypes[jatom]
-            kType = self.atomTypes[katom]
-            lType = self.atomTypes[latom]
-
-            dihedralType = (iType, jType, kType, lType)
-
-            if (
-                dihedralType not in dihedralTypes
-                and dihedralType[::-1] not in dihedralTypes
-            ):
-                dihedralTypes.append(dihedralType)
-        self.dihedralTypes = dihedralTypes
+        self.setChargeGroups()
+        self.setExclusions()
+        self.fileExclusions = None
+        self.fileConstraints = None
+        self.bondConstraints = None
+        self.setConstraints()
+        self.skipped = []
+
+    @classmethod
+    def read(cls, topFile):
+        """
+        Topology of the first moleculetype of an existing .top/.itp
+        file (see GMXReader.TopoReader), without the pdb file. Terms,
+        function ids and defaults are taken from the file, so it can
+        be patched (see patch) and written again. Parameters,
+        directives and other sections are not kept, write warns about
+        them (see TopoReader.skipped).
+        """
+
+        reader = TopoReader(topFile)
+        mol = reader.toMol()
+        topo = cls(mol, reader.toGraph(mol))
+
+        # nrexcl is given by the file, also for select/setExclusions
+        topo.molName, topo.nrexcl = reader.molName, reader.nrexcl
+        topo.nrexclNote = False
+        topo.exclusionArgs = (reader.nrexcl,) + topo.exclusionArgs[1:]
+        topo.chargeGroupMode = None
+        topo.cgnrs = reader.cgnrs
+        if len(reader.terms["exclusions"]):
+            topo.fileExclusions = reader.renumbered("exclusions")
+        if len(reader.terms["constraints"]):
+            # func 1 constraints are bonds of the graph (see
+            # TopoReader.connectivity), written as constraints again
+            pairs = reader.renumbered("constraints")
+            funcs = reader.funcs["constraints"]
+            topo.bondConstraints = pairs[funcs == 1]
+            if (funcs != 1).any():
+                topo.fileConstraints = (pairs[funcs != 1], funcs[funcs != 1])
+            topo.setConstraints()
+        if not np.isnan(reader.atomMasses).any():
+            topo.atomMasses = reader.atomMasses
+        if reader.defaults is not None:
+            topo.setDefaults(*reader.defaults)
+        topo.setBondFuncID(reader.funcID("bonds"))
+        topo.setAngleFuncID(reader.funcID("angles"))
+        topo.setDihedralFuncID(reader.funcID("dihedrals"))
+        topo.setImDihedralFuncID(reader.funcID("impropers"))
+        topo.setOneFourFuncID(reader.funcID("pairs"))
+
+        # terms of mixed func are written without func
+        topo.skipped = list(reader.skipped)
+        for section in ("bonds", "pairs", "angles", "dihedrals", "impropers"):
+            if reader.funcID(section) is None and reader.funcs[section].any():
+                topo.skipped.append("mixed funcs of [ %s ]" % section)
+
+        return topo
 
     def setFuncID(self):
         self.setDefaults()
@@ -74,6 +87,50 @@ class Topo:
         self.setImDihedralFuncID()
         self.setOneFourFuncID()
 
+    def select(self, atoms):
+        # sub-topology keeping function ids, defaults and charge groups
+        topo = super().select(atoms)
+        if self.chargeGroupMode is None:
+            # groups read from a file, renumbered consecutively
+            cgnrs = self.cgnrs[topo.molGraph.parentIDs - 1]
+            topo.cgnrs = np.unique(cgnrs, return_inverse=True)[1].reshape(-1) + 1
+        else:
+            topo.setChargeGroups(self.chargeGroupMode, *self.chargeGroupArgs)
+        topo.setExclusions(*self.exclusionArgs)
+
+        # terms read from a file are filtered to the selection
+        parentIDs = topo.molGraph.parentIDs
+        mask = selectionMask(parentIDs, self.molGraph.nAtoms)
+        if self.fileExclusions is not None:
+            keep = mask[self.fileExclusions].all(axis=1)
+            topo.fileExclusions = renumber(mask)[self.fileExclusions[keep]]
+        if self.fileConstraints is not None:
+            pairs, funcs = self.fileConstraints
+            keep = mask[pairs].all(axis=1)
+            topo.fileConstraints = (renumber(mask)[pairs[keep]], funcs[keep])
+        if self.bondConstraints is not None:
+            keep = mask[self.bondConstraints].all(axis=1)
+            topo.bondConstraints = renumber(mask)[self.bondConstraints[keep]]
+        topo.setConstraints(self.hBonds, self.hAngles)
+
+        for name in (
+            "bondFuncID",
+            "angleFuncID",
+            "dihedralFuncID",
+            "imDihedralFuncID",
+            "oneFourFunID",
+            "nbFunc",
+            "combRule",
+            "genPairs",
+            "fudgeFactors",
+            "molName",
+            "nrexcl",
+            "chargeGroupMode",
+            "skipped",
+        ):
+            setattr(topo, name, getattr(self, name))
+        return topo
+
     def setBondFuncID(self, bondFuncID=None):
         self.bondFuncID = bondFuncID
 
@@ -89,6 +146,123 @@ class Topo:
     def setOneFourFuncID(self, oneFourFunID=None):
         self.oneFourFunID = oneFourFunID
 
+    def setChargeGroups(self, mode="atom", tol=1e-3, maxSize=16):
+        """
+        cgnr of [ atoms ]: "atom" (one group per atom), "hydrogen",
+        "residue" or "neutral", see ChargeGroups.chargeGroups.
+        """
+
+        self.chargeGroupMode = mode
+        self.chargeGroupArgs = (tol, maxSize)
+        self.cgnrs = chargeGroups(
+            self.mol, self.molGraph.bonds, self.atomQQs, mode, tol, maxSize
+        )
+
+    def setExclusions(self, nrexcl=None, pairs=True, exclusionDepth=None):
+        """
+        nrexcl of [ moleculetype ], non-bonded interactions of atoms up
+        to nrexcl bonds apart are excluded. [ pairs ] holds the 1-4
+        pairs if they are excluded (nrexcl >= 3) and pairs is True,
+        and is empty otherwise. With exclusionDepth > nrexcl, atoms
+        more than nrexcl and up to exclusionDepth bonds apart (e.g.
+        for coarse-grained models) are written to [ exclusions ].
+        Without nrexcl, 3 is written with a note to adjust it.
+        Exclusions read from a file (fileExclusions) are written too.
+        """
+
+        self.exclusionArgs = (nrexcl, pairs, exclusionDepth)
+        self.nrexclNote = nrexcl is None
+        self.nrexcl = 3 if nrexcl is None else nrexcl
+
+        self.pairs = None  # 1-4s of molGraph
+        if not pairs or self.nrexcl < 3:
+            self.pairs = np.zeros((0, 2), dtype=np.int32)
+
+        self.exclusions = None
+        if exclusionDepth is not None and exclusionDepth > self.nrexcl:
+            shells = self.molGraph.bondShells(exclusionDepth)[self.nrexcl :]
+            self.exclusions = uniqueRows(np.concatenate(shells))
+
+    def setConstraints(self, hBonds=False, hAngles=False):
+        """
+        With hBonds, bonds to hydrogen are written as [ constraints ]
+        (func 1, generating exclusions like bonds) instead of bonds.
+        With hAngles, angles with a hydrogen at an end are replaced by
+        a constraint of their 1-3 distance (func 2, no exclusions).
+        Hydrogens are found from PDBobj.elements. Bonds in
+        bondConstraints (func 1 constraints of a file read with
+        Topo.read) are always written as constraints. Constrained
+        terms get no bond or angle types.
+        """
+
+        self.hBonds = hBonds
+        self.hAngles = hAngles
+        self._types.pop("bonds", None)
+        self._types.pop("angles", None)
+
+    @property
+    def hydrogen(self):
+        # hydrogen mask by 1-based atom id (index 0 unused), from elements
+        if getattr(self, "_hydrogen", None) is None:
+            isH = np.asarray(self.mol.elements) == "H"
+            self._hydrogen = readOnly(np.concatenate(([False], isH)))
+        return self._hydrogen
+
+    def bondConstraintMask(self):
+        # bonds written as constraints, mask over molGraph.bonds
+        bonds = self.molGraph.bonds
+        mask = np.zeros(len(bonds), dtype=bool)
+        if self.hBonds:
+            mask |= self.hydrogen[bonds].any(axis=1)
+        if self.bondConstraints is not None and len(self.bondConstraints):
+            known = np.sort(pairKeys(np.sort(self.bondConstraints, axis=1)))
+            mask |= inSorted(pairKeys(np.sort(bonds, axis=1)), known)
+        return mask
+
+    def angleConstraintMask(self):
+        # angles written as 1-3 constraints, mask over molGraph.angles
+        if not self.hAngles:
+            return np.zeros(self.molGraph.nAngles, dtype=bool)
+        return self.hydrogen[self.molGraph.angles[:, [0, 2]]].any(axis=1)
+
+    def constraintMasks(self):
+        # constrained bonds and angles, masks over molGraph terms
+        return self.bondConstraintMask(), self.angleConstraintMask()
+
+    def typedTerms(self, family):
+        # constrained bonds and angles are not written, so not typed
+        terms = super().typedTerms(family)
+        if family == "bonds":
+            return terms[~self.bondConstraintMask()]
+        if family == "angles":
+            return terms[~self.angleConstraintMask()]
+        return terms
+
+    def repartitionMasses(self, hydrogenMass=3.024):
+        """
+        Hydrogen mass repartitioning: every hydrogen bonded to one
+        heavy atom gets hydrogenMass, the difference is taken from
+        the heavy atom, so the total mass is unchanged.
+        """
+
+        masses = np.array(self.atomMasses, dtype=np.float64)
+
+        bonds = np.asarray(self.molGraph.bonds, dtype=np.int64)
+        isH = self.hydrogen[bonds]
+        heavyH = isH[:, 0] != isH[:, 1]
+        hAtoms = np.where(isH[heavyH, 0], bonds[heavyH, 0], bonds[heavyH, 1]) - 1
+        heavyAtoms = np.where(isH[heavyH, 0], bonds[heavyH, 1], bonds[heavyH, 0]) - 1
+
+        # hydrogens bonded to more than one heavy atom are left alone
+        single = np.bincount(hAtoms, minlength=len(masses))[hAtoms] == 1
+        hAtoms, heavyAtoms = hAtoms[single], heavyAtoms[single]
+
+        delta = hydrogenMass - masses[hAtoms]
+        masses[hAtoms] = hydrogenMass
+        masses -= np.bincount(heavyAtoms, weights=delta, minlength=len(masses))
+
+        self.atomMasses = readOnly(masses)
+
     def setDefaults(self, NBFunc=0, CombRule=0, GenPairs=True, FudgeFactors=(0.0, 0.0)):
 
         self.nbFunc = NBFunc
@@ -100,8 +274,22 @@ class Topo:
             self.genPairs = "no"
         self.fudgeFactors = FudgeFactors
 
-    def write(self, topFile="topol.top"):
+    @Profiler.profiled("Topo.write")
+    def write(self, topFile="topol.top", nWorkers=1, processes=False):
+        """
+        With nWorkers > 1, sections are formatted chunk by chunk in a
+        thread (or process) pool while a writer thread streams them to
+        topFile in order (see BulkFormat.OrderedWriter).
+        """
+
+        if self.skipped:
+            skipped = ", ".join(dict.fromkeys(self.skipped))
+            warnings.warn(topology_content_dropped % skipped)
+
         self.topFH = open(topFile, "w")
+        if nWorkers > 1:
+            self.topFH = OrderedWriter(self.topFH, nWorkers, processes)
+
         self.writeDefaults()
         self.writeAtomTypes()
         self.writeBondTypes()
@@ -110,9 +298,11 @@ class Topo:
         self.writeHeader()
         self.writeAtoms()
         self.writeBonds()
+        self.writeConstraints()
         self.writeAngles()
         self.writeDihedrals()
         self.writePairs()
+        self.writeExclusions()
 
         self.topFH.close()
 
@@ -135,27 +325,30 @@ class Topo:
         )
 
     def writeHeader(self):
-        molName = "MOL"
         self.topFH.write("\n[ moleculetype ]\n")
         self.topFH.write(";name    nrexcl\n")
-        self.topFH.write("%-s       3  ; Note: Adjust nrexcl\n\n" % (molName))
+        if self.nrexclNote:
+            self.topFH.write(
+                "%-s       %d  ; Note: Adjust nrexcl\n\n"
+                % (self.molName, self.nrexcl)
+            )
+        else:
+            self.topFH.write("%-s       %d\n\n" % (self.molName, self.nrexcl))
 
     def writeAtomTypes(self):
 
-        _atomTypes = copy.deepcopy(self.atomTypes)
-        _atomTypes = list(set(_atomTypes))
-        _atomTypes = sorted(_atomTypes)
+        numbers, masses = self.typeElements()
 
-        self.topFH.write("\n[ atomtypes ]  ;nAtomTypes:%3d\n" % len(_atomTypes))
+        self.topFH.write("\n[ atomtypes ]  ;nAtomTypes:%3d\n" % len(self.typeNames))
 
         self.topFH.write(
             "; name  at.num      mass     charge   ptype     sigma     epsilon\n"
         )
-        for atype in _atomTypes:
-            self.topFH.write(
-                "%6s       0   0.00000    0.00000       A   0.00000     0.00000\n"
-                % atype
-            )
+        writeColumns(
+            self.topFH,
+            "%6s  %6d  %8.5f    0.00000       A   0.00000     0.00000\n",
+            (self.typeNames, numbers, masses),
+        )
 
     def writeBondTypes(self):
         self.topFH.write("\n")
@@ -209,70 +402,75 @@ class Topo:
 
     def writeAtoms(self):
         self.topFH.write("[ atoms ]   ; nAtoms: %d\n" % self.molGraph.nAtoms)
-        self.topFH.write("; nr  type  resnr residue atom cgnr charge\n")
 
-        for i in range(self.molGraph.nAtoms):
-            id = i + 1
-            self.topFH.write(
-                "%6d %10s %3d %8s %8s %6d %14.8f\n"
-                % (
-                    id,
-                    self.atomTypes[i],
-                    self.mol.resIDs[i],
-                    self.mol.resNames[i],
-                    self.mol.symbols[i],
-                    id,
-                    self.atomQQs[i],
-                )
-            )
+        nAtoms = self.molGraph.nAtoms
+        ids = np.arange(1, nAtoms + 1)
+        columns = [
+            ids,
+            self.atomTypes[:nAtoms],
+            self.mol.resIDs[:nAtoms],
+            self.mol.resNames[:nAtoms],
+            self.mol.symbols[:nAtoms],
+            self.cgnrs[:nAtoms],
+            self.atomQQs[:nAtoms],
+            self.atomMasses[:nAtoms],
+        ]
+
+        self.topFH.write("; nr  type  resnr residue atom cgnr charge mass\n")
+        writeColumns(self.topFH, "%6d %10s %3d %8s %8s %6d %14.8f %10.5f\n", columns)
+
+    def writeTerms(self, terms, funcID):
+        # header line and rows of a bonded section
+        width = terms.shape[1]
+        names = tuple("atom%d" % (i + 1) for i in range(width))
+
+        if funcID:
+            self.topFH.write((";%5s" + "  %6s" * width + "\n") % (names + ("func",)))
+            writeRows(self.topFH, "%6d  " * width + "%6d\n" % funcID, terms)
+        else:
+            self.topFH.write((";%5s" + "  %6s" * (width - 1) + "\n") % names)
+            writeRows(self.topFH, "  ".join(["%6d"] * width) + "\n", terms)
 
     def writeBonds(self):
+        bonds = self.molGraph.bonds[~self.bondConstraintMask()]
+
         self.topFH.write("\n")
-        self.topFH.write("[ bonds ]   ; nBonds: %d\n" % self.molGraph.nBonds)
+        self.topFH.write("[ bonds ]   ; nBonds: %d\n" % len(bonds))
+        self.writeTerms(bonds, self.bondFuncID)
+
+    def writeConstraints(self):
+        pairs, funcs = [np.zeros((0, 2), dtype=np.int32)], [np.zeros(0, dtype=int)]
+        bondMask, angleMask = self.constraintMasks()
+        pairs += [self.molGraph.bonds[bondMask]]
+        pairs += [self.molGraph.angles[angleMask][:, [0, 2]]]
+        funcs += [np.full(np.count_nonzero(bondMask), 1)]
+        funcs += [np.full(np.count_nonzero(angleMask), 2)]
+        if self.fileConstraints is not None:
+            pairs.append(self.fileConstraints[0])
+            funcs.append(self.fileConstraints[1])
+
+        pairs, funcs = np.concatenate(pairs), np.concatenate(funcs)
+        if len(pairs) == 0:
+            return
 
-        if self.bondFuncID:
-            self.topFH.write(";%5s  %6s  %6s\n" % ("atom1", "atom2", "func"))
-            for (i, j) in self.molGraph.bonds:
-                self.topFH.write("%6d  %6d  %6d\n" % (i, j, self.bondFuncID))
-        else:
-            self.topFH.write(";%5s  %6s\n" % ("atom1", "atom2"))
-            for (i, j) in self.molGraph.bonds:
-                self.topFH.write("%6d  %6d\n" % (i, j))
+        self.topFH.write("\n")
+        self.topFH.write("[ constraints ]   ; nConstraints: %d\n" % len(pairs))
+        self.topFH.write(";%5s  %6s  %6s\n" % ("atom1", "atom2", "func"))
+        writeRows(self.topFH, "%6d  %6d  %6d\n", np.column_stack((pairs, funcs)))
 
     def writeAngles(self):
+        angles = self.molGraph.angles[~self.angleConstraintMask()]
+
         self.topFH.write("\n")
-        self.topFH.write("[ angles ]   ; nAngles: %d\n" % self.molGraph.nAngles)
-        if self.angleFuncID:
-            self.topFH.write(
-                ";%5s  %6s  %6s  %6s\n" % ("atom1", "atom2", "atom3", "func")
-            )
-            for (i, j, k) in self.molGraph.angles:
-                self.topFH.write("%6d  %6d  %6d  %6d\n" % (i, j, k, self.angleFuncID))
-        else:
-            self.topFH.write(";%5s  %6s  %6s\n" % ("atom1", "atom2", "atom3"))
-            for (i, j, k) in self.molGraph.angles:
-                self.topFH.write("%6d  %6d  %6d\n" % (i, j, k))
+        self.topFH.write("[ angles ]   ; nAngles: %d\n" % len(angles))
+        self.writeTerms(angles, self.angleFuncID)
 
     def writeDihedrals(self):
         self.topFH.write("\n")
         self.topFH.write(
             "[ dihedrals ]   ; nDihedrals: %d\n" % self.molGraph.nDihedrals
         )
-        if self.dihedralFuncID:
-            self.topFH.write(
-                ";%5s  %6s  %6s  %6s  %6s\n"
-                % ("atom1", "atom2", "atom3", "atom4", "func")
-            )
-            for (i, j, k, l) in self.molGraph.dihedrals:
-                self.topFH.write(
-                    "%6d  %6d  %6d  %6d  %6d\n" % (i, j, k, l, self.dihedralFuncID)
-                )
-        else:
-            self.topFH.write(
-                ";%5s  %6s  %6s  %6s\n" % ("atom1", "atom2", "atom3", "atom4")
-            )
-            for (i, j, k, l) in self.molGraph.dihedrals:
-                self.topFH.write("%6d  %6d  %6d  %6d\n" % (i, j, k, l))
+        self.writeTerms(self.molGraph.dihedrals, self.dihedralFuncID)
 
         if self.molGraph.nImDihedrals == 0:
             return
@@ -281,31 +479,30 @@ class Topo:
         self.topFH.write(
             "[ dihedrals ]   ; nDihedrals: %d\n" % self.molGraph.nImDihedrals
         )
-        if self.imDihedralFuncID:
-            self.topFH.write(
-                ";%5s  %6s  %6s  %6s  %6s\n"
-                % ("atom1", "atom2", "atom3", "atom4", "func")
-            )
-            for (i, j, k, l) in self.molGraph.imDihedrals:
-                self.topFH.write(
-                    "%6d  %6d  %6d  %6d  %6d\n" % (i, j, k, l, self.imDihedralFuncID)
-                )
-        else:
-            self.topFH.write(
-                ";%5s  %6s  %6s  %6s\n" % ("atom1", "atom2", "atom3", "atom4")
-            )
-            for (i, j, k, l) in self.molGraph.imDihedrals:
-                self.topFH.write("%6d  %6d  %6d  %6d\n" % (i, j, k, l))
+        self.writeTerms(self.molGraph.imDihedrals, self.imDihedralFuncID)
 
     def writePairs(self):
+        pairs = self.molGraph.oneFours if self.pairs is None else self.pairs
         self.topFH.write("\n")
-        self.topFH.write("[ paris ]   ; nPairs: %d\n" % self.molGraph.nOneFours)
+        self.topFH.write("[ paris ]   ; nPairs: %d\n" % len(pairs))
+        self.writeTerms(pairs, self.oneFourFunID)
+
+    def writeExclusions(self):
+        # one line per atom: the atom and all atoms it is excluded from
+        exclusions = [self.exclusions, self.fileExclusions]
+        exclusions = [terms for terms in exclusions if terms is not None]
+        if not exclusions:
+            return
 
-        if self.oneFourFunID:
-            self.topFH.write(";%5s  %6s  %6s\n" % ("atom1", "atom2", "func"))
-            for (i, j) in self.molGraph.oneFours:
-                self.topFH.write("%6d  %6d  %6d\n" % (i, j, self.oneFourFunID))
-        else:
-            self.topFH.write(";%5s  %6s\n" % ("atom1", "atom2"))
-            for (i, j) in self.molGraph.oneFours:
-                self.topFH.write("%6d  %6d\n" % (i, j))
+        exclusions = uniqueRows(np.concatenate(exclusions))
+        self.topFH.write("\n")
+        self.topFH.write("[ exclusions ]   ; nExclusions: %d\n" % len(exclusions))
+        self.topFH.write(";%5s  %6s\n" % ("atom1", "atoms"))
+
+        first = np.flatnonzero(np.diff(exclusions[:, 0], prepend=-1))
+        for atom, others in zip(
+            exclusions[first, 0].tolist(), np.split(exclusions[:, 1], first[1:])
+        ):
+            self.topFH.write(
+                "%6d  " % atom + "  ".join("%6d" % j for j in others.tolist()) + "\n"
+            )
@@ -1,7 +1,18 @@
-from GenTopo.RingUtil import RingUtil
-from GenTopo.ImproperDihedral import ImproperDihedralGenerator
 from GenTopo.Coord import PDBobj
-import copy
+from GenTopo.ArrayUtil import (
+    termArray,
+    pairKeys,
+    keysToPairs,
+    uniqueKeys,
+    selectionMask,
+    renumber,
+    filterTerms,
+    bondShells,
+)
+from GenTopo.BulkFormat import writeRows
+from GenTopo.Kernels import extendTerms
+from GenTopo import BinaryIO, Profiler
+import numpy as np
 
 
 class MolGraph:
@@ -10,32 +21,68 @@ class MolGraph:
     It represent molecule as graph,
     which takes PDBobj/plain list as input. It generates
     angles, dihedrals, 1-4 and improper dihedrals using
-    connectivity information.
+    connectivity information. All term families are read-only
+    (n, k) int32 arrays of 1-based atom indices.
+
+    Angles, dihedrals, 1-4s and improper dihedrals are generated
+    lazily on first access and cached; call materialize() to
+    generate all of them at once.
+
+    guessImpropers may be True/"aromatic" (impropers on aromatic atoms)
+    or "sp2" (all planar trigonal centers), improperOrder is "gromacs"
+    (center first) or "amber" (center third).
+
+    With profile (True or a trace file name), a profiling session is
+    started and exported at exit, see GenTopo.Profiler.
+
+    share() places all term arrays in shared memory, worker processes
+    attach to it zero-copy with MolGraph.attach(handle).
+
+    With residueTemplates (True or a shared ResidueTemplates library),
+    angles and dihedrals of a PDBobj are stamped out from per-residue
+    templates instead of enumerated over the whole molecule.
     """
 
-    def __init__(self, inp, guessImpropers=False, onlyCyclic14s=False):
+    def __init__(
+        self,
+        inp,
+        guessImpropers=False,
+        onlyCyclic14s=False,
+        residueTemplates=None,
+        improperOrder="gromacs",
+        profile=False,
+    ):
+
+        if profile:
+            traceFile = profile if isinstance(profile, str) else Profiler.DEFAULT_TRACE
+            Profiler.start(traceFile)
 
         if isinstance(inp, PDBobj):
             self.coordObj = inp
             self.bonds = None
         else:
             self.coordObj = None
-            self.bonds = inp
+            self.bonds = termArray(inp, 2)
+
+        if residueTemplates is True:
+            from GenTopo.ResidueTemplate import ResidueTemplates
+
+            residueTemplates = ResidueTemplates()
+        self.residueTemplates = residueTemplates
+        self.improperOrder = improperOrder
 
         self.gen(guessImpropers, onlyCyclic14s)
 
+    @Profiler.profiled("MolGraph.gen")
     def gen(self, guessImpropers, onlyCyclic14s):
-        # generates necessary internal coordinates
+        # sets up bonds, internal coordinates are generated on demand
 
-        if self.bonds:
+        self.guessImpropers = guessImpropers
+        self.onlyCyclic14s = onlyCyclic14s
+
+        if self.coordObj is None:
             self.nBonds = len(self.bonds)
-            self.atoms = set()
-            for i in range(self.nBonds):
-                iatom = self.bonds[i][0]
-                jatom = self.bonds[i][1]
-                self.atoms.add(iatom)
-                self.atoms.add(jatom)
-            self.atoms = list(self.atoms)
+            self.atoms = np.unique(self.bonds).tolist()
             self.nAtoms = len(self.atoms)
             print("Number of Atoms: %-5d" % self.nAtoms)
         else:
@@ -43,144 +90,403 @@ class MolGraph:
             print("Number of Atoms: %-5d" % self.nAtoms)
             self.genBonds()
 
-        self.nAngles = 0
-        self.nDihedrals = 0
-        self.nImDihedrals = 0
-        self.nOneFours = 0
+        self._angles = None
+        self._dihedrals = None
+        self._imDihedrals = None
+        self._oneFours = None
+        self._residueSplit = None
+        self._aromaticity = None
+        self._shared = None
+        Profiler.count("bonds", self.nBonds)
+
+    @classmethod
+    def fromArrays(
+        cls,
+        bonds,
+        coordObj=None,
+        atoms=None,
+        guessImpropers=False,
+        onlyCyclic14s=False,
+        improperOrder="gromacs",
+        **terms
+    ):
+        """
+        Creates a graph from existing term arrays without enumeration.
+        terms may contain angles, dihedrals, imDihedrals and oneFours,
+        missing families are generated lazily as usual. Without
+        coordObj, atoms (sorted atom indices) is taken from bonds
+        unless given.
+        """
+
+        graph = cls.__new__(cls)
+        graph.coordObj = coordObj
+        graph.bonds = termArray(bonds, 2)
+        graph.nBonds = len(graph.bonds)
+        graph.guessImpropers = guessImpropers
+        graph.onlyCyclic14s = onlyCyclic14s
+        graph.improperOrder = improperOrder
+        graph.residueTemplates = None
+        graph._residueSplit = None
+        graph._aromaticity = None
+        graph._shared = None
+
+        if coordObj is not None:
+            graph.nAtoms = coordObj.nAtoms
+        else:
+            graph.atoms = np.unique(graph.bonds) if atoms is None else atoms
+            graph.nAtoms = len(graph.atoms)
+
+        for name in ("angles", "dihedrals", "imDihedrals", "oneFours"):
+            setattr(graph, "_" + name, None)
+            if terms.get(name) is not None:
+                setattr(graph, name, terms[name])
+
+        return graph
+
+    def binaryArrays(self):
+        # (arrays, attrs) of the BinaryIO container, used by save and share
+        self.materialize()
+
+        arrays = {
+            "bonds": self.bonds,
+            "angles": self.angles,
+            "dihedrals": self.dihedrals,
+            "imDihedrals": self.imDihedrals,
+            "oneFours": self.oneFours,
+        }
+        if self.coordObj is None:
+            arrays["atoms"] = np.asarray(self.atoms, dtype=np.int32)
+
+        attrs = {
+            "guessImpropers": self.improperMode() or False,
+            "onlyCyclic14s": bool(self.onlyCyclic14s),
+            "improperOrder": self.improperOrder,
+        }
+        return arrays, attrs
+
+    @classmethod
+    def fromBinary(cls, arrays, attrs, coordObj=None):
+        return cls.fromArrays(
+            coordObj=coordObj,
+            guessImpropers=attrs["guessImpropers"],
+            onlyCyclic14s=attrs["onlyCyclic14s"],
+            improperOrder=attrs.get("improperOrder", "gromacs"),
+            **arrays
+        )
+
+    def save(self, fileName):
+        """
+        Saves all term arrays in GenTopo binary format (see BinaryIO),
+        which MolGraph.load maps back without regeneration.
+        """
+
+        arrays, attrs = self.binaryArrays()
+        BinaryIO.save(fileName, "MolGraph", arrays, attrs)
+
+    @classmethod
+    def load(cls, fileName, coordObj=None, mmap=True):
+        """
+        Loads a graph written by save. With mmap, term arrays are
+        read-only views of the file, shared by all processes that
+        load the same file.
+        """
+
+        arrays, attrs = BinaryIO.load(fileName, "MolGraph", mmap=mmap)
+        return cls.fromBinary(arrays, attrs, coordObj)
+
+    def share(self):
+        """
+        Copies all term arrays into a shared memory block owned by this
+        graph and returns a picklable handle. Worker processes get the
+        graph with MolGraph.attach(handle), without copying or pickling
+        the arrays. Call unshare() when all workers are done.
+        """
+
+        from GenTopo import Shared
+
+        if self._shared is None:
+            arrays, attrs = self.binaryArrays()
+            self._shared = Shared.share("MolGraph", arrays, attrs)
+        return self._shared[1]
+
+    def unshare(self):
+        # releases the shared block created by share
+        if self._shared is not None:
+            block = self._shared[0]
+            block.close()
+            block.unlink()
+            self._shared = None
+
+    @classmethod
+    def attach(cls, handle, coordObj=None):
+        """
+        Graph viewing the shared block of handle (see share), term
+        arrays are read-only and not copied.
+        """
+
+        from GenTopo import Shared
+
+        block, arrays, attrs = Shared.attach(handle)
+        graph = cls.fromBinary(arrays, attrs, coordObj)
+        graph._attached = block  # keeps the mapping alive
+        return graph
 
-        self.genAngles()
-        self.genDihedrals()
-        self.genOneFours(onlyCyclic14s)
+    def select(self, atoms):
+        """
+        Sub-graph of the selected atoms (a mask or 1-based indices, with
+        a PDBobj e.g. mol.atomMask(resNames="LIG")), renumbered from 1.
+        Generated term families are filtered to terms with all atoms
+        selected, the others (and 1-4s, which depend on the dihedrals
+        of the sub-graph) are generated lazily for the sub-graph only.
+        """
+
+        mask = selectionMask(atoms, self.maxAtomID)
+        newIDs = renumber(mask)
+
+        terms = {}
+        for name in ("angles", "dihedrals", "imDihedrals"):
+            generated = getattr(self, "_" + name)
+            if generated is not None:
+                terms[name] = filterTerms(generated, mask, newIDs)
+
+        if self.coordObj is not None:
+            coordObj = self.coordObj.select(mask[1:])
+            bonds, subAtoms = coordObj.bonds, None
+        else:
+            coordObj = None
+            bonds = filterTerms(self.bonds, mask, newIDs)
+            subAtoms = newIDs[np.asarray(self.atoms)[mask[self.atoms]]]
+
+        graph = MolGraph.fromArrays(
+            bonds,
+            coordObj=coordObj,
+            atoms=subAtoms,
+            guessImpropers=self.guessImpropers,
+            onlyCyclic14s=self.onlyCyclic14s,
+            improperOrder=self.improperOrder,
+            **terms
+        )
+        graph.parentIDs = np.flatnonzero(mask)
+        return graph
+
+    def bondShells(self, depth):
+        """
+        Pairs of atoms 1, 2, ..., depth bonds apart (shortest path), as
+        a list of sorted (n, 2) arrays with i < j, see
+        ArrayUtil.bondShells.
+        """
 
-        if guessImpropers and self.coordObj:
-            self.genImDihedrals()
+        return bondShells(self.bonds, self.maxAtomID, depth)
+
+    def fingerprint(self, labels=None, iterations=None):
+        """
+        Weisfeiler-Lehman hash (hex string) of connectivity and atom
+        labels, independent of atom order, e.g. as a cache key or to
+        deduplicate molecules before term generation. labels default
+        to atomTypes of a PDBobj (elements if it has none), a graph
+        from a bond list is hashed by connectivity only. See
+        GenTopo.Fingerprint.
+        """
+
+        from GenTopo.Fingerprint import fingerprint
+
+        if self.coordObj is not None:
+            atoms = None
+            if labels is None:
+                labels = self.coordObj.atomTypes
+                if not len(labels):
+                    labels = self.coordObj.elements
+        else:
+            atoms = self.atoms
+            if labels is None:
+                labels = np.full(self.maxAtomID, "")
+
+        return fingerprint(self.bonds, labels, atoms, iterations)
+
+    def materialize(self):
+        # eagerly generates all internal coordinates
+        self.angles
+        self.dihedrals
+        self.oneFours
+        self.imDihedrals
+
+        return self
+
+    @property
+    def maxAtomID(self):
+        # largest 1-based atom id, ids of a graph from a bond list may skip
+        if self.coordObj is not None:
+            return self.coordObj.nAtoms
+        return int(np.max(self.atoms)) if self.nAtoms else 0
+
+    @property
+    def aromaticity(self):
+        # ring, aromaticity and bond-order perception, computed once
+        if self._aromaticity is None:
+            from GenTopo.Aromaticity import Aromaticity
+
+            self._aromaticity = Aromaticity(self)
+        return self._aromaticity
+
+    @property
+    def angles(self):
+        if self._angles is None:
+            self.genAngles()
+        return self._angles
+
+    @angles.setter
+    def angles(self, angles):
+        self._angles = termArray(angles, 3)
+
+    @property
+    def nAngles(self):
+        return len(self.angles)
+
+    @property
+    def dihedrals(self):
+        if self._dihedrals is None:
+            self.genDihedrals()
+        return self._dihedrals
+
+    @dihedrals.setter
+    def dihedrals(self, dihedrals):
+        self._dihedrals = termArray(dihedrals, 4)
+
+    @property
+    def nDihedrals(self):
+        return len(self.dihedrals)
+
+    @property
+    def imDihedrals(self):
+        if self._imDihedrals is None:
+            if self.guessImpropers and self.coordObj:
+                self.genImDihedrals()
+            else:
+                self._imDihedrals = termArray([], 4)
+        return self._imDihedrals
+
+    @imDihedrals.setter
+    def imDihedrals(self, imDihedrals):
+        self._imDihedrals = termArray(imDihedrals, 4)
+
+    @property
+    def nImDihedrals(self):
+        return len(self.imDihedrals)
+
+    @property
+    def oneFours(self):
+        if self._oneFours is None:
+            self.genOneFours(self.onlyCyclic14s)
+        return self._oneFours
+
+    @oneFours.setter
+    def oneFours(self, oneFours):
+        self._oneFours = termArray(oneFours, 2)
+
+    @property
+    def nOneFours(self):
+        return len(self.oneFours)
 
     def genBonds(self):
 
-        self.bonds = copy.deepcopy(self.coordObj.bonds)
+        self.bonds = self.coordObj.bonds  # read-only, shared with coordObj
         self.nBonds = len(self.bonds)
         print("Number of Bonds: %-5d" % self.nBonds)
 
+    def useTemplates(self):
+        return self.residueTemplates is not None and self.coordObj is not None
+
+    @Profiler.profiled("MolGraph.genAngles")
     def genAngles(self):
-        self.angles = self.getNext(self.bonds)
-        self.angles.sort()
-        self.nAngles = len(self.angles)
+        if self.useTemplates():
+            angles = self.residueTemplates.stamp(self, "angles")
+        else:
+            angles = self.getNext(self.bonds)
+        self._angles = termArray(angles, 3)
 
         print("Number of Angles: %-5d" % self.nAngles)
+        Profiler.count("angles", self.nAngles)
 
+    @Profiler.profiled("MolGraph.genDihedrals")
     def genDihedrals(self):
-        self.dihedrals = self.getNext(self.angles)
-        self.dihedrals.sort()
-        self.nDihedrals = len(self.dihedrals)
+        if self.useTemplates():
+            dihedrals = self.residueTemplates.stamp(self, "dihedrals")
+        else:
+            dihedrals = self.getNext(self.angles)
+        self._dihedrals = termArray(dihedrals, 4)
 
         print("Number of Dihedrals: %-5d" % self.nDihedrals)
+        Profiler.count("dihedrals", self.nDihedrals)
+
+    def improperMode(self):
+        # "aromatic", "sp2" or None when impropers are not guessed
+        if not self.guessImpropers:
+            return None
+        return "aromatic" if self.guessImpropers is True else self.guessImpropers
 
+    @Profiler.profiled("MolGraph.genImDihedrals")
     def genImDihedrals(self):
         if self.coordObj:
-            self.imDihedrals = ImproperDihedralGenerator(self.coordObj).gen()
-            self.nImDihedrals = len(self.imDihedrals)
+            from GenTopo.ImproperDihedral import ImproperDihedralGenerator
 
-            print("Number of Improper dihedrals: %-5d" % self.nImDihedrals)
+            imDihedrals = ImproperDihedralGenerator(
+                self.coordObj, aromaticity=self.aromaticity
+            ).gen(mode=self.improperMode(), order=self.improperOrder)
         else:
-            self.imDihedrals = []  # can not generate improper from bond list
-            self.nImDihedrals = len(self.imDihedrals)
+            imDihedrals = []  # can not generate improper from bond list
+        self._imDihedrals = termArray(imDihedrals, 4)
 
-            print("Number of Improper dihedrals: %-5d" % self.nImDihedrals)
+        print("Number of Improper dihedrals: %-5d" % self.nImDihedrals)
+        Profiler.count("imDihedrals", self.nImDihedrals)
 
+    @Profiler.profiled("MolGraph.genOneFours")
     def genOneFours(self, onlyCyclic=False):
-        ringUtil = RingUtil(self.bonds)
-
-        if not onlyCyclic:
-            dihedrals = self.dihedrals
-        else:
+        dihedrals = self.dihedrals
 
-            dihedrals = []
-            for dihedral in self.dihedrals:
-                _, mid1, mid2, _ = dihedral
+        if onlyCyclic:
+            # central bond of the dihedral is part of a ring
+            dihedrals = dihedrals[self.aromaticity.ringBondMask(dihedrals[:, 1:3])]
 
-                if (
-                    ringUtil.isRingMember(mid1)
-                    and ringUtil.isRingMember(mid2)
-                    and ringUtil.isFormRing(mid1, mid2)
-                ):
-                    dihedrals.append(dihedral)
+        # dihedrals and angles are stored with first < last atom
+        oneFours = uniqueKeys(pairKeys(dihedrals[:, [0, 3]]))
+        excludes = np.concatenate(
+            (pairKeys(self.bonds), pairKeys(self.angles[:, [0, 2]]))
+        )
+        oneFours = oneFours[~np.isin(oneFours, excludes)]
 
-        oneFours = [(i, j) for (i, _, _, j) in dihedrals]
-        excludes = self.bonds + [(i, j) for (i, _, j) in self.angles]
-
-        self.oneFours = []
-        for oneFour in oneFours:
-            if oneFour not in excludes:
-                self.oneFours.append(oneFour)
-
-        self.oneFours = list(set(self.oneFours))
-        self.oneFours.sort()
-        self.nOneFours = len(self.oneFours)
+        self._oneFours = termArray(keysToPairs(oneFours), 2)
 
         print("Number of 1-4s: %-5d" % self.nOneFours)
+        Profiler.count("oneFours", self.nOneFours)
 
     def getNext(self, currentList):
         """
         It generates next internal coordinate,
         for example, if angles is provided as currentList, it will
-        return dihedral.
+        return dihedral. Terms are sorted and unique, see
+        Kernels.extendTerms for the backends.
         """
 
-        nextList = []
-
-        n = len(currentList[0]) - 1
-
-        for clist in currentList:
-            for bond in self.bonds:
-
-                if (bond[0] not in clist) and (bond[1] not in clist):
-                    continue
-                elif (bond[0] in clist) and (bond[1] in clist):
-                    continue
-
-                tempList = None
-                if bond[0] == clist[n]:
-                    tempList = clist + (bond[1],)
-
-                elif bond[1] == clist[n]:
-                    tempList = clist + (bond[0],)
-
-                elif bond[0] == clist[0]:
-                    tempList = (bond[1],) + clist
-
-                elif bond[1] == clist[0]:
-                    tempList = (bond[0],) + clist
-
-                if tempList:
-                    if tempList[0] > tempList[-1]:
-                        tempList = tempList[::-1]
-                    nextList.append(tempList)
-
-        return list(set(nextList))
+        return extendTerms(self.bonds, currentList)
 
     def write(self, file_name):
 
         FH = open(file_name, "w")
 
         FH.write("#nBonds: %d\n" % self.nBonds)
-        for (i, j) in self.bonds:
-            FH.write("%6d  %6d\n" % (i, j))
+        writeRows(FH, "%6d  %6d\n", self.bonds)
 
         FH.write("\n#nAngles: %d\n" % self.nAngles)
-        for (i, j, k) in self.angles:
-            FH.write("%6d  %6d  %6d\n" % (i, j, k))
+        writeRows(FH, "%6d  %6d  %6d\n", self.angles)
 
         FH.write("\n#nDihedrals: %d\n" % self.nDihedrals)
-        for (i, j, k, l) in self.dihedrals:
-            FH.write("%6d  %6d  %6d  %6d\n" % (i, j, k, l))
+        writeRows(FH, "%6d  %6d  %6d  %6d\n", self.dihedrals)
 
         if self.coordObj:
             FH.write("\n#nImDihedrals: %d\n" % self.nImDihedrals)
-            for (i, j, k, l) in self.imDihedrals:
-                FH.write("%6d  %6d  %6d  %6d\n" % (i, j, k, l))
+            writeRows(FH, "%6d  %6d  %6d  %6d\n", self.imDihedrals)
 
         FH.write("#n14s: %d\n" % self.nOneFours)
-        for (i, j) in self.oneFours:
-            FH.write("%6d  %6d\n" % (i, j))
+        writeRows(FH, "%6d  %6d\n", self.oneFours)
 
         FH.close()
@@ -1,5 +1,6 @@
 from GenTopo.RingUtil import RingUtil
-from collections import defaultdict
+from GenTopo.ArrayUtil import adjacency
+from GenTopo import Profiler
 import numpy as np
 
 
@@ -7,7 +8,8 @@ class DihedralEstimator:
     """
     This class calculates dihedral angle of a molecule.
     The class is initialized with a python-object which
-    contains coordinate information.
+    contains coordinate information. Bond vectors are taken as
+    minimum images when the object has a box.
 
     Example:
         mol1 = DihedralEstimator(mol_obj)
@@ -31,6 +33,9 @@ class DihedralEstimator:
         b2 = (x[2] - x[1], y[2] - y[1], z[2] - z[1])
         b3 = (x[3] - x[2], y[3] - y[2], z[3] - z[2])
 
+        if getattr(self.mol, "box", None):
+            b1, b2, b3 = (self.mol.applyPBC(*b) for b in (b1, b2, b3))
+
         b12 = np.cross(b1, b2)
         b23 = np.cross(b2, b3)
         b123 = np.cross(b12, b23)
@@ -44,31 +49,217 @@ class DihedralEstimator:
         return angle
 
 
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def periodicAxes(box, lpbc=(True, True, True)):
+    # (axis, length) of the periodic axes of an orthogonal box
+    if box is None or not len(box):
+        return ()
+    return tuple((k, float(box[k])) for k in range(3) if lpbc[k] and box[k])
+
+
+def _minimumImage(b, axes):
+    # wraps displacement components b = [x, y, z] in place
+    for k, length in axes:
+        b[k] = b[k] - length * np.rint(b[k] / length)
+    return b
+
+
+def _dihedrals(xyz, idx, axes=()):
+    # xyz: x, y, z components each of shape (nAtoms, nFrames)
+    # idx: (n, 4) zero based, returns (n, nFrames)
+    p = [[comp[idx[:, col]] for comp in xyz] for col in range(4)]
+
+    b1 = _minimumImage([p[1][k] - p[0][k] for k in range(3)], axes)
+    b2 = _minimumImage([p[2][k] - p[1][k] for k in range(3)], axes)
+    b3 = _minimumImage([p[3][k] - p[2][k] for k in range(3)], axes)
+
+    b23 = (
+        b2[1] * b3[2] - b2[2] * b3[1],
+        b2[2] * b3[0] - b2[0] * b3[2],
+        b2[0] * b3[1] - b2[1] * b3[0],
+    )
+
+    # (b1 x b2).(b2 x b3) = (b1.b2)(b2.b3) - (b1.b3)(b2.b2)
+    b22 = _dot(b2, b2)
+    x = _dot(b1, b2) * _dot(b2, b3) - _dot(b1, b3) * b22
+    y = _dot(b1, b23) * np.sqrt(b22)
+
+    return np.arctan2(y, x) * 57.2958
+
+
+def batchDihedrals(
+    coords,
+    dihedrals,
+    reduce=None,
+    chunkSize=2 ** 21,
+    box=None,
+    lpbc=(True, True, True),
+):
+    """
+    Vectorized dihedral angles (degree) of many dihedrals over many frames.
+
+    coords is (nAtoms, 3) or (nFrames, nAtoms, 3), dihedrals is a
+    (n, 4) array of 1-based atom indices. Without reduce, it returns
+    (nFrames, n) signed angles. With reduce="mean" or "max", it returns
+    mean or max of |angle| over frames, accumulated chunk by chunk so
+    memory stays bounded by chunkSize angles.
+
+    With an orthogonal box (lengths, periodic along lpbc), bond vectors
+    are minimum images, so dihedrals across the box boundary (infinite
+    polymers, sheets, crystals) get their true angle.
+    """
+
+    axes = periodicAxes(box, lpbc)
+
+    coords = np.asarray(coords, dtype=np.float64)
+    if coords.ndim == 2:
+        coords = coords[None]
+    idx = np.asarray(dihedrals, dtype=np.intp).reshape(-1, 4) - 1
+
+    nFrames = coords.shape[0]
+    nDihedrals = idx.shape[0]
+
+    if reduce is None:
+        out = np.empty((nFrames, nDihedrals))
+    elif reduce in ("mean", "max"):
+        out = np.zeros(nDihedrals)
+    else:
+        raise ValueError("reduce must be None, 'mean' or 'max'")
+
+    fBlock = max(1, min(nFrames, 64))
+    dBlock = max(1, chunkSize // fBlock)
+
+    for f0 in range(0, nFrames, fBlock):
+        f1 = min(f0 + fBlock, nFrames)
+
+        # atom-major layout keeps gathered frames contiguous
+        xyz = [np.ascontiguousarray(coords[f0:f1, :, k].T) for k in range(3)]
+
+        for d0 in range(0, nDihedrals, dBlock):
+            d1 = min(d0 + dBlock, nDihedrals)
+            angles = _dihedrals(xyz, idx[d0:d1], axes)
+
+            if reduce is None:
+                out[f0:f1, d0:d1] = angles.T
+            elif reduce == "mean":
+                out[d0:d1] += np.abs(angles).sum(axis=1)
+            else:
+                np.maximum(out[d0:d1], np.abs(angles).max(axis=1), out=out[d0:d1])
+
+    if reduce == "mean" and nFrames:
+        out /= nFrames
+
+    return out
+
+
 class ImproperDihedralGenerator:
     """
     This class is used to generate improper dihedral
     in aromatic molecule. It uses following heuristics,
         + Center atom of improper is a part of aromatic ring
-        + Dihedral angle < 5 degree (or user defined)
+        + |Dihedral angle| < 5 degree (or user defined)
+
+    With mode="sp2", every 3-coordinate center is a candidate (carbonyls,
+    amides, ring atoms), only the planarity test decides. All candidates
+    are tested at once over all frames; for more than one frame (multi-MODEL
+    pdb or frames passed to gen) they are classified by the mean (or max)
+    deviation from planarity, which is robust against thermal noise.
+
+    Impropers are ordered center-first (order="gromacs") or with the center
+    as third atom (order="amber").
+
+    With aromaticity (an Aromaticity perception, e.g. graph.aromaticity),
+    aromatic centers are its aromatic atoms, otherwise any ring member.
+
+    If mol has a box, planarity is tested on minimum-image geometry, so
+    centers bonded across the periodic boundary are detected as well.
     """
 
-    def __init__(self, mol):
-        self.adjList = defaultdict(list)
-        for inode, jnode in mol.bonds:
-            self.adjList[inode].append(jnode)
-            self.adjList[jnode].append(inode)
-
-        self.RingUtil = RingUtil(mol.bonds)
-        self.dihedralEstimator = DihedralEstimator(mol)
-
-    def gen(self, cutoff=5.0):
-        self.impDihedrals = []
-
-        for atom in self.adjList:
-            if len(self.adjList[atom]) == 3 and self.RingUtil.isRingMember(atom):
-                tempList = tuple([atom] + self.adjList[atom])
-                dihedralAngle = self.dihedralEstimator.get(tempList)
-                if dihedralAngle < cutoff:
-                    self.impDihedrals.append(tempList)
+    def __init__(self, mol, aromaticity=None):
+        self.mol = mol
+        self.aromaticity = aromaticity
+        self.bonds = np.asarray(mol.bonds, dtype=np.int64).reshape(-1, 2)
+        self.indptr, self.indices = adjacency(self.bonds, mol.nAtoms)
+
+    def centers(self, mode="aromatic"):
+        # 3-coordinate atoms in order of first appearance in bonds
+        atoms, first = np.unique(self.bonds.ravel(), return_index=True)
+        atoms = atoms[np.argsort(first)]
+        atoms = atoms[self.indptr[atoms + 1] - self.indptr[atoms] == 3]
+
+        if mode == "sp2":
+            return atoms
+        elif mode != "aromatic":
+            raise ValueError("mode must be 'aromatic' or 'sp2'")
+
+        if self.aromaticity is not None:
+            return atoms[self.aromaticity.aromaticAtom[atoms]]
+
+        ringUtil = RingUtil(self.bonds)
+        mask = [ringUtil.isRingMember(atom) for atom in atoms.tolist()]
+        return atoms[np.array(mask, dtype=bool)]
+
+    def candidates(self, mode="aromatic"):
+        # (n, 4) center-first candidates, neighbors in ascending order
+        centers = self.centers(mode)
+        start = self.indptr[centers]
+        return np.stack(
+            (
+                centers,
+                self.indices[start],
+                self.indices[start + 1],
+                self.indices[start + 2],
+            ),
+            axis=1,
+        )
+
+    @Profiler.profiled("ImproperDihedralGenerator.gen")
+    def gen(
+        self,
+        cutoff=5.0,
+        frames=None,
+        criterion="mean",
+        mode="aromatic",
+        order="gromacs",
+    ):
+        """
+        frames: sequence of (nAtoms, 3) coordinates or a (nFrames, nAtoms, 3)
+        array, defaults to all models of the pdb file.
+        criterion: "mean" or "max" deviation over frames.
+        mode: "aromatic" or "sp2" centers.
+        order: "gromacs" (center first) or "amber" (center third).
+        """
+
+        if order not in ("gromacs", "amber"):
+            raise ValueError("order must be 'gromacs' or 'amber'")
+
+        candidates = self.candidates(mode)
+
+        if frames is None:
+            frames = getattr(self.mol, "frames", None)
+        if frames is None:
+            frames = np.stack((self.mol.x, self.mol.y, self.mol.z), axis=1)
+
+        frames = np.asarray(frames, dtype=np.float64)
+        if frames.ndim == 2:
+            frames = frames[None]
+
+        pbc = {
+            "box": getattr(self.mol, "box", None),
+            "lpbc": getattr(self.mol, "lpbc", (True, True, True)),
+        }
+        if not len(candidates):
+            deviation = np.zeros(0)
+        elif frames.shape[0] == 1:
+            deviation = np.abs(batchDihedrals(frames, candidates, **pbc)[0])
+        else:
+            deviation = batchDihedrals(frames, candidates, reduce=criterion, **pbc)
+
+        self.impDihedrals = candidates[deviation < cutoff]
+        if order == "amber":
+            self.impDihedrals = self.impDihedrals[:, [1, 2, 0, 3]]
 
         return self.impDihedrals
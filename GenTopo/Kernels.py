@@ -0,0 +1,316 @@
+"""
+Graph kernels behind a backend switch:
+
+    python  reference implementation, plain python loops
+    numpy   vectorized numpy implementation
+    cython  compiled GenTopo._kernels extension (built by setup.py
+            when Cython is available)
+
+The default is cython if the extension is built, numpy otherwise; it
+can be set with the GENTOPO_BACKEND environment variable or setBackend.
+All backends return identical results, so they can be cross-validated:
+
+    from GenTopo import Kernels
+    Kernels.setBackend("python")
+"""
+
+from GenTopo.ArrayUtil import adjacency, canonicalTerms, neighborPairs, uniqueRows
+from GenTopo.RingUtil import RingUtil
+from GenTopo.Warning import kernels_missing
+from itertools import product
+import os
+import numpy as np
+
+try:
+    from GenTopo import _kernels
+except ImportError:
+    _kernels = None
+
+BACKENDS = ("python", "numpy", "cython")
+_backend = None
+
+
+def setBackend(name=None):
+    global _backend
+
+    if name is None:
+        name = os.environ.get("GENTOPO_BACKEND") or (
+            "cython" if _kernels is not None else "numpy"
+        )
+    if name not in BACKENDS:
+        raise ValueError("backend must be one of %s" % (BACKENDS,))
+    if name == "cython" and _kernels is None:
+        raise ImportError(kernels_missing)
+
+    _backend = name
+
+
+def getBackend():
+    if _backend is None:
+        setBackend()
+    return _backend
+
+
+def _nAtoms(bonds, nAtoms):
+    if nAtoms is None:
+        nAtoms = int(bonds.max()) if len(bonds) else 0
+    return nAtoms
+
+
+def extendTerms(bonds, terms, nAtoms=None):
+    """
+    Extends every term (bonds, angles, ...) by one bonded atom at
+    either end, for example angles give dihedrals. It returns sorted
+    unique (n, k + 1) terms with first atom < last atom.
+    """
+
+    bonds = np.asarray(bonds, dtype=np.int64).reshape(-1, 2)
+    terms = np.asarray(terms, dtype=np.int64)
+    width = terms.shape[1] + 1 if terms.ndim == 2 else 3
+    terms = terms.reshape(-1, width - 1)
+
+    if not len(terms) or not len(bonds):
+        return np.zeros((0, width), dtype=np.int64)
+
+    backend = getBackend()
+    if backend == "python":
+        nextTerms = np.array(_pyExtendTerms(bonds, terms), dtype=np.int64)
+        return uniqueRows(nextTerms.reshape(-1, width))
+
+    indptr, indices = adjacency(bonds, _nAtoms(bonds, nAtoms))
+    if backend == "cython":
+        nextTerms = _kernels.extendTerms(indptr, indices, np.ascontiguousarray(terms))
+    else:
+        nextTerms = np.concatenate(
+            (
+                _npExtend(indptr, indices, terms, atEnd=True),
+                _npExtend(indptr, indices, terms, atEnd=False),
+            )
+        )
+
+    if not len(nextTerms):
+        return np.zeros((0, width), dtype=np.int64)
+    return uniqueRows(canonicalTerms(nextTerms))
+
+
+def _npExtend(indptr, indices, terms, atEnd):
+    row, atom = neighborPairs(indptr, indices, terms[:, -1 if atEnd else 0])
+    keep = ~(terms[row] == atom[:, None]).any(axis=1)
+    row, atom = row[keep], atom[keep]
+
+    if atEnd:
+        return np.column_stack((terms[row], atom))
+    return np.column_stack((atom, terms[row]))
+
+
+def _pyExtendTerms(bonds, terms):
+    # reference: former MolGraph.getNext
+    nextList = []
+
+    bonds = list(map(tuple, bonds.tolist()))
+    currentList = list(map(tuple, terms.tolist()))
+    n = len(currentList[0]) - 1
+
+    for clist in currentList:
+        for bond in bonds:
+
+            if (bond[0] not in clist) and (bond[1] not in clist):
+                continue
+            elif (bond[0] in clist) and (bond[1] in clist):
+                continue
+
+            tempList = None
+            if bond[0] == clist[n]:
+                tempList = clist + (bond[1],)
+
+            elif bond[1] == clist[n]:
+                tempList = clist + (bond[0],)
+
+            elif bond[0] == clist[0]:
+                tempList = (bond[1],) + clist
+
+            elif bond[1] == clist[0]:
+                tempList = (bond[0],) + clist
+
+            if tempList:
+                if tempList[0] > tempList[-1]:
+                    tempList = tempList[::-1]
+                nextList.append(tempList)
+
+    return list(set(nextList))
+
+
+def searchBonds(coords, radii, scale=0.6, chunkSize=2 ** 20):
+    """
+    Distance based bond search: atoms i < j are bonded if their distance
+    is below scale * (radius_i + radius_j). Atoms are binned in a cell
+    grid so only neighboring cells are compared. It returns sorted
+    (n, 2) 1-based bonds.
+    """
+
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    radii = np.asarray(radii, dtype=np.float64)
+
+    if len(coords) < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    backend = getBackend()
+    if backend == "python":
+        bonds = np.array(_pySearchBonds(coords, radii, scale), dtype=np.int64)
+        return bonds.reshape(-1, 2)
+
+    # cells at least as large as the largest cutoff
+    cutoff = 2.0 * scale * radii.max()
+    cell = np.floor((coords - coords.min(axis=0)) / cutoff).astype(np.int64)
+    dims = cell.max(axis=0) + 1
+    keys = (cell[:, 0] * dims[1] + cell[:, 1]) * dims[2] + cell[:, 2]
+    order = np.argsort(keys, kind="stable")
+    sortedKeys = keys[order]
+
+    if backend == "cython":
+        bonds = _kernels.searchBonds(
+            coords, radii, float(scale), cell, dims, order, sortedKeys
+        )
+    else:
+        bonds = _npSearchBonds(
+            coords, radii, scale, cell, dims, order, sortedKeys, chunkSize
+        )
+
+    return uniqueRows(bonds.reshape(-1, 2))
+
+
+def _npSearchBonds(coords, radii, scale, cell, dims, order, sortedKeys, chunkSize):
+    blocks = []
+
+    for offset in product((-1, 0, 1), repeat=3):
+        neighbor = cell + offset
+        atoms = np.flatnonzero(((neighbor >= 0) & (neighbor < dims)).all(axis=1))
+        neighbor = neighbor[atoms]
+        keys = (neighbor[:, 0] * dims[1] + neighbor[:, 1]) * dims[2] + neighbor[:, 2]
+        start = np.searchsorted(sortedKeys, keys, side="left")
+        count = np.searchsorted(sortedKeys, keys, side="right") - start
+
+        # expand atoms in chunks so candidate pairs stay bounded
+        total = np.cumsum(count)
+        lo = 0
+        while lo < len(atoms):
+            hi = int(np.searchsorted(total, total[lo] - count[lo] + chunkSize)) + 1
+            hi = min(max(hi, lo + 1), len(atoms))
+
+            c = count[lo:hi]
+            row = np.repeat(np.arange(lo, hi), c)
+            shift = np.arange(len(row)) - np.repeat(np.cumsum(c) - c, c)
+            i = atoms[row]
+            j = order[start[row] + shift]
+
+            keep = i < j
+            i, j = i[keep], j[keep]
+            d = coords[i] - coords[j]
+            r = (d * d).sum(axis=1)
+            rcut = scale * (radii[i] + radii[j])
+            keep = r < rcut * rcut
+
+            blocks.append(np.column_stack((i[keep] + 1, j[keep] + 1)))
+            lo = hi
+
+    return np.concatenate(blocks)
+
+
+def _pySearchBonds(coords, radii, scale):
+    # reference: former PDBobj.genBonds
+    bonds = []
+    x, y, z = coords.T.tolist()
+    radii = radii.tolist()
+    nAtoms = len(radii)
+
+    for iatom in range(nAtoms - 1):
+        iradius = radii[iatom]
+        for jatom in range(iatom + 1, nAtoms):
+            jradius = radii[jatom]
+            rcut = scale * (iradius + jradius)
+            dx = x[iatom] - x[jatom]
+            dy = y[iatom] - y[jatom]
+            dz = z[iatom] - z[jatom]
+            r = dx * dx + dy * dy + dz * dz
+            if r < rcut ** 2:
+                bonds.append((iatom + 1, jatom + 1))
+
+    return bonds
+
+
+def ringBonds(bonds, nAtoms=None):
+    """
+    Marks bonds that are part of a ring, i.e. all bonds that are not
+    bridges. Bridges are found by an iterative Tarjan low-link search,
+    which is linear in atoms + bonds and has no recursion limit (depth
+    first search does not vectorize, the numpy backend runs it as a
+    loop over flat lists).
+    """
+
+    bonds = np.asarray(bonds, dtype=np.int64).reshape(-1, 2)
+    if not len(bonds):
+        return np.zeros(0, dtype=bool)
+
+    backend = getBackend()
+    if backend == "python":
+        return _pyRingBonds(bonds)
+
+    indptr, indices, edges = adjacency(bonds, _nAtoms(bonds, nAtoms), edgeIDs=True)
+    if backend == "cython":
+        return _kernels.ringBonds(indptr, indices, edges, len(bonds)).astype(bool)
+    return _npRingBonds(indptr, indices, edges, len(bonds))
+
+
+def _npRingBonds(indptr, indices, edges, nBonds):
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+    edges = edges.tolist()
+    nAtoms = len(indptr) - 2
+
+    disc = [0] * (nAtoms + 1)
+    low = [0] * (nAtoms + 1)
+    bridge = [False] * nBonds
+    timer = 1
+
+    for root in range(1, nAtoms + 1):
+        if disc[root] or indptr[root] == indptr[root + 1]:
+            continue
+
+        disc[root] = low[root] = timer
+        timer += 1
+        stack = [[root, -1, indptr[root]]]  # atom, parent bond, next entry
+
+        while stack:
+            top = stack[-1]
+            v, parentBond, ptr = top
+
+            if ptr < indptr[v + 1]:
+                top[2] = ptr + 1
+                if edges[ptr] == parentBond:
+                    continue
+
+                w = indices[ptr]
+                if disc[w]:
+                    if disc[w] < low[v]:
+                        low[v] = disc[w]
+                else:
+                    disc[w] = low[w] = timer
+                    timer += 1
+                    stack.append([w, edges[ptr], indptr[w]])
+            else:
+                stack.pop()
+                if stack:
+                    u = stack[-1][0]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+                    if low[v] > disc[u]:
+                        bridge[parentBond] = True
+
+    return ~np.array(bridge, dtype=bool)
+
+
+def _pyRingBonds(bonds):
+    # reference: RingUtil breadth first search per bond
+    ringUtil = RingUtil(bonds)
+    mask = [ringUtil.isFormRing(i, j) for i, j in bonds.tolist()]
+    return np.array(mask, dtype=bool)
@@ -0,0 +1,150 @@
+from GenTopo.TopoBase import TopoBase
+from GenTopo.BulkFormat import writeRows, writeColumns, OrderedWriter
+from GenTopo import Profiler
+import numpy as np
+
+SECTIONS = ("Bond", "Angle", "Dihedral", "Improper")
+FAMILIES = dict(zip(SECTIONS, ("bonds", "angles", "dihedrals", "imDihedrals")))
+
+
+class LammpsData(TopoBase):
+    """
+    Writes a LAMMPS data file (atom_style full) template from
+    PDBobj and MolGraph. Types are named through "Type Labels"
+    sections, masses are element masses of the types (see
+    TopoBase.typeElements), coefficients need to be filled by user.
+
+    Only the bonded sections passed to write are written; families of
+    the others are neither generated nor typed, e.g. for bond-only
+    models: lmp.write("data.lmp", sections=("Bond",)).
+
+    Example:
+        lmp = LammpsData(mol, graph)
+        lmp.write("data.lmp")
+    """
+
+    emitted = SECTIONS
+
+    @Profiler.profiled("LammpsData.write")
+    def write(
+        self, dataFile="data.lmp", nWorkers=1, processes=False, sections=SECTIONS
+    ):
+        for name in sections:
+            if name not in SECTIONS:
+                raise ValueError("sections must be a subset of %s" % (SECTIONS,))
+        self.emitted = tuple(sections)
+
+        self.dataFH = open(dataFile, "w")
+        if nWorkers > 1:
+            # formatting in a pool, see GMXTopo.Topo.write
+            self.dataFH = OrderedWriter(self.dataFH, nWorkers, processes)
+        self.writeHeader()
+        self.writeTypeLabels()
+        self.writeMasses()
+        self.writeAtoms()
+        for name, terms, _, typeIDs in self.sections():
+            self.writeTerms(name, terms, typeIDs)
+
+        self.dataFH.close()
+
+    def sections(self):
+        # (name, terms, types, typeIDs) of every written bonded section
+        return tuple(
+            (name, getattr(self.molGraph, FAMILIES[name])) + self.types(FAMILIES[name])
+            for name in self.emitted
+        )
+
+    def writeHeader(self):
+        self.dataFH.write("LAMMPS data file generated by GenTopo\n\n")
+
+        self.dataFH.write("%10d atoms\n" % self.molGraph.nAtoms)
+        for name, terms, _, _ in self.sections():
+            self.dataFH.write("%10d %ss\n" % (len(terms), name.lower()))
+
+        self.dataFH.write("\n%10d atom types\n" % len(self.typeNames))
+        for name, _, types, _ in self.sections():
+            self.dataFH.write("%10d %s types\n" % (len(types), name.lower()))
+
+        coords = np.column_stack((self.mol.x, self.mol.y, self.mol.z))
+        if self.mol.box:
+            lo = np.zeros(3)
+            hi = np.asarray(self.mol.box, dtype=np.float64)
+        else:
+            lo = coords.min(axis=0) - 1.0
+            hi = coords.max(axis=0) + 1.0
+
+        self.dataFH.write("\n")
+        for k, axis in enumerate("xyz"):
+            self.dataFH.write(
+                "%12.6f %12.6f %slo %shi\n" % (lo[k], hi[k], axis, axis)
+            )
+
+    def writeTypeLabels(self):
+        self.dataFH.write("\nAtom Type Labels\n\n")
+        writeColumns(
+            self.dataFH,
+            "%6d %s\n",
+            (np.arange(1, len(self.typeNames) + 1), self.typeNames),
+        )
+
+        for name, _, types, _ in self.sections():
+            if not types:
+                continue
+
+            self.dataFH.write("\n%s Type Labels\n\n" % name)
+            labels = ["-".join(typ) for typ in types]
+            writeColumns(
+                self.dataFH, "%6d %s\n", (np.arange(1, len(labels) + 1), labels)
+            )
+
+    def writeMasses(self):
+        self.dataFH.write("\nMasses\n\n")
+        masses = self.typeElements()[1]
+        writeColumns(
+            self.dataFH,
+            "%6d %10.5f  # %s\n",
+            (np.arange(1, len(self.typeNames) + 1), masses, self.typeNames),
+        )
+
+    def writeAtoms(self):
+        self.dataFH.write("\nAtoms  # full\n\n")
+
+        nAtoms = self.molGraph.nAtoms
+        writeColumns(
+            self.dataFH,
+            "%8d %6d %4d %12.6f %12.6f %12.6f %12.6f\n",
+            (
+                np.arange(1, nAtoms + 1),
+                self.mol.resIDs[:nAtoms],
+                self.atomTypeIDs[:nAtoms] + 1,
+                self.atomQQs[:nAtoms],
+                self.mol.x[:nAtoms],
+                self.mol.y[:nAtoms],
+                self.mol.z[:nAtoms],
+            ),
+        )
+
+    def writeTerms(self, name, terms, typeIDs):
+        if len(terms) == 0:
+            return
+
+        self.dataFH.write("\n%ss\n\n" % name)
+
+        width = terms.shape[1]
+        rows = np.empty((len(terms), width + 2), dtype=np.int64)
+        rows[:, 0] = np.arange(1, len(terms) + 1)
+        rows[:, 1] = typeIDs + 1
+        rows[:, 2:] = terms
+        writeRows(self.dataFH, "%8d %4d" + " %8d" * width + "\n", rows)
+
+    def writeBonds(self):
+        self.writeTerms("Bond", self.molGraph.bonds, self.bondTypeIDs)
+
+    def writeAngles(self):
+        self.writeTerms("Angle", self.molGraph.angles, self.angleTypeIDs)
+
+    def writeDihedrals(self):
+        self.writeTerms("Dihedral", self.molGraph.dihedrals, self.dihedralTypeIDs)
+
+    def writeImpropers(self):
+        self.writeTerms("Improper", self.molGraph.imDihedrals, self.imDihedralTypeIDs)
@@ -0,0 +1,69 @@
+from GenTopo.TopoBase import TopoBase
+from GenTopo.BulkFormat import writeColumns, writeWrapped, OrderedWriter
+from GenTopo import Profiler
+import numpy as np
+
+
+class PSF(TopoBase):
+    """
+    Writes a NAMD/X-PLOR style PSF (EXT format) from PDBobj and
+    MolGraph, atom types are written by name.
+
+    Example:
+        psf = PSF(mol, graph)
+        psf.write("topol.psf")
+    """
+
+    @Profiler.profiled("PSF.write")
+    def write(self, psfFile="topol.psf", segName="MOL", nWorkers=1, processes=False):
+        self.segName = segName
+        self.psfFH = open(psfFile, "w")
+        if nWorkers > 1:
+            # formatting in a pool, see GMXTopo.Topo.write
+            self.psfFH = OrderedWriter(self.psfFH, nWorkers, processes)
+        self.writeHeader()
+        self.writeAtoms()
+        self.writeTerms("!NBOND: bonds", self.molGraph.bonds, 4)
+        self.writeTerms("!NTHETA: angles", self.molGraph.angles, 3)
+        self.writeTerms("!NPHI: dihedrals", self.molGraph.dihedrals, 2)
+        self.writeTerms("!NIMPHI: impropers", self.molGraph.imDihedrals, 2)
+        self.writeTail()
+
+        self.psfFH.close()
+
+    def writeHeader(self):
+        self.psfFH.write("PSF EXT\n\n")
+        self.psfFH.write("%10d !NTITLE\n" % 1)
+        self.psfFH.write(" REMARKS generated by GenTopo\n\n")
+
+    def writeAtoms(self):
+        nAtoms = self.molGraph.nAtoms
+        self.psfFH.write("%10d !NATOM\n" % nAtoms)
+
+        writeColumns(
+            self.psfFH,
+            "%10d %-8s %-8d %-8s %-8s %-6s %10.6f    %10.4f  %10d\n",
+            (
+                np.arange(1, nAtoms + 1),
+                [self.segName] * nAtoms,
+                self.mol.resIDs[:nAtoms],
+                self.mol.resNames[:nAtoms],
+                self.mol.symbols[:nAtoms],
+                self.atomTypes[:nAtoms],
+                self.atomQQs[:nAtoms],
+                self.atomMasses[:nAtoms],
+                np.zeros(nAtoms, dtype=np.int64),
+            ),
+        )
+
+    def writeTerms(self, title, terms, perLine):
+        self.psfFH.write("\n%10d %s\n" % (len(terms), title))
+        writeWrapped(self.psfFH, "%10d", terms, perLine)
+
+    def writeTail(self):
+        self.psfFH.write("\n%10d !NDON: donors\n\n" % 0)
+        self.psfFH.write("\n%10d !NACC: acceptors\n\n" % 0)
+        self.psfFH.write("\n%10d !NNB\n\n" % 0)
+        writeWrapped(self.psfFH, "%10d", np.zeros(self.molGraph.nAtoms, dtype=int), 8)
+        self.psfFH.write("\n%10d%10d !NGRP\n" % (1, 0))
+        self.psfFH.write("%10d%10d%10d\n" % (0, 0, 0))
@@ -1,656 +1,227 @@
-elements = {
-    "H": {
-        "vdw_radius": 1.20,
-        "vesta_color": (1.00, 0.80, 0.80),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (1.00, 1.00, 1.00),
-    },
-    "He": {
-        "vdw_radius": 1.43,
-        "vesta_color": (0.99, 0.91, 0.81),
-        "cpk_color": (1.00, 0.75, 0.80),
-        "jmol_color": (0.85, 1.00, 1.00),
-    },
-    "Li": {
-        "vdw_radius": 2.12,
-        "vesta_color": (0.53, 0.88, 0.46),
-        "cpk_color": (0.70, 0.13, 0.13),
-        "jmol_color": (0.80, 0.50, 1.00),
-    },
-    "Be": {
-        "vdw_radius": 1.98,
-        "vesta_color": (0.37, 0.85, 0.48),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.76, 1.00, 0.00),
-    },
-    "B": {
-        "vdw_radius": 1.91,
-        "vesta_color": (0.12, 0.64, 0.06),
-        "cpk_color": (0.00, 1.00, 0.00),
-        "jmol_color": (1.00, 0.71, 0.71),
-    },
-    "C": {
-        "vdw_radius": 1.77,
-        "vesta_color": (0.50, 0.29, 0.16),
-        "cpk_color": (0.78, 0.78, 0.78),
-        "jmol_color": (0.56, 0.56, 0.56),
-    },
-    "N": {
-        "vdw_radius": 1.66,
-        "vesta_color": (0.69, 0.73, 0.90),
-        "cpk_color": (0.56, 0.56, 1.00),
-        "jmol_color": (0.19, 0.31, 0.97),
-    },
-    "O": {
-        "vdw_radius": 1.50,
-        "vesta_color": (1.00, 0.01, 0.00),
-        "cpk_color": (0.94, 0.00, 0.00),
-        "jmol_color": (1.00, 0.05, 0.05),
-    },
-    "F": {
-        "vdw_radius": 1.46,
-        "vesta_color": (0.69, 0.73, 0.90),
-        "cpk_color": (0.85, 0.65, 0.12),
-        "jmol_color": (0.56, 0.88, 0.31),
-    },
-    "Ne": {
-        "vdw_radius": 1.58,
-        "vesta_color": (1.00, 0.22, 0.71),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.70, 0.89, 0.96),
-    },
-    "Na": {
-        "vdw_radius": 2.50,
-        "vesta_color": (0.98, 0.87, 0.24),
-        "cpk_color": (0.00, 0.00, 1.00),
-        "jmol_color": (0.67, 0.36, 0.95),
-    },
-    "Mg": {
-        "vdw_radius": 2.51,
-        "vesta_color": (0.99, 0.48, 0.08),
-        "cpk_color": (0.13, 0.55, 0.13),
-        "jmol_color": (0.54, 1.00, 0.00),
-    },
-    "Al": {
-        "vdw_radius": 2.25,
-        "vesta_color": (0.51, 0.70, 0.84),
-        "cpk_color": (0.50, 0.50, 0.56),
-        "jmol_color": (0.75, 0.65, 0.65),
-    },
-    "Si": {
-        "vdw_radius": 2.19,
-        "vesta_color": (0.11, 0.23, 0.98),
-        "cpk_color": (0.85, 0.65, 0.12),
-        "jmol_color": (0.94, 0.78, 0.63),
-    },
-    "P": {
-        "vdw_radius": 1.90,
-        "vesta_color": (0.76, 0.61, 0.76),
-        "cpk_color": (1.00, 0.65, 0.00),
-        "jmol_color": (1.00, 0.50, 0.00),
-    },
-    "S": {
-        "vdw_radius": 1.89,
-        "vesta_color": (1.00, 0.98, 0.00),
-        "cpk_color": (1.00, 0.78, 0.20),
-        "jmol_color": (1.00, 1.00, 0.19),
-    },
-    "Cl": {
-        "vdw_radius": 1.82,
-        "vesta_color": (0.20, 0.99, 0.01),
-        "cpk_color": (0.00, 1.00, 0.00),
-        "jmol_color": (0.12, 0.94, 0.12),
-    },
-    "Ar": {
-        "vdw_radius": 1.83,
-        "vesta_color": (0.81, 1.00, 0.77),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.50, 0.82, 0.89),
-    },
-    "K": {
-        "vdw_radius": 2.73,
-        "vesta_color": (0.63, 0.13, 0.97),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.56, 0.25, 0.83),
-    },
-    "Ca": {
-        "vdw_radius": 2.62,
-        "vesta_color": (0.36, 0.59, 0.74),
-        "cpk_color": (0.50, 0.50, 0.56),
-        "jmol_color": (0.24, 1.00, 0.00),
-    },
-    "Sc": {
-        "vdw_radius": 2.58,
-        "vesta_color": (0.71, 0.39, 0.67),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.90, 0.90, 0.90),
-    },
-    "Ti": {
-        "vdw_radius": 2.46,
-        "vesta_color": (0.47, 0.79, 1.00),
-        "cpk_color": (0.50, 0.50, 0.56),
-        "jmol_color": (0.75, 0.76, 0.78),
-    },
-    "V": {
-        "vdw_radius": 2.42,
-        "vesta_color": (0.90, 0.10, 0.00),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.65, 0.65, 0.67),
-    },
-    "Cr": {
-        "vdw_radius": 2.45,
-        "vesta_color": (0.00, 0.00, 0.62),
-        "cpk_color": (0.50, 0.50, 0.56),
-        "jmol_color": (0.54, 0.60, 0.78),
-    },
-    "Mn": {
-        "vdw_radius": 2.45,
-        "vesta_color": (0.66, 0.03, 0.62),
-        "cpk_color": (0.50, 0.50, 0.56),
-        "jmol_color": (0.61, 0.48, 0.78),
-    },
-    "Fe": {
-        "vdw_radius": 2.44,
-        "vesta_color": (0.71, 0.45, 0.00),
-        "cpk_color": (1.00, 0.65, 0.00),
-        "jmol_color": (0.88, 0.40, 0.20),
-    },
-    "Co": {
-        "vdw_radius": 2.40,
-        "vesta_color": (0.00, 0.00, 0.69),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.94, 0.56, 0.63),
-    },
-    "Ni": {
-        "vdw_radius": 2.40,
-        "vesta_color": (0.72, 0.74, 0.74),
-        "cpk_color": (0.65, 0.17, 0.17),
-        "jmol_color": (0.31, 0.82, 0.31),
-    },
-    "Cu": {
-        "vdw_radius": 2.38,
-        "vesta_color": (0.13, 0.28, 0.87),
-        "cpk_color": (0.65, 0.17, 0.17),
-        "jmol_color": (0.78, 0.50, 0.20),
-    },
-    "Zn": {
-        "vdw_radius": 2.39,
-        "vesta_color": (0.56, 0.56, 0.51),
-        "cpk_color": (0.65, 0.17, 0.17),
-        "jmol_color": (0.49, 0.50, 0.69),
-    },
-    "Ga": {
-        "vdw_radius": 2.32,
-        "vesta_color": (0.62, 0.89, 0.45),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.76, 0.56, 0.56),
-    },
-    "Ge": {
-        "vdw_radius": 2.29,
-        "vesta_color": (0.50, 0.43, 0.65),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.40, 0.56, 0.56),
-    },
-    "As": {
-        "vdw_radius": 1.88,
-        "vesta_color": (0.46, 0.82, 0.34),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.74, 0.50, 0.89),
-    },
-    "Se": {
-        "vdw_radius": 1.82,
-        "vesta_color": (0.60, 0.94, 0.06),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (1.00, 0.63, 0.00),
-    },
-    "Br": {
-        "vdw_radius": 1.86,
-        "vesta_color": (0.50, 0.19, 0.01),
-        "cpk_color": (0.65, 0.17, 0.17),
-        "jmol_color": (0.65, 0.16, 0.16),
-    },
-    "Kr": {
-        "vdw_radius": 2.25,
-        "vesta_color": (0.98, 0.76, 0.95),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.36, 0.72, 0.82),
-    },
-    "Rb": {
-        "vdw_radius": 3.21,
-        "vesta_color": (1.00, 0.00, 0.60),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.44, 0.18, 0.69),
-    },
-    "Sr": {
-        "vdw_radius": 2.84,
-        "vesta_color": (0.00, 1.00, 0.15),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.00, 1.00, 0.00),
-    },
-    "Y": {
-        "vdw_radius": 2.75,
-        "vesta_color": (0.40, 0.60, 0.56),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.58, 1.00, 1.00),
-    },
-    "Zr": {
-        "vdw_radius": 2.52,
-        "vesta_color": (0.00, 1.00, 0.00),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.58, 0.88, 0.88),
-    },
-    "Nb": {
-        "vdw_radius": 2.56,
-        "vesta_color": (0.30, 0.70, 0.46),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.45, 0.76, 0.79),
-    },
-    "Mo": {
-        "vdw_radius": 2.45,
-        "vesta_color": (0.71, 0.53, 0.69),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.33, 0.71, 0.71),
-    },
-    "Tc": {
-        "vdw_radius": 2.44,
-        "vesta_color": (0.81, 0.69, 0.79),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.23, 0.62, 0.62),
-    },
-    "Ru": {
-        "vdw_radius": 2.46,
-        "vesta_color": (0.81, 0.72, 0.68),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.14, 0.56, 0.56),
-    },
-    "Rh": {
-        "vdw_radius": 2.44,
-        "vesta_color": (0.81, 0.82, 0.67),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.04, 0.49, 0.55),
-    },
-    "Pd": {
-        "vdw_radius": 2.15,
-        "vesta_color": (0.76, 0.77, 0.72),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.00, 0.41, 0.52),
-    },
-    "Ag": {
-        "vdw_radius": 2.53,
-        "vesta_color": (0.72, 0.74, 0.74),
-        "cpk_color": (0.50, 0.50, 0.56),
-        "jmol_color": (0.75, 0.75, 0.75),
-    },
-    "Cd": {
-        "vdw_radius": 2.49,
-        "vesta_color": (0.95, 0.12, 0.86),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (1.00, 0.85, 0.56),
-    },
-    "In": {
-        "vdw_radius": 2.43,
-        "vesta_color": (0.84, 0.50, 0.73),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.65, 0.46, 0.45),
-    },
-    "Sn": {
-        "vdw_radius": 2.42,
-        "vesta_color": (0.61, 0.56, 0.73),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.40, 0.50, 0.50),
-    },
-    "Sb": {
-        "vdw_radius": 2.47,
-        "vesta_color": (0.85, 0.51, 0.31),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.62, 0.39, 0.71),
-    },
-    "Te": {
-        "vdw_radius": 1.99,
-        "vesta_color": (0.68, 0.64, 0.32),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.83, 0.48, 0.00),
-    },
-    "I": {
-        "vdw_radius": 2.04,
-        "vesta_color": (0.56, 0.12, 0.54),
-        "cpk_color": (0.63, 0.12, 0.94),
-        "jmol_color": (0.58, 0.00, 0.58),
-    },
-    "Xe": {
-        "vdw_radius": 2.06,
-        "vesta_color": (0.61, 0.63, 0.97),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.26, 0.62, 0.69),
-    },
-    "Cs": {
-        "vdw_radius": 3.48,
-        "vesta_color": (0.06, 1.00, 0.73),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.34, 0.09, 0.56),
-    },
-    "Ba": {
-        "vdw_radius": 3.03,
-        "vesta_color": (0.12, 0.94, 0.18),
-        "cpk_color": (1.00, 0.65, 0.00),
-        "jmol_color": (0.00, 0.79, 0.00),
-    },
-    "La": {
-        "vdw_radius": 2.98,
-        "vesta_color": (0.35, 0.77, 0.29),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.44, 0.83, 1.00),
-    },
-    "Ce": {
-        "vdw_radius": 2.88,
-        "vesta_color": (0.82, 0.99, 0.02),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (1.00, 1.00, 0.78),
-    },
-    "Pr": {
-        "vdw_radius": 2.92,
-        "vesta_color": (0.99, 0.89, 0.02),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.85, 1.00, 0.78),
-    },
-    "Nd": {
-        "vdw_radius": 2.95,
-        "vesta_color": (0.99, 0.56, 0.03),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.78, 1.00, 0.78),
-    },
-    "Pm": {
-        "vdw_radius": None,
-        "vesta_color": (0.00, 0.00, 0.96),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.64, 1.00, 0.78),
-    },
-    "Sm": {
-        "vdw_radius": 2.90,
-        "vesta_color": (0.99, 0.02, 0.49),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.56, 1.00, 0.78),
-    },
-    "Eu": {
-        "vdw_radius": 2.87,
-        "vesta_color": (0.98, 0.03, 0.84),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.38, 1.00, 0.78),
-    },
-    "Gd": {
-        "vdw_radius": 2.83,
-        "vesta_color": (0.75, 0.01, 1.00),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.27, 1.00, 0.78),
-    },
-    "Tb": {
-        "vdw_radius": 2.79,
-        "vesta_color": (0.44, 0.02, 1.00),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.19, 1.00, 0.78),
-    },
-    "Dy": {
-        "vdw_radius": 2.87,
-        "vesta_color": (0.19, 0.02, 0.99),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.12, 1.00, 0.78),
-    },
-    "Ho": {
-        "vdw_radius": 2.81,
-        "vesta_color": (0.03, 0.26, 0.99),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.00, 1.00, 0.61),
-    },
-    "Er": {
-        "vdw_radius": 2.83,
-        "vesta_color": (0.29, 0.45, 0.23),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.00, 0.90, 0.46),
-    },
-    "Tm": {
-        "vdw_radius": 2.79,
-        "vesta_color": (0.00, 0.00, 0.88),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.00, 0.83, 0.32),
-    },
-    "Yb": {
-        "vdw_radius": 2.80,
-        "vesta_color": (0.15, 0.99, 0.96),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.00, 0.75, 0.22),
-    },
-    "Lu": {
-        "vdw_radius": 2.74,
-        "vesta_color": (0.15, 0.99, 0.71),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.00, 0.67, 0.14),
-    },
-    "Hf": {
-        "vdw_radius": 2.63,
-        "vesta_color": (0.71, 0.71, 0.35),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.30, 0.76, 1.00),
-    },
-    "Ta": {
-        "vdw_radius": 2.53,
-        "vesta_color": (0.72, 0.61, 0.34),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.30, 0.65, 1.00),
-    },
-    "W": {
-        "vdw_radius": 2.57,
-        "vesta_color": (0.56, 0.54, 0.50),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.13, 0.58, 0.84),
-    },
-    "Re": {
-        "vdw_radius": 2.49,
-        "vesta_color": (0.70, 0.69, 0.56),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.15, 0.49, 0.67),
-    },
-    "Os": {
-        "vdw_radius": 2.48,
-        "vesta_color": (0.79, 0.70, 0.47),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.15, 0.40, 0.59),
-    },
-    "Ir": {
-        "vdw_radius": 2.41,
-        "vesta_color": (0.79, 0.81, 0.45),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.09, 0.33, 0.53),
-    },
-    "Pt": {
-        "vdw_radius": 2.29,
-        "vesta_color": (0.80, 0.78, 0.75),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.82, 0.82, 0.88),
-    },
-    "Au": {
-        "vdw_radius": 2.32,
-        "vesta_color": (1.00, 0.70, 0.22),
-        "cpk_color": (0.85, 0.65, 0.12),
-        "jmol_color": (1.00, 0.82, 0.14),
-    },
-    "Hg": {
-        "vdw_radius": 2.45,
-        "vesta_color": (0.83, 0.72, 0.80),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.72, 0.72, 0.82),
-    },
-    "Tl": {
-        "vdw_radius": 2.47,
-        "vesta_color": (0.59, 0.54, 0.43),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.65, 0.33, 0.30),
-    },
-    "Pb": {
-        "vdw_radius": 2.60,
-        "vesta_color": (0.32, 0.33, 0.36),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.34, 0.35, 0.38),
-    },
-    "Bi": {
-        "vdw_radius": 2.54,
-        "vesta_color": (0.82, 0.19, 0.97),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.62, 0.31, 0.71),
-    },
-    "Po": {
-        "vdw_radius": None,
-        "vesta_color": (0.00, 0.00, 1.00),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.67, 0.36, 0.00),
-    },
-    "At": {
-        "vdw_radius": None,
-        "vesta_color": (0.00, 0.00, 1.00),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.46, 0.31, 0.27),
-    },
-    "Rn": {
-        "vdw_radius": None,
-        "vesta_color": (1.00, 1.00, 0.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.26, 0.51, 0.59),
-    },
-    "Fr": {
-        "vdw_radius": None,
-        "vesta_color": (0.00, 0.00, 0.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.26, 0.00, 0.40),
-    },
-    "Ra": {
-        "vdw_radius": None,
-        "vesta_color": (0.43, 0.67, 0.35),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.00, 0.49, 0.00),
-    },
-    "Ac": {
-        "vdw_radius": 2.80,
-        "vesta_color": (0.39, 0.62, 0.45),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.44, 0.67, 0.98),
-    },
-    "Th": {
-        "vdw_radius": 2.93,
-        "vesta_color": (0.15, 1.00, 0.47),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.00, 0.73, 1.00),
-    },
-    "Pa": {
-        "vdw_radius": 2.88,
-        "vesta_color": (0.16, 0.98, 0.21),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.00, 0.63, 1.00),
-    },
-    "U": {
-        "vdw_radius": 2.71,
-        "vesta_color": (0.48, 0.63, 0.67),
-        "cpk_color": (1.00, 0.08, 0.58),
-        "jmol_color": (0.00, 0.56, 1.00),
-    },
-    "Np": {
-        "vdw_radius": 2.82,
-        "vesta_color": (0.30, 0.30, 0.30),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.00, 0.50, 1.00),
-    },
-    "Pu": {
-        "vdw_radius": 2.81,
-        "vesta_color": (0.30, 0.30, 0.30),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.00, 0.42, 1.00),
-    },
-    "Am": {
-        "vdw_radius": 2.83,
-        "vesta_color": (0.30, 0.30, 0.30),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.33, 0.36, 0.95),
-    },
-    "Cm": {
-        "vdw_radius": 3.05,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.47, 0.36, 0.89),
-    },
-    "Bk": {
-        "vdw_radius": 3.40,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.54, 0.31, 0.89),
-    },
-    "Cf": {
-        "vdw_radius": 3.05,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.63, 0.21, 0.83),
-    },
-    "Es": {
-        "vdw_radius": 2.70,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.70, 0.12, 0.83),
-    },
-    "Fm": {
-        "vdw_radius": None,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.70, 0.12, 0.73),
-    },
-    "Md": {
-        "vdw_radius": None,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.70, 0.05, 0.65),
-    },
-    "No": {
-        "vdw_radius": None,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.74, 0.05, 0.53),
-    },
-    "Lr": {
-        "vdw_radius": None,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.78, 0.00, 0.40),
-    },
-    "Rf": {
-        "vdw_radius": None,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.80, 0.00, 0.35),
-    },
-    "Db": {
-        "vdw_radius": None,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.82, 0.00, 0.31),
-    },
-    "Sg": {
-        "vdw_radius": None,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.85, 0.00, 0.27),
-    },
-    "Bh": {
-        "vdw_radius": None,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.88, 0.00, 0.22),
-    },
-    "Hs": {
-        "vdw_radius": None,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.90, 0.00, 0.18),
-    },
-    "Mt": {
-        "vdw_radius": None,
-        "vesta_color": (1.00, 1.00, 1.00),
-        "cpk_color": (1.00, 1.00, 1.00),
-        "jmol_color": (0.92, 0.00, 0.15),
-    },
+"""
+Element data. TABLE holds one compact row per element in order of
+atomic number, lookups are derived from it once at import; the
+elements dict of dicts is only built when it is first accessed.
+"""
+
+import numpy as np
+
+FIELDS = ("vdw_radius", "vesta_color", "cpk_color", "jmol_color")
+
+# symbol, vdW radius, standard atomic weight (g/mol, mass number of the
+# most stable isotope for elements without stable isotopes), then
+# vesta, cpk and jmol colors; row i is atomic number i + 1
+TABLE = (
+    ("H", 1.20, 1.008, (1.00, 0.80, 0.80), (1.00, 1.00, 1.00), (1.00, 1.00, 1.00)),
+    ("He", 1.43, 4.0026, (0.99, 0.91, 0.81), (1.00, 0.75, 0.80), (0.85, 1.00, 1.00)),
+    ("Li", 2.12, 6.94, (0.53, 0.88, 0.46), (0.70, 0.13, 0.13), (0.80, 0.50, 1.00)),
+    ("Be", 1.98, 9.0122, (0.37, 0.85, 0.48), (1.00, 0.08, 0.58), (0.76, 1.00, 0.00)),
+    ("B", 1.91, 10.81, (0.12, 0.64, 0.06), (0.00, 1.00, 0.00), (1.00, 0.71, 0.71)),
+    ("C", 1.77, 12.011, (0.50, 0.29, 0.16), (0.78, 0.78, 0.78), (0.56, 0.56, 0.56)),
+    ("N", 1.66, 14.007, (0.69, 0.73, 0.90), (0.56, 0.56, 1.00), (0.19, 0.31, 0.97)),
+    ("O", 1.50, 15.999, (1.00, 0.01, 0.00), (0.94, 0.00, 0.00), (1.00, 0.05, 0.05)),
+    ("F", 1.46, 18.998, (0.69, 0.73, 0.90), (0.85, 0.65, 0.12), (0.56, 0.88, 0.31)),
+    ("Ne", 1.58, 20.18, (1.00, 0.22, 0.71), (1.00, 0.08, 0.58), (0.70, 0.89, 0.96)),
+    ("Na", 2.50, 22.99, (0.98, 0.87, 0.24), (0.00, 0.00, 1.00), (0.67, 0.36, 0.95)),
+    ("Mg", 2.51, 24.305, (0.99, 0.48, 0.08), (0.13, 0.55, 0.13), (0.54, 1.00, 0.00)),
+    ("Al", 2.25, 26.982, (0.51, 0.70, 0.84), (0.50, 0.50, 0.56), (0.75, 0.65, 0.65)),
+    ("Si", 2.19, 28.085, (0.11, 0.23, 0.98), (0.85, 0.65, 0.12), (0.94, 0.78, 0.63)),
+    ("P", 1.90, 30.974, (0.76, 0.61, 0.76), (1.00, 0.65, 0.00), (1.00, 0.50, 0.00)),
+    ("S", 1.89, 32.06, (1.00, 0.98, 0.00), (1.00, 0.78, 0.20), (1.00, 1.00, 0.19)),
+    ("Cl", 1.82, 35.45, (0.20, 0.99, 0.01), (0.00, 1.00, 0.00), (0.12, 0.94, 0.12)),
+    ("Ar", 1.83, 39.948, (0.81, 1.00, 0.77), (1.00, 0.08, 0.58), (0.50, 0.82, 0.89)),
+    ("K", 2.73, 39.098, (0.63, 0.13, 0.97), (1.00, 0.08, 0.58), (0.56, 0.25, 0.83)),
+    ("Ca", 2.62, 40.078, (0.36, 0.59, 0.74), (0.50, 0.50, 0.56), (0.24, 1.00, 0.00)),
+    ("Sc", 2.58, 44.956, (0.71, 0.39, 0.67), (1.00, 0.08, 0.58), (0.90, 0.90, 0.90)),
+    ("Ti", 2.46, 47.867, (0.47, 0.79, 1.00), (0.50, 0.50, 0.56), (0.75, 0.76, 0.78)),
+    ("V", 2.42, 50.942, (0.90, 0.10, 0.00), (1.00, 0.08, 0.58), (0.65, 0.65, 0.67)),
+    ("Cr", 2.45, 51.996, (0.00, 0.00, 0.62), (0.50, 0.50, 0.56), (0.54, 0.60, 0.78)),
+    ("Mn", 2.45, 54.938, (0.66, 0.03, 0.62), (0.50, 0.50, 0.56), (0.61, 0.48, 0.78)),
+    ("Fe", 2.44, 55.845, (0.71, 0.45, 0.00), (1.00, 0.65, 0.00), (0.88, 0.40, 0.20)),
+    ("Co", 2.40, 58.933, (0.00, 0.00, 0.69), (1.00, 0.08, 0.58), (0.94, 0.56, 0.63)),
+    ("Ni", 2.40, 58.693, (0.72, 0.74, 0.74), (0.65, 0.17, 0.17), (0.31, 0.82, 0.31)),
+    ("Cu", 2.38, 63.546, (0.13, 0.28, 0.87), (0.65, 0.17, 0.17), (0.78, 0.50, 0.20)),
+    ("Zn", 2.39, 65.38, (0.56, 0.56, 0.51), (0.65, 0.17, 0.17), (0.49, 0.50, 0.69)),
+    ("Ga", 2.32, 69.723, (0.62, 0.89, 0.45), (1.00, 0.08, 0.58), (0.76, 0.56, 0.56)),
+    ("Ge", 2.29, 72.63, (0.50, 0.43, 0.65), (1.00, 0.08, 0.58), (0.40, 0.56, 0.56)),
+    ("As", 1.88, 74.922, (0.46, 0.82, 0.34), (1.00, 0.08, 0.58), (0.74, 0.50, 0.89)),
+    ("Se", 1.82, 78.971, (0.60, 0.94, 0.06), (1.00, 0.08, 0.58), (1.00, 0.63, 0.00)),
+    ("Br", 1.86, 79.904, (0.50, 0.19, 0.01), (0.65, 0.17, 0.17), (0.65, 0.16, 0.16)),
+    ("Kr", 2.25, 83.798, (0.98, 0.76, 0.95), (1.00, 0.08, 0.58), (0.36, 0.72, 0.82)),
+    ("Rb", 3.21, 85.468, (1.00, 0.00, 0.60), (1.00, 0.08, 0.58), (0.44, 0.18, 0.69)),
+    ("Sr", 2.84, 87.62, (0.00, 1.00, 0.15), (1.00, 0.08, 0.58), (0.00, 1.00, 0.00)),
+    ("Y", 2.75, 88.906, (0.40, 0.60, 0.56), (1.00, 0.08, 0.58), (0.58, 1.00, 1.00)),
+    ("Zr", 2.52, 91.224, (0.00, 1.00, 0.00), (1.00, 0.08, 0.58), (0.58, 0.88, 0.88)),
+    ("Nb", 2.56, 92.906, (0.30, 0.70, 0.46), (1.00, 0.08, 0.58), (0.45, 0.76, 0.79)),
+    ("Mo", 2.45, 95.95, (0.71, 0.53, 0.69), (1.00, 0.08, 0.58), (0.33, 0.71, 0.71)),
+    ("Tc", 2.44, 98.0, (0.81, 0.69, 0.79), (1.00, 0.08, 0.58), (0.23, 0.62, 0.62)),
+    ("Ru", 2.46, 101.07, (0.81, 0.72, 0.68), (1.00, 0.08, 0.58), (0.14, 0.56, 0.56)),
+    ("Rh", 2.44, 102.91, (0.81, 0.82, 0.67), (1.00, 0.08, 0.58), (0.04, 0.49, 0.55)),
+    ("Pd", 2.15, 106.42, (0.76, 0.77, 0.72), (1.00, 0.08, 0.58), (0.00, 0.41, 0.52)),
+    ("Ag", 2.53, 107.87, (0.72, 0.74, 0.74), (0.50, 0.50, 0.56), (0.75, 0.75, 0.75)),
+    ("Cd", 2.49, 112.41, (0.95, 0.12, 0.86), (1.00, 0.08, 0.58), (1.00, 0.85, 0.56)),
+    ("In", 2.43, 114.82, (0.84, 0.50, 0.73), (1.00, 0.08, 0.58), (0.65, 0.46, 0.45)),
+    ("Sn", 2.42, 118.71, (0.61, 0.56, 0.73), (1.00, 0.08, 0.58), (0.40, 0.50, 0.50)),
+    ("Sb", 2.47, 121.76, (0.85, 0.51, 0.31), (1.00, 0.08, 0.58), (0.62, 0.39, 0.71)),
+    ("Te", 1.99, 127.6, (0.68, 0.64, 0.32), (1.00, 0.08, 0.58), (0.83, 0.48, 0.00)),
+    ("I", 2.04, 126.9, (0.56, 0.12, 0.54), (0.63, 0.12, 0.94), (0.58, 0.00, 0.58)),
+    ("Xe", 2.06, 131.29, (0.61, 0.63, 0.97), (1.00, 0.08, 0.58), (0.26, 0.62, 0.69)),
+    ("Cs", 3.48, 132.91, (0.06, 1.00, 0.73), (1.00, 0.08, 0.58), (0.34, 0.09, 0.56)),
+    ("Ba", 3.03, 137.33, (0.12, 0.94, 0.18), (1.00, 0.65, 0.00), (0.00, 0.79, 0.00)),
+    ("La", 2.98, 138.91, (0.35, 0.77, 0.29), (1.00, 0.08, 0.58), (0.44, 0.83, 1.00)),
+    ("Ce", 2.88, 140.12, (0.82, 0.99, 0.02), (1.00, 0.08, 0.58), (1.00, 1.00, 0.78)),
+    ("Pr", 2.92, 140.91, (0.99, 0.89, 0.02), (1.00, 0.08, 0.58), (0.85, 1.00, 0.78)),
+    ("Nd", 2.95, 144.24, (0.99, 0.56, 0.03), (1.00, 0.08, 0.58), (0.78, 1.00, 0.78)),
+    ("Pm", None, 145.0, (0.00, 0.00, 0.96), (1.00, 0.08, 0.58), (0.64, 1.00, 0.78)),
+    ("Sm", 2.90, 150.36, (0.99, 0.02, 0.49), (1.00, 0.08, 0.58), (0.56, 1.00, 0.78)),
+    ("Eu", 2.87, 151.96, (0.98, 0.03, 0.84), (1.00, 0.08, 0.58), (0.38, 1.00, 0.78)),
+    ("Gd", 2.83, 157.25, (0.75, 0.01, 1.00), (1.00, 0.08, 0.58), (0.27, 1.00, 0.78)),
+    ("Tb", 2.79, 158.93, (0.44, 0.02, 1.00), (1.00, 0.08, 0.58), (0.19, 1.00, 0.78)),
+    ("Dy", 2.87, 162.5, (0.19, 0.02, 0.99), (1.00, 0.08, 0.58), (0.12, 1.00, 0.78)),
+    ("Ho", 2.81, 164.93, (0.03, 0.26, 0.99), (1.00, 0.08, 0.58), (0.00, 1.00, 0.61)),
+    ("Er", 2.83, 167.26, (0.29, 0.45, 0.23), (1.00, 0.08, 0.58), (0.00, 0.90, 0.46)),
+    ("Tm", 2.79, 168.93, (0.00, 0.00, 0.88), (1.00, 0.08, 0.58), (0.00, 0.83, 0.32)),
+    ("Yb", 2.80, 173.05, (0.15, 0.99, 0.96), (1.00, 0.08, 0.58), (0.00, 0.75, 0.22)),
+    ("Lu", 2.74, 174.97, (0.15, 0.99, 0.71), (1.00, 0.08, 0.58), (0.00, 0.67, 0.14)),
+    ("Hf", 2.63, 178.49, (0.71, 0.71, 0.35), (1.00, 0.08, 0.58), (0.30, 0.76, 1.00)),
+    ("Ta", 2.53, 180.95, (0.72, 0.61, 0.34), (1.00, 0.08, 0.58), (0.30, 0.65, 1.00)),
+    ("W", 2.57, 183.84, (0.56, 0.54, 0.50), (1.00, 0.08, 0.58), (0.13, 0.58, 0.84)),
+    ("Re", 2.49, 186.21, (0.70, 0.69, 0.56), (1.00, 0.08, 0.58), (0.15, 0.49, 0.67)),
+    ("Os", 2.48, 190.23, (0.79, 0.70, 0.47), (1.00, 0.08, 0.58), (0.15, 0.40, 0.59)),
+    ("Ir", 2.41, 192.22, (0.79, 0.81, 0.45), (1.00, 0.08, 0.58), (0.09, 0.33, 0.53)),
+    ("Pt", 2.29, 195.08, (0.80, 0.78, 0.75), (1.00, 0.08, 0.58), (0.82, 0.82, 0.88)),
+    ("Au", 2.32, 196.97, (1.00, 0.70, 0.22), (0.85, 0.65, 0.12), (1.00, 0.82, 0.14)),
+    ("Hg", 2.45, 200.59, (0.83, 0.72, 0.80), (1.00, 0.08, 0.58), (0.72, 0.72, 0.82)),
+    ("Tl", 2.47, 204.38, (0.59, 0.54, 0.43), (1.00, 0.08, 0.58), (0.65, 0.33, 0.30)),
+    ("Pb", 2.60, 207.2, (0.32, 0.33, 0.36), (1.00, 0.08, 0.58), (0.34, 0.35, 0.38)),
+    ("Bi", 2.54, 208.98, (0.82, 0.19, 0.97), (1.00, 0.08, 0.58), (0.62, 0.31, 0.71)),
+    ("Po", None, 209.0, (0.00, 0.00, 1.00), (1.00, 0.08, 0.58), (0.67, 0.36, 0.00)),
+    ("At", None, 210.0, (0.00, 0.00, 1.00), (1.00, 0.08, 0.58), (0.46, 0.31, 0.27)),
+    ("Rn", None, 222.0, (1.00, 1.00, 0.00), (1.00, 1.00, 1.00), (0.26, 0.51, 0.59)),
+    ("Fr", None, 223.0, (0.00, 0.00, 0.00), (1.00, 1.00, 1.00), (0.26, 0.00, 0.40)),
+    ("Ra", None, 226.0, (0.43, 0.67, 0.35), (1.00, 1.00, 1.00), (0.00, 0.49, 0.00)),
+    ("Ac", 2.80, 227.0, (0.39, 0.62, 0.45), (1.00, 1.00, 1.00), (0.44, 0.67, 0.98)),
+    ("Th", 2.93, 232.04, (0.15, 1.00, 0.47), (1.00, 0.08, 0.58), (0.00, 0.73, 1.00)),
+    ("Pa", 2.88, 231.04, (0.16, 0.98, 0.21), (1.00, 1.00, 1.00), (0.00, 0.63, 1.00)),
+    ("U", 2.71, 238.03, (0.48, 0.63, 0.67), (1.00, 0.08, 0.58), (0.00, 0.56, 1.00)),
+    ("Np", 2.82, 237.0, (0.30, 0.30, 0.30), (1.00, 1.00, 1.00), (0.00, 0.50, 1.00)),
+    ("Pu", 2.81, 244.0, (0.30, 0.30, 0.30), (1.00, 1.00, 1.00), (0.00, 0.42, 1.00)),
+    ("Am", 2.83, 243.0, (0.30, 0.30, 0.30), (1.00, 1.00, 1.00), (0.33, 0.36, 0.95)),
+    ("Cm", 3.05, 247.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.47, 0.36, 0.89)),
+    ("Bk", 3.40, 247.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.54, 0.31, 0.89)),
+    ("Cf", 3.05, 251.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.63, 0.21, 0.83)),
+    ("Es", 2.70, 252.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.70, 0.12, 0.83)),
+    ("Fm", None, 257.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.70, 0.12, 0.73)),
+    ("Md", None, 258.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.70, 0.05, 0.65)),
+    ("No", None, 259.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.74, 0.05, 0.53)),
+    ("Lr", None, 266.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.78, 0.00, 0.40)),
+    ("Rf", None, 267.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.80, 0.00, 0.35)),
+    ("Db", None, 268.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.82, 0.00, 0.31)),
+    ("Sg", None, 269.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.85, 0.00, 0.27)),
+    ("Bh", None, 270.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.88, 0.00, 0.22)),
+    ("Hs", None, 269.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.90, 0.00, 0.18)),
+    ("Mt", None, 278.0, (1.00, 1.00, 1.00), (1.00, 1.00, 1.00), (0.92, 0.00, 0.15)),
+)
+
+# common (lowest) valences, used for bond-order and aromaticity perception
+valences = {
+    "H": 1,
+    "B": 3,
+    "C": 4,
+    "N": 3,
+    "O": 2,
+    "F": 1,
+    "Si": 4,
+    "P": 3,
+    "S": 2,
+    "Cl": 1,
+    "Se": 2,
+    "Br": 1,
+    "I": 1,
 }
+
+vdwRadii = {row[0]: row[1] for row in TABLE}
+masses = {row[0]: row[2] for row in TABLE}
+
+# element symbols and masses as arrays indexed by atomic number,
+# index 0 ("", mass 0) stands for unknown elements
+symbols = np.array([""] + [row[0] for row in TABLE])
+atomicMasses = np.array([0.0] + [row[2] for row in TABLE])
+
+_symbolOrder = np.argsort(symbols)
+_sortedSymbols = symbols[_symbolOrder]
+
+
+def atomicNumbers(names):
+    # atomic number of every element symbol in names, 0 if unknown
+    names = np.asarray(names, dtype=str)
+    pos = np.minimum(np.searchsorted(_sortedSymbols, names), len(symbols) - 1)
+    found = _sortedSymbols[pos] == names
+    return np.where(found, _symbolOrder[pos], 0)
+
+
+# two-letter symbols guessed from atom names, heavier elements than Rn are
+# not; "CL"/"BR" are read as halogens even with a suffix (CL1, BR2)
+_TWO_LETTER = {row[0].upper(): row[0] for row in TABLE[:86] if len(row[0]) == 2}
+_HALOGENS = ("CL", "BR")
+
+
+def leadingLetters(name):
+    # upper-case letters of name after leading digits, up to the next non-letter
+    name = name.strip().lstrip("0123456789").upper()
+    end = 0
+    while end < len(name) and name[end].isalpha():
+        end += 1
+    return name[:end]
+
+
+def guessElement(name, resName=""):
+    """
+    Element symbol of an atom name: a two-letter symbol (Cl, Fe, Se, ...)
+    if the name is CL/BR, is the symbol alone and does not start with
+    C, H, N, O or P (FE, ZN, SE, but CA, HG, NE, PB stay one letter) or
+    equals its residue name (ions like NA, CA); else the first letter.
+    """
+
+    letters = leadingLetters(name)
+    symbol = _TWO_LETTER.get(letters[:2])
+    if symbol is not None and (
+        letters[:2] in _HALOGENS
+        or (letters == letters[:2] and letters[0] not in "CHNOP")
+        or letters == leadingLetters(resName)
+    ):
+        return symbol
+    return letters[:1]
+
+
+def guessElements(names, resNames=None, columns=None):
+    """
+    Element symbols of atom names (see guessElement), each distinct
+    (name, residue) guessed once. columns (pdb columns 77-78) take
+    precedence where they hold a known symbol.
+    """
+
+    names = np.asarray(names, dtype=str)
+    resNames = np.full(len(names), "") if resNames is None else resNames
+    keys = np.stack((names, np.asarray(resNames, dtype=str)), axis=1)
+    unique, inverse = np.unique(keys.reshape(-1, 2), axis=0, return_inverse=True)
+    guessed = [guessElement(name, resName) for name, resName in unique.tolist()]
+    result = np.array(guessed, dtype="<U2")[inverse.reshape(-1)]
+
+    if columns is not None:
+        columns = np.asarray(columns, dtype=str)
+        given = np.char.capitalize(np.char.strip(columns))
+        known = atomicNumbers(given) > 0
+        result[known] = given[known]
+    return result
+
+
+def __getattr__(name):
+    # elements[symbol][field], built from TABLE on first use
+    global elements
+    if name == "elements":
+        elements = {
+            row[0]: dict(zip(FIELDS, (row[1],) + row[3:])) for row in TABLE
+        }
+        return elements
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,219 @@
+"""
+Opt-in profiling of topology builds.
+
+Stages (PDBobj.process, MolGraph.gen, term generation, improper
+detection, type assignment and writing) are recorded as spans while
+a profiling session is active, and exported as Chrome trace JSON,
+which chrome://tracing, Perfetto and speedscope open as a flame
+chart. Stage sizes (atoms, bonds, angles, ...) are recorded as
+counts. A session is started by
+
+    GENTOPO_PROFILE=trace.json python build.py   # whole process (1: default)
+    MolGraph(mol, profile="trace.json")          # True: gentopo_trace.json
+
+    with Profiler.session("trace.json"):
+        ...
+
+With cprofile=True, a cProfile of the session is saved next to the
+trace (trace.prof) for function-level detail. When no session is
+active, spans cost one global lookup.
+"""
+
+from contextlib import contextmanager
+from functools import wraps
+import atexit
+import os
+import sys
+import threading
+import time
+
+ENV_VAR = "GENTOPO_PROFILE"
+DEFAULT_TRACE = "gentopo_trace.json"
+
+_active = None
+
+
+class Profiler:
+    """
+    Collects spans and counts of one profiling session, see the
+    module docstring. export() writes the Chrome trace, summary()
+    prints time and calls per stage.
+    """
+
+    def __init__(self, traceFile=DEFAULT_TRACE, cprofile=False):
+        self.traceFile = traceFile
+        self.events = []
+        self.stages = {}  # name: [calls, seconds]
+        self.counts = {}
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+        self.cprofile = None
+        if cprofile:
+            import cProfile
+
+            self.cprofile = cProfile.Profile()
+        self.stopped = False
+
+    def start(self):
+        global _active
+        _active = self
+        if self.cprofile is not None:
+            self.cprofile.enable()
+        return self
+
+    def stop(self, export=True):
+        global _active
+        if self.stopped:
+            return
+        self.stopped = True
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        if _active is self:
+            _active = None
+        if export:
+            self.export()
+            self.summary()
+
+    def record(self, name, start, end, args=None):
+        event = {
+            "name": name,
+            "cat": "GenTopo",
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+
+        with self.lock:
+            self.events.append(event)
+            stage = self.stages.setdefault(name, [0, 0.0])
+            stage[0] += 1
+            stage[1] += end - start
+
+    def count(self, name, value):
+        # adds value to the count name, also as a trace counter event
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": "GenTopo",
+                    "ph": "C",
+                    "ts": (time.perf_counter() - self.origin) * 1e6,
+                    "pid": os.getpid(),
+                    "args": {name: self.counts[name]},
+                }
+            )
+
+    def export(self, traceFile=None):
+        import json
+
+        traceFile = traceFile or self.traceFile
+        with open(traceFile, "w") as FH:
+            json.dump(
+                {
+                    "traceEvents": self.events,
+                    "displayTimeUnit": "ms",
+                    "otherData": {"counts": self.counts},
+                },
+                FH,
+            )
+        print("Profile trace written to %s" % traceFile)
+
+        if self.cprofile is not None:
+            statsFile = os.path.splitext(traceFile)[0] + ".prof"
+            self.cprofile.dump_stats(statsFile)
+            print("cProfile stats written to %s" % statsFile)
+
+    def summary(self, FH=sys.stdout):
+        FH.write("%-36s %8s %12s\n" % ("stage", "calls", "seconds"))
+        for name, (calls, seconds) in sorted(
+            self.stages.items(), key=lambda item: -item[1][1]
+        ):
+            FH.write("%-36s %8d %12.4f\n" % (name, calls, seconds))
+        for name, value in self.counts.items():
+            FH.write("%-36s %8s %12d\n" % (name, "count", value))
+
+
+class Span:
+    # times a block into the active session, if any
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if _active is not None:
+            _active.record(self.name, self.start, time.perf_counter(), self.args)
+        return False
+
+
+def active():
+    # the running Profiler, None when profiling is off
+    return _active
+
+
+def start(traceFile=DEFAULT_TRACE, cprofile=False, atExit=True):
+    """
+    Starts a session unless one is running and returns the running
+    one; with atExit, it is stopped and exported at interpreter exit.
+    """
+
+    if _active is not None:
+        return _active
+
+    profiler = Profiler(traceFile, cprofile).start()
+    if atExit:
+        atexit.register(profiler.stop)
+    return profiler
+
+
+@contextmanager
+def session(traceFile=DEFAULT_TRACE, cprofile=False):
+    # with Profiler.session("trace.json"): ... profiles the block
+    profiler = Profiler(traceFile, cprofile).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+
+
+def span(name, **args):
+    return Span(name, args)
+
+
+def count(name, value):
+    if _active is not None:
+        _active.count(name, int(value))
+
+
+def profiled(name):
+    """
+    Decorator recording every call of a function as span name while
+    a session is active, plain call otherwise.
+    """
+
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return function(*args, **kwargs)
+            with Span(name, None):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+if os.environ.get(ENV_VAR):
+    _trace = os.environ[ENV_VAR]
+    start(DEFAULT_TRACE if _trace.lower() in ("1", "yes", "true") else _trace)
@@ -0,0 +1,168 @@
+from GenTopo.ArrayUtil import adjacency, canonicalTerms, neighborPairs, uniqueRows
+from GenTopo.Kernels import extendTerms
+import numpy as np
+
+
+class ResidueTemplates:
+    """
+    Residue-template library for biopolymers and polymers.
+
+    Angles and dihedrals inside a residue are enumerated once per
+    unique residue (name, atom types and intra-residue bonds) and
+    stamped out for every copy with an index offset. Only terms that
+    contain an inter-residue bond are enumerated explicitly.
+    Residues are runs of consecutive atoms with the same resID and
+    resName. A library can be shared by several graphs.
+
+    Example:
+        templates = ResidueTemplates()
+        graph = MolGraph(mol, residueTemplates=templates)
+    """
+
+    def __init__(self):
+        self.templates = {}
+
+    def split(self, graph):
+        # residue segmentation of graph, cached on the graph
+        if getattr(graph, "_residueSplit", None) is not None:
+            return graph._residueSplit
+
+        mol = graph.coordObj
+        nAtoms = graph.nAtoms
+        bonds = np.asarray(graph.bonds, dtype=np.int64)
+
+        resIDs = np.asarray(mol.resIDs)[:nAtoms]
+        resNames = np.asarray(mol.resNames)[:nAtoms]
+        if len(mol.atomTypes):
+            signature = np.asarray(mol.atomTypes)[:nAtoms]
+        else:
+            signature = np.asarray(mol.symbols)[:nAtoms]
+
+        change = np.ones(nAtoms, dtype=bool)
+        change[1:] = (resIDs[1:] != resIDs[:-1]) | (resNames[1:] != resNames[:-1])
+        starts = np.flatnonzero(change)
+        lengths = np.diff(np.append(starts, nAtoms))
+        resIndex = np.cumsum(change) - 1
+
+        iRes = resIndex[bonds[:, 0] - 1]
+        jRes = resIndex[bonds[:, 1] - 1]
+        intra = iRes == jRes
+
+        # intra-residue bonds grouped by residue, in local indices
+        order = np.argsort(iRes[intra], kind="stable")
+        intraRes = iRes[intra][order]
+        localBonds = bonds[intra][order] - (starts[intraRes] + 1)[:, None]
+        bondStart = np.searchsorted(intraRes, np.arange(len(starts) + 1))
+        nLocal = np.diff(bondStart)
+
+        nameCodes = np.unique(resNames[starts], return_inverse=True)[1]
+        typeCodes = np.unique(signature, return_inverse=True)[1]
+
+        # residues of equal size and bond count are compared as rows of
+        # [name, atom types, local bonds]; identical rows share a template
+        templateOf = np.empty(len(starts), dtype=np.int64)
+        keys = []
+        sizes = np.column_stack((lengths, nLocal))
+        for (length, nb) in np.unique(sizes, axis=0).tolist():
+            members = np.flatnonzero((lengths == length) & (nLocal == nb))
+            atomIdx = starts[members][:, None] + np.arange(length)
+            bondIdx = bondStart[members][:, None] + np.arange(nb)
+            rows = np.column_stack(
+                (
+                    nameCodes[members],
+                    typeCodes[atomIdx],
+                    localBonds[bondIdx].reshape(len(members), 2 * nb),
+                )
+            )
+            _, first, inverse = np.unique(
+                rows, axis=0, return_index=True, return_inverse=True
+            )
+            templateOf[members] = inverse.reshape(-1) + len(keys)
+
+            for r in members[first].tolist():
+                start, end = starts[r], starts[r] + length
+                local = localBonds[bondStart[r] : bondStart[r + 1]]
+                keys.append(
+                    (
+                        str(resNames[start]),
+                        tuple(signature[start:end].tolist()),
+                        local.astype(np.int32).tobytes(),
+                    )
+                )
+
+        graph._residueSplit = {
+            "starts": starts,
+            "keys": keys,
+            "templateOf": templateOf,
+            "crossBonds": bonds[~intra],
+        }
+        return graph._residueSplit
+
+    def template(self, key):
+        if key not in self.templates:
+            localBonds = np.frombuffer(key[2], dtype=np.int32).reshape(-1, 2) + 1
+
+            angles = extendTerms(localBonds, localBonds, len(key[1]))
+            dihedrals = extendTerms(localBonds, angles, len(key[1]))
+
+            self.templates[key] = {"angles": angles - 1, "dihedrals": dihedrals - 1}
+
+        return self.templates[key]
+
+    def stamp(self, graph, family):
+        """
+        Returns sorted unique angles or dihedrals (family) of graph.
+        """
+
+        split = self.split(graph)
+        width = 3 if family == "angles" else 4
+
+        order = np.argsort(split["templateOf"], kind="stable")
+        bounds = np.searchsorted(
+            split["templateOf"][order], np.arange(len(split["keys"]) + 1)
+        )
+
+        blocks = [np.zeros((0, width), dtype=np.int64)]
+        for t, key in enumerate(split["keys"]):
+            local = self.template(key)[family]
+            if len(local) == 0:
+                continue
+            starts = split["starts"][order[bounds[t] : bounds[t + 1]]]
+            offsets = starts[:, None, None] + 1
+            blocks.append((local[None] + offsets).reshape(-1, width))
+
+        blocks.append(self.linkage(graph, split["crossBonds"], family))
+
+        terms = canonicalTerms(np.concatenate(blocks))
+        return uniqueRows(terms)
+
+    def linkage(self, graph, crossBonds, family):
+        # terms containing at least one inter-residue bond
+        indptr, indices = adjacency(graph.bonds, graph.nAtoms)
+
+        # both orientations (u, v) of every cross bond
+        u = np.concatenate((crossBonds[:, 0], crossBonds[:, 1]))
+        v = np.concatenate((crossBonds[:, 1], crossBonds[:, 0]))
+
+        # angles n-u-v
+        row, n = neighborPairs(indptr, indices, u)
+        keep = n != v[row]
+        angles = np.column_stack((n[keep], u[row][keep], v[row][keep]))
+
+        if family == "angles":
+            return angles
+
+        # v-u-n-m, the cross bond at the end
+        row, m = neighborPairs(indptr, indices, angles[:, 0])
+        nuv = angles[row]
+        keep = (m != nuv[:, 1]) & (m != nuv[:, 2])
+        ends = np.column_stack((nuv[keep][:, ::-1], m[keep]))
+
+        # n-u-v-m, the cross bond in the middle (duplicates of the two
+        # orientations are removed by the caller)
+        row, m = neighborPairs(indptr, indices, angles[:, 2])
+        nuv = angles[row]
+        keep = (m != nuv[:, 1]) & (m != nuv[:, 0])
+        middles = np.column_stack((nuv[keep], m[keep]))
+
+        return np.concatenate((ends, middles))
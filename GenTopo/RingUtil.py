@@ -1,4 +1,5 @@
 from collections import defaultdict
+import numpy as np
 
 
 class RingUtil:
@@ -14,7 +15,7 @@ class RingUtil:
 
         self.adjList = defaultdict(list)
         self.visited = defaultdict()
-        for inode, jnode in bonds:
+        for inode, jnode in np.asarray(bonds).reshape(-1, 2).tolist():
             self.adjList[inode].append(jnode)
             self.adjList[jnode].append(inode)
 
@@ -32,7 +33,7 @@ class RingUtil:
         if isinstance(inp,int): # atom 
             self.start = inp
 
-            return self.DFS(current, parent=-1)
+            return self.DFS(inp, parent=-1)
         
         else:  # bond 
             inode,jnode=inp 
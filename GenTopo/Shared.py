@@ -0,0 +1,72 @@
+"""
+Shared memory blocks holding BinaryIO containers, so that large arrays
+can be handed to worker processes by name instead of being pickled.
+
+    block, handle = share("MolGraph", arrays, attrs)   # owner
+    block, arrays, attrs = attach(handle)              # any process
+
+The owner unlinks the block when all workers are done; attached
+processes only map it, arrays are read-only views into the block.
+"""
+
+from multiprocessing import shared_memory, resource_tracker
+
+from GenTopo import BinaryIO
+
+
+class SharedBlock(shared_memory.SharedMemory):
+    """
+    Shared memory block that may be closed while numpy views into it
+    are alive, the mapping is then released with the last view.
+    """
+
+    def close(self):
+        try:
+            super().close()
+        except BufferError:
+            pass
+
+
+class Handle:
+    """
+    Picklable reference to a BinaryIO container in a shared block.
+    """
+
+    def __init__(self, name, size, kind):
+        self.name = name
+        self.size = size
+        self.kind = kind
+
+    def __repr__(self):
+        return "Handle(%r, %d bytes, %s)" % (self.name, self.size, self.kind)
+
+
+def share(kind, arrays, attrs=None):
+    # creates a block, packs arrays into it and returns (block, handle)
+    size = BinaryIO.size(kind, arrays, attrs)
+    block = SharedBlock(create=True, size=size)
+    BinaryIO.writeInto(block.buf, kind, arrays, attrs)
+
+    return block, Handle(block.name, size, kind)
+
+
+def attach(handle):
+    """
+    Maps the block of handle, returns (block, arrays, attrs). The block
+    is not registered at the resource tracker, it belongs to the
+    process that created it.
+    """
+
+    try:
+        block = SharedBlock(name=handle.name, track=False)
+    except TypeError:  # python < 3.13 always tracks
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            block = SharedBlock(name=handle.name)
+        finally:
+            resource_tracker.register = register
+
+    arrays, attrs = BinaryIO.readFrom(block.buf, handle.kind)
+
+    return block, arrays, attrs
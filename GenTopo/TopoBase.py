@@ -0,0 +1,178 @@
+from GenTopo.ArrayUtil import readOnly, termArray
+from GenTopo.PeriodicTable import atomicMasses
+from GenTopo import Profiler
+import numpy as np
+
+PATCHABLE_TERMS = ("bonds", "angles", "dihedrals", "imDihedrals", "oneFours")
+
+
+class TopoBase:
+    """
+    Common part of topology writers (GMXTopo.Topo, LammpsData, PSF).
+    It holds the PDBobj/MolGraph pair and assigns bond, angle,
+    dihedral and improper types. For every term family it keeps
+    the list of unique type tuples (in order of first appearance)
+    and an array with the type index of every term, both assigned
+    when the family is first used (see types).
+    """
+
+    def __init__(self, mol, molGraph):
+        self.molGraph = molGraph
+        self.mol = mol
+        self.atomTypes = mol.atomTypes
+        self.atomQQs = mol.atomQQs
+        self.atomMasses = mol.masses
+        self.assignTypes()
+
+    def select(self, atoms):
+        """
+        Topology of the same kind for the selected atoms (a mask or
+        1-based indices, see PDBobj.atomMask), built from the filtered
+        graph, see MolGraph.select. Atom types, charges and masses
+        (also patched ones) are taken over.
+        """
+
+        molGraph = self.molGraph.select(atoms)
+        topo = self.__class__(molGraph.coordObj, molGraph)
+
+        keep = molGraph.parentIDs - 1
+        for name in ("atomTypes", "atomQQs", "atomMasses"):
+            values = np.asarray(getattr(self, name))
+            if len(values) == self.molGraph.nAtoms:
+                setattr(topo, name, readOnly(values[keep]))
+        topo.assignTypes()
+        return topo
+
+    def patch(self, atomTypes=None, atomQQs=None, **terms):
+        """
+        Replaces atom types, charges and/or term families (bonds,
+        angles, dihedrals, imDihedrals, oneFours) and assigns types
+        again, e.g. topo.patch(imDihedrals=newImpropers) before write.
+        """
+
+        for name in terms:
+            if name not in PATCHABLE_TERMS:
+                raise ValueError("Can not patch %s, only %s" % (name, PATCHABLE_TERMS))
+
+        if atomTypes is not None:
+            self.atomTypes = readOnly(np.array(atomTypes, dtype=str))
+        if atomQQs is not None:
+            self.atomQQs = readOnly(np.array(atomQQs, dtype=np.float64))
+
+        for name, value in terms.items():
+            if name == "bonds":
+                self.molGraph.bonds = termArray(value, 2)
+                self.molGraph.nBonds = len(self.molGraph.bonds)
+            else:
+                setattr(self.molGraph, name, value)
+
+        self.assignTypes()
+
+    def assignTypes(self):
+        # atom types now, term types of each family on first use
+        self.typeNames, self.atomTypeIDs = np.unique(
+            np.asarray(self.atomTypes, dtype=str), return_inverse=True
+        )
+        self._types = {}
+
+    def types(self, family):
+        """
+        (types, typeIDs) of a term family (bonds, angles, dihedrals or
+        imDihedrals), assigned on first use, so a writer that emits
+        only some families never generates the others.
+        """
+
+        if family not in self._types:
+            # impropers are not symmetric under reversal
+            symmetric = family != "imDihedrals"
+            self._types[family] = self.uniqueTypes(
+                self.typedTerms(family), symmetric=symmetric
+            )
+        return self._types[family]
+
+    def typedTerms(self, family):
+        # terms of family that get types, see GMXTopo.Topo
+        return getattr(self.molGraph, family)
+
+    @property
+    def bondTypes(self):
+        return self.types("bonds")[0]
+
+    @property
+    def bondTypeIDs(self):
+        return self.types("bonds")[1]
+
+    @property
+    def angleTypes(self):
+        return self.types("angles")[0]
+
+    @property
+    def angleTypeIDs(self):
+        return self.types("angles")[1]
+
+    @property
+    def dihedralTypes(self):
+        return self.types("dihedrals")[0]
+
+    @property
+    def dihedralTypeIDs(self):
+        return self.types("dihedrals")[1]
+
+    @property
+    def imDihedralTypes(self):
+        return self.types("imDihedrals")[0]
+
+    @property
+    def imDihedralTypeIDs(self):
+        return self.types("imDihedrals")[1]
+
+    def typeElements(self):
+        """
+        Atomic number and element mass of every atom type (of typeNames),
+        taken from the atoms of that type, see PDBobj.masses.
+        """
+
+        nTyped = min(len(self.atomTypeIDs), self.mol.nAtoms)
+        typeIDs = self.atomTypeIDs[:nTyped]
+
+        numbers = np.zeros(len(self.typeNames), dtype=np.int64)
+        numbers[typeIDs] = self.mol.atomicNumbers[:nTyped]
+        return numbers, atomicMasses[numbers]
+
+    @Profiler.profiled("Topo.assignTypes")
+    def uniqueTypes(self, terms, symmetric=True):
+        """
+        Returns unique type tuples of terms and the type index of
+        each term. With symmetric, a type and its reverse are the same
+        type, stored in the orientation in which it was first seen.
+        """
+
+        terms = np.asarray(terms)
+        if len(terms) == 0:
+            return [], np.zeros(0, dtype=np.int32)
+
+        codes = self.atomTypeIDs[terms - 1]
+
+        if symmetric:
+            reverse = codes[:, ::-1]
+            differ = codes != reverse
+            first = np.argmax(differ, axis=1)
+            rows = np.arange(len(codes))
+            keep = codes[rows, first] <= reverse[rows, first]
+            keys = np.where(keep[:, None], codes, reverse)
+        else:
+            keys = codes
+
+        _, firstIndex, inverse = np.unique(
+            keys, axis=0, return_index=True, return_inverse=True
+        )
+
+        # number types in order of first appearance
+        order = np.argsort(firstIndex, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+
+        types = [tuple(self.typeNames[codes[i]].tolist()) for i in firstIndex[order]]
+        typeIDs = rank[inverse.reshape(-1)].astype(np.int32)
+
+        return types, typeIDs
@@ -0,0 +1,204 @@
+"""
+Semantic diff of two GROMACS topologies.
+
+Both files are read with GMXReader.TopoReader into canonical sorted
+integer arrays and compared section by section with sort-based set
+operations, so files with millions of terms are compared in seconds:
+
+    python -m GenTopo.TopoDiff ref.top new.top
+
+A term is added/removed if its atoms are only in one topology and
+retyped if it is in both but with different atom types or func.
+Atoms are compared by id for type and charge changes.
+"""
+
+from GenTopo.GMXReader import TopoReader, SECTIONS
+from GenTopo.ArrayUtil import rowKeys, rowOrder
+import sys
+import numpy as np
+
+
+def matchRows(a, b):
+    """
+    For every row of a, the index of an equal row of b or -1
+    (a and b are 2D with the same number of columns). Rows of a and
+    b are grouped by one sort of their packed keys.
+    """
+
+    if len(a) == 0 or len(b) == 0:
+        return np.full(len(a), -1, dtype=np.int64)
+
+    keys = rowKeys(np.concatenate((a, b)))
+    order = rowOrder(keys)
+    sortedKeys = keys[order]
+    newGroup = np.ones(len(keys), dtype=bool)
+    newGroup[1:] = (sortedKeys[1:] != sortedKeys[:-1]).any(axis=1)
+
+    group = np.empty(len(keys), dtype=np.int64)
+    group[order] = np.cumsum(newGroup)
+    groupA, groupB = group[: len(a)], group[len(a) :]
+
+    orderB = np.argsort(groupB, kind="stable")
+    pos = np.searchsorted(groupB[orderB], groupA)
+    pos = np.minimum(pos, len(b) - 1)
+    found = groupB[orderB[pos]] == groupA
+
+    return np.where(found, orderB[pos], -1)
+
+
+class SectionDiff:
+    """
+    Added, removed and retyped terms of one section, as (n, k)
+    arrays of 1-based atom ids (retyped in numbering of the new file).
+    """
+
+    def __init__(self, name, added, removed, retyped):
+        self.name = name
+        self.added = added
+        self.removed = removed
+        self.retyped = retyped
+
+    @property
+    def identical(self):
+        return not (len(self.added) or len(self.removed) or len(self.retyped))
+
+
+class TopoDiff:
+    """
+    Differences between topologies ref and new (TopoReader objects or
+    file names):
+
+        sections[name]: SectionDiff of bonds, pairs, angles, dihedrals
+                        and impropers
+        addedAtoms, removedAtoms, retypedAtoms, rechargedAtoms: ids
+
+    Example:
+        diff = TopoDiff("ref.top", "new.top")
+        diff.report()
+    """
+
+    def __init__(self, ref, new, qTol=1e-6):
+        self.ref = ref if isinstance(ref, TopoReader) else TopoReader(ref)
+        self.new = new if isinstance(new, TopoReader) else TopoReader(new)
+        self.qTol = qTol
+
+        self.typeNames = np.unique(
+            np.concatenate((self.ref.atomTypes, self.new.atomTypes))
+        )
+
+        self.diffAtoms()
+        self.sections = {name: self.diffSection(name) for name in SECTIONS}
+
+    def diffAtoms(self):
+        ref, new = self.ref, self.new
+        index = matchRows(new.atomIDs[:, None], ref.atomIDs[:, None])
+        common = index >= 0
+
+        self.addedAtoms = new.atomIDs[~common]
+        self.removedAtoms = np.setdiff1d(ref.atomIDs, new.atomIDs)
+
+        newRows, refRows = np.flatnonzero(common), index[common]
+        retyped = new.atomTypes[newRows] != ref.atomTypes[refRows]
+        recharged = np.abs(new.atomQQs[newRows] - ref.atomQQs[refRows]) > self.qTol
+        self.retypedAtoms = new.atomIDs[newRows[retyped]]
+        self.rechargedAtoms = new.atomIDs[newRows[recharged]]
+
+    def diffSection(self, name):
+        refTerms, refFuncs = self.ref.canonical(name)
+        newTerms, newFuncs = self.new.canonical(name)
+
+        index = matchRows(newTerms, refTerms)
+        common = index >= 0
+        inRef = np.zeros(len(refTerms), dtype=bool)
+        inRef[index[common]] = True
+
+        newRows, refRows = np.flatnonzero(common), index[common]
+        changed = newFuncs[newRows] != refFuncs[refRows]
+        if len(newRows):
+            newCodes = self.new.typeCodes(newTerms[newRows], self.typeNames)
+            refCodes = self.ref.typeCodes(refTerms[refRows], self.typeNames)
+            changed |= (newCodes != refCodes).any(axis=1)
+
+        return SectionDiff(
+            name,
+            added=newTerms[~common],
+            removed=refTerms[~inRef],
+            retyped=newTerms[newRows[changed]],
+        )
+
+    @property
+    def identical(self):
+        atoms = (
+            self.addedAtoms,
+            self.removedAtoms,
+            self.retypedAtoms,
+            self.rechargedAtoms,
+        )
+        return (
+            self.ref.nrexcl == self.new.nrexcl
+            and not any(len(ids) for ids in atoms)
+            and all(section.identical for section in self.sections.values())
+        )
+
+    def report(self, FH=sys.stdout, nShow=5):
+        """
+        Writes a table with the number of changes per section and the
+        first nShow changed terms of each kind.
+        """
+
+        FH.write("# %s -> %s\n" % (self.ref.topFile, self.new.topFile))
+        if self.ref.nrexcl != self.new.nrexcl:
+            FH.write("nrexcl %d -> %d\n" % (self.ref.nrexcl, self.new.nrexcl))
+        FH.write(
+            "%-10s %10s %10s %10s %10s\n"
+            % ("section", "ref", "added", "removed", "retyped")
+        )
+
+        FH.write(
+            "%-10s %10d %10d %10d %10d   charge changed: %d\n"
+            % (
+                "atoms",
+                self.ref.nAtoms,
+                len(self.addedAtoms),
+                len(self.removedAtoms),
+                len(self.retypedAtoms),
+                len(self.rechargedAtoms),
+            )
+        )
+        for name, section in self.sections.items():
+            FH.write(
+                "%-10s %10d %10d %10d %10d\n"
+                % (
+                    name,
+                    len(self.ref.terms[name]),
+                    len(section.added),
+                    len(section.removed),
+                    len(section.retyped),
+                )
+            )
+
+        for name, section in self.sections.items():
+            for kind in ("added", "removed", "retyped"):
+                terms = getattr(section, kind)
+                for term in terms[:nShow]:
+                    FH.write("%s %-8s %s\n" % (name, kind, " ".join(map(str, term))))
+                if len(terms) > nShow:
+                    more = len(terms) - nShow
+                    FH.write("%s %-8s ... %d more\n" % (name, kind, more))
+
+        FH.write("identical\n" if self.identical else "different\n")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("Usage: python -m GenTopo.TopoDiff ref.top new.top")
+        return 2
+
+    diff = TopoDiff(argv[0], argv[1])
+    diff.report()
+    return 0 if diff.identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,3 +7,26 @@ which is not guranteed to be correct.
 non_orthogonal_box = """
 Fatal Error: Only orthogonal box is supported
 """
+
+inconsistent_models = """
+Fatal Error: All MODEL records must contain the same number of atoms
+"""
+
+bad_binary_file = """
+Fatal Error: Not a GenTopo binary file or unsupported version
+"""
+
+kernels_missing = """
+Fatal Error: Compiled kernels (GenTopo._kernels) are not built,
+install Cython and reinstall GenTopo to use the cython backend
+"""
+
+topology_content_dropped = """
+Warning: The topology was read from a file, written again it loses
+%s
+"""
+
+conect_unreadable = """
+Warning: CONECT record in line %d could not be read, its bonds are missing
+%s
+"""
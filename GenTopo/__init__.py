@@ -1,3 +1,37 @@
 __version__="0.1"
-__author__="Masrul Huda" 
+__author__="Masrul Huda"
 
+# Submodules and the main classes are imported on first attribute access
+# (PEP 562), so "import GenTopo" does not load numpy:
+#     import GenTopo
+#     mol = GenTopo.PDBobj("test.pdb")
+_LAZY = {
+    "PDBobj": "Coord",
+    "MolGraph": "Graph",
+    "Topo": "GMXTopo",
+    "PSF": "PSFTopo",
+    "LammpsData": "LMPTopo",
+    "TopoReader": "GMXReader",
+}
+
+
+def __getattr__(name):
+    import importlib
+
+    if name in _LAZY:
+        value = getattr(importlib.import_module("GenTopo." + _LAZY[name]), name)
+    else:
+        try:
+            value = importlib.import_module("GenTopo." + name)
+        except ModuleNotFoundError as exc:
+            # only a missing submodule, not a failed import inside it
+            if exc.name != "GenTopo." + name:
+                raise
+            raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
@@ -0,0 +1,193 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Compiled graph kernels of the cython backend, see GenTopo.Kernels
+for the dispatching functions and the numpy equivalents.
+"""
+
+import numpy as np
+cimport numpy as cnp
+
+cnp.import_array()
+
+ctypedef cnp.int64_t idx_t
+
+
+def extendTerms(const idx_t[::1] indptr, const idx_t[::1] indices, const idx_t[:, ::1] terms):
+    # every term extended by one neighbor at either end, oriented first < last
+    cdef Py_ssize_t n = terms.shape[0], k = terms.shape[1]
+    cdef Py_ssize_t i, c, p, count = 0, side
+    cdef idx_t atom, m
+    cdef bint inside, flip
+
+    for i in range(n):
+        for side in range(2):
+            atom = terms[i, k - 1] if side == 0 else terms[i, 0]
+            for p in range(indptr[atom], indptr[atom + 1]):
+                m = indices[p]
+                inside = False
+                for c in range(k):
+                    if terms[i, c] == m:
+                        inside = True
+                        break
+                if not inside:
+                    count += 1
+
+    out = np.empty((count, k + 1), dtype=np.int64)
+    cdef idx_t[:, ::1] o = out
+    count = 0
+
+    for i in range(n):
+        for side in range(2):
+            atom = terms[i, k - 1] if side == 0 else terms[i, 0]
+            for p in range(indptr[atom], indptr[atom + 1]):
+                m = indices[p]
+                inside = False
+                for c in range(k):
+                    if terms[i, c] == m:
+                        inside = True
+                        break
+                if inside:
+                    continue
+
+                if side == 0:
+                    flip = terms[i, 0] > m
+                    for c in range(k):
+                        o[count, k - c if flip else c] = terms[i, c]
+                    o[count, 0 if flip else k] = m
+                else:
+                    flip = m > terms[i, k - 1]
+                    for c in range(k):
+                        o[count, k - 1 - c if flip else c + 1] = terms[i, c]
+                    o[count, k if flip else 0] = m
+                count += 1
+
+    return out
+
+
+cdef Py_ssize_t lowerBound(const idx_t[::1] keys, idx_t key):
+    cdef Py_ssize_t lo = 0, hi = keys.shape[0], mid
+    while lo < hi:
+        mid = (lo + hi) >> 1
+        if keys[mid] < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def searchBonds(
+    const double[:, ::1] coords,
+    const double[::1] radii,
+    double scale,
+    const idx_t[:, ::1] cell,
+    const idx_t[::1] dims,
+    const idx_t[::1] order,
+    const idx_t[::1] sortedKeys,
+):
+    # cell list search over the 27 neighboring cells, pairs i < j
+    cdef Py_ssize_t nAtoms = coords.shape[0], nKeys = sortedKeys.shape[0]
+    cdef Py_ssize_t i, j, p, count = 0, capacity = 4 * nAtoms + 16
+    cdef idx_t cx, cy, cz, key
+    cdef int ox, oy, oz
+    cdef double dx, dy, dz, rcut
+
+    out = np.empty((capacity, 2), dtype=np.int64)
+    cdef idx_t[:, ::1] o = out
+
+    for i in range(nAtoms):
+        for ox in range(-1, 2):
+            cx = cell[i, 0] + ox
+            if cx < 0 or cx >= dims[0]:
+                continue
+            for oy in range(-1, 2):
+                cy = cell[i, 1] + oy
+                if cy < 0 or cy >= dims[1]:
+                    continue
+                for oz in range(-1, 2):
+                    cz = cell[i, 2] + oz
+                    if cz < 0 or cz >= dims[2]:
+                        continue
+
+                    key = (cx * dims[1] + cy) * dims[2] + cz
+                    p = lowerBound(sortedKeys, key)
+                    while p < nKeys and sortedKeys[p] == key:
+                        j = order[p]
+                        p += 1
+                        if j <= i:
+                            continue
+
+                        dx = coords[i, 0] - coords[j, 0]
+                        dy = coords[i, 1] - coords[j, 1]
+                        dz = coords[i, 2] - coords[j, 2]
+                        rcut = scale * (radii[i] + radii[j])
+                        if dx * dx + dy * dy + dz * dz >= rcut * rcut:
+                            continue
+
+                        if count == capacity:
+                            capacity *= 2
+                            out = np.resize(out, (capacity, 2))
+                            o = out
+                        o[count, 0] = i + 1
+                        o[count, 1] = j + 1
+                        count += 1
+
+    return out[:count]
+
+
+def ringBonds(const idx_t[::1] indptr, const idx_t[::1] indices, const idx_t[::1] edges, Py_ssize_t nBonds):
+    # iterative Tarjan low-link search, returns 1 for ring bonds
+    cdef Py_ssize_t nAtoms = indptr.shape[0] - 2
+    cdef Py_ssize_t root, top, v, u, w, ptr, timer = 1
+
+    disc_ = np.zeros(nAtoms + 1, dtype=np.int64)
+    low_ = np.zeros(nAtoms + 1, dtype=np.int64)
+    ring_ = np.ones(nBonds, dtype=np.uint8)
+    atomStack_ = np.empty(nAtoms + 1, dtype=np.int64)
+    bondStack_ = np.empty(nAtoms + 1, dtype=np.int64)
+    ptrStack_ = np.empty(nAtoms + 1, dtype=np.int64)
+
+    cdef idx_t[::1] disc = disc_, low = low_
+    cdef idx_t[::1] atomStack = atomStack_, bondStack = bondStack_, ptrStack = ptrStack_
+    cdef cnp.uint8_t[::1] ring = ring_
+
+    for root in range(1, nAtoms + 1):
+        if disc[root] or indptr[root] == indptr[root + 1]:
+            continue
+
+        disc[root] = low[root] = timer
+        timer += 1
+        top = 0
+        atomStack[0] = root
+        bondStack[0] = -1
+        ptrStack[0] = indptr[root]
+
+        while top >= 0:
+            v = atomStack[top]
+            ptr = ptrStack[top]
+
+            if ptr < indptr[v + 1]:
+                ptrStack[top] = ptr + 1
+                if edges[ptr] == bondStack[top]:
+                    continue
+
+                w = indices[ptr]
+                if disc[w]:
+                    if disc[w] < low[v]:
+                        low[v] = disc[w]
+                else:
+                    disc[w] = low[w] = timer
+                    timer += 1
+                    top += 1
+                    atomStack[top] = w
+                    bondStack[top] = edges[ptr]
+                    ptrStack[top] = indptr[w]
+            else:
+                top -= 1
+                if top >= 0:
+                    u = atomStack[top]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+                    if low[v] > disc[u]:
+                        ring[bondStack[top + 1]] = 0
+
+    return ring_
@@ -1,4 +1,23 @@
-from setuptools import setup
+from setuptools import setup, Extension
+
+# optional compiled kernels (cython backend of GenTopo.Kernels),
+# without Cython the pure numpy backend is used
+try:
+    from Cython.Build import cythonize
+    import numpy
+
+    extensions = cythonize(
+        [
+            Extension(
+                "GenTopo._kernels",
+                ["GenTopo/_kernels.pyx"],
+                include_dirs=[numpy.get_include()],
+                optional=True,
+            )
+        ]
+    )
+except ImportError:
+    extensions = []
 
 setup(
     name="GenTopo",
@@ -8,6 +27,7 @@ setup(
     author="Masrul Huda",
     author_email="mmh568@msstate.edu",
     packages=["GenTopo"],
+    ext_modules=extensions,
     py_modules=["Coord", "Graph", "GMXTopo", "PeriodicTable", "ImproperDihedral"],
     install_requires=['numpy>=1.14'],
     python_requires='>=3.7',